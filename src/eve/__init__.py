@@ -26,24 +26,36 @@ from .version import __version__, __versioninfo__  # isort:skip
 #   - exceptions, type_definitions
 #   - utils
 #   - concepts <-> iterators  (circular dependency only inside methods, it should be safe)
-#   - traits, visitors
-#   - codegen
+#   - traits
+#   - visitors
+#   - codegen, serialization
 #
 
 from .concepts import (
+    ContentUIDGenerator,
     FieldKind,
     FrozenModel,
     FrozenNode,
     GenericNode,
     Model,
     Node,
+    ValidationLevel,
     VType,
+    cached_node_property,
+    clone_tree,
+    computes_derived_values,
     field,
+    fingerprint,
     in_field,
+    invalidate_node_properties,
     out_field,
+    structural_eq,
+    structural_hash,
+    validate_tree,
+    validation_level,
 )
-from .iterators import iter_tree
-from .traits import SymbolTableTrait
+from .iterators import TreeIndex, iter_tree
+from .traits import SymbolIndex, SymbolTableTrait
 from .type_definitions import (
     NOTHING,
     Bool,
@@ -66,4 +78,4 @@ from .type_definitions import (
     SymbolName,
     SymbolRef,
 )
-from .visitors import NodeMutator, NodeTranslator, NodeVisitor
+from .visitors import FusedNodeVisitor, NodeMutator, NodeTranslator, NodeVisitor
@@ -20,12 +20,21 @@
 from __future__ import annotations
 
 import abc
+import ast
 import collections.abc
+import concurrent.futures
 import contextlib
-import inspect
+import functools
+import hashlib
+import marshal
+import operator
+import os
 import re
+import shutil
 import string
+import subprocess
 import sys
+import tempfile
 import textwrap
 import types
 import typing
@@ -33,16 +42,23 @@ from subprocess import PIPE, Popen
 
 import black
 import jinja2
+import jinja2.meta
+import mako
+import mako.lexer
+import mako.parsetree
 from mako import template as mako_tpl
 
-from . import exceptions, utils
+from . import concepts, exceptions, utils
 from .concepts import Node, TreeNode
 from .typingx import (
+    IO,
     Any,
     Callable,
     ClassVar,
     Collection,
     Dict,
+    FrozenSet,
+    Iterable,
     Iterator,
     List,
     Mapping,
@@ -51,6 +67,7 @@ from .typingx import (
     Sequence,
     Set,
     Tuple,
+    Type,
     TypeVar,
     Union,
     cast,
@@ -68,10 +85,22 @@ except ImportError:
 
 
 SourceFormatter = Callable[[str], str]
+BatchSourceFormatter = Callable[[Sequence[str]], List[str]]
 
 #: Global dict storing registered formatters.
 SOURCE_FORMATTERS: Dict[str, SourceFormatter] = {}
 
+#: Global dict storing registered formatters of several sources (see :func:`format_sources`).
+BATCH_SOURCE_FORMATTERS: Dict[str, BatchSourceFormatter] = {}
+
+#: Global dict storing the functions returning the versions of the registered formatters.
+SOURCE_FORMATTER_VERSIONS: Dict[str, Callable[[], Optional[str]]] = {}
+
+#: Maximum number of formatted sources cached in memory.
+MAX_FORMATTED_SOURCES_IN_MEMORY = 256
+
+_formatted_sources: Dict[str, str] = {}
+
 
 class FormatterNameError(exceptions.EveRuntimeError):
     """Run-time error registering a new source code formatter."""
@@ -97,8 +126,95 @@ class TemplateRenderingError(exceptions.EveRuntimeError):
     ...
 
 
-def register_formatter(language: str) -> Callable[[SourceFormatter], SourceFormatter]:
-    """Decorator to register source code formatters for specific languages."""
+class DiskCache:
+    """On-disk cache of values supported by :mod:`marshal`, keyed by content hashes.
+
+    Keys are hashes of all the data determining the cached value (e.g. a
+    template source and the version of the template engine), so stale
+    entries are never used. Writes are atomic and I/O errors are ignored
+    (the value is then just computed again).
+
+    Args:
+        directory: Cache directory (``None`` disables the cache).
+
+    """
+
+    directory: Optional[str]
+
+    def __init__(self, directory: Optional[Union[str, os.PathLike]]) -> None:
+        self.directory = os.fspath(directory) if directory is not None else None
+
+    def key(self, *parts: Optional[str]) -> Optional[str]:
+        """Return the key for some data (``None`` if the cache or some part is missing)."""
+        if self.directory is None or any(part is None for part in parts):
+            return None
+        return _content_hash(*cast(Tuple[str, ...], parts))
+
+    def contains(self, key: Optional[str]) -> bool:
+        return key is not None and os.path.exists(self._path(key))
+
+    def load(self, key: Optional[str]) -> Optional[Any]:
+        """Return the cached data for ``key`` or ``None`` if missing or unreadable."""
+        if key is None:
+            return None
+        try:
+            with open(self._path(key), "rb") as f:
+                return marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+
+    def store(self, key: Optional[str], data: Any) -> None:
+        """Store ``data`` (a value supported by :mod:`marshal`) under ``key``."""
+        if key is None:
+            return
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                marshal.dump(data, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+
+    def _path(self, key: str) -> str:
+        assert self.directory is not None
+        return os.path.join(self.directory, key[:2], key)
+
+
+def _content_hash(*parts: str) -> str:
+    return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+
+def _default_cache_dir(env_var: str) -> Optional[str]:
+    # Disk caches are opt-in: entries contain marshalled code loaded without further checks
+    return os.environ.get(env_var, None) or None
+
+
+#: Global cache of compiled templates, disabled by default. The directory can be
+#: set with the ``EVE_TEMPLATE_CACHE_DIR`` environment variable and should only
+#: be writable by trusted users (cached code is loaded as it is).
+template_cache = DiskCache(_default_cache_dir("EVE_TEMPLATE_CACHE_DIR"))
+
+#: Global cache of formatted sources, disabled by default. The directory can be
+#: set with the ``EVE_FORMATTING_CACHE_DIR`` environment variable.
+formatting_cache = DiskCache(_default_cache_dir("EVE_FORMATTING_CACHE_DIR"))
+
+
+def register_formatter(
+    language: str, *, version: Optional[Callable[[], Optional[str]]] = None
+) -> Callable[[SourceFormatter], SourceFormatter]:
+    """Decorator to register source code formatters for specific languages.
+
+    Args:
+        language: Language of the formatted sources.
+        version: Function returning the version of the formatter, including
+            any external configuration affecting the results (e.g. style
+            files). Formatted sources are only cached on disk for formatters
+            with a version.
+
+    """
 
     def _decorator(formatter: SourceFormatter) -> SourceFormatter:
         if language in SOURCE_FORMATTERS:
@@ -106,13 +222,39 @@ def register_formatter(language: str) -> Callable[[SourceFormatter], SourceForma
 
         assert callable(formatter)
         SOURCE_FORMATTERS[language] = formatter
+        if version is not None:
+            SOURCE_FORMATTER_VERSIONS[language] = version
 
         return formatter
 
     return _decorator
 
 
-@register_formatter("python")
+def register_batch_formatter(
+    language: str,
+) -> Callable[[BatchSourceFormatter], BatchSourceFormatter]:
+    """Decorator to register formatters of several sources for specific languages.
+
+    Batch formatters receive a sequence of sources and the same keyword
+    arguments as the regular formatter of the language, and return the
+    formatted sources in the same order.
+    """
+
+    def _decorator(formatter: BatchSourceFormatter) -> BatchSourceFormatter:
+        if language in BATCH_SOURCE_FORMATTERS:
+            raise FormatterNameError(
+                f"Another batch formatter for language '{language}' already exists"
+            )
+
+        assert callable(formatter)
+        BATCH_SOURCE_FORMATTERS[language] = formatter
+
+        return formatter
+
+    return _decorator
+
+
+@register_formatter("python", version=lambda: f"black-{black.__version__}")
 def format_python_source(
     source: str,
     *,
@@ -122,7 +264,7 @@ def format_python_source(
 ) -> str:
     """Format Python source code using black formatter."""
 
-    target_versions = target_versions or f"{sys.version_info.major}{sys.version_info.minor}"
+    target_versions = target_versions or {f"{sys.version_info.major}{sys.version_info.minor}"}
     target_versions = set(black.TargetVersion[f"PY{v.replace('.', '')}"] for v in target_versions)
 
     formatted_source = black.format_str(
@@ -138,9 +280,63 @@ def format_python_source(
     return formatted_source
 
 
+@functools.lru_cache(maxsize=None)
+def _clang_format_version() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["clang-format", "--version"], stdout=PIPE, encoding="utf8", check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+#: Names of the style files looked up by clang-format (with ``--style=file``, the default)
+_CLANG_FORMAT_STYLE_FILE_NAMES = (".clang-format", "_clang-format")
+
+
+def _find_clang_format_style_file() -> Optional[str]:
+    # Style file used for sources read from stdin (searched from the working directory)
+    directory = os.getcwd()
+    while True:
+        for name in _CLANG_FORMAT_STYLE_FILE_NAMES:
+            path = os.path.join(directory, name)
+            if os.path.isfile(path):
+                return path
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+def _clang_format_signature() -> Optional[str]:
+    # The contents of the style file found by clang-format also determine the results
+    version = _clang_format_version()
+    style_file = _find_clang_format_style_file()
+    if version is None or style_file is None:
+        return version
+    try:
+        with open(style_file, encoding="utf8") as f:
+            return f"{version}\n{f.read()}"
+    except OSError:
+        return None
+
+
+def _clang_format_args(
+    style: Optional[str], fallback_style: Optional[str], sort_includes: bool
+) -> List[str]:
+    args = ["clang-format"]
+    if style:
+        args.append(f"--style={style}")
+    if fallback_style:
+        args.append(f"--fallback-style={fallback_style}")
+    if sort_includes:
+        args.append("--sort-includes")
+    return args
+
+
 if _CLANG_FORMAT_AVAILABLE:
 
-    @register_formatter("cpp")
+    @register_formatter("cpp", version=_clang_format_signature)
     def format_cpp_source(
         source: str,
         *,
@@ -150,37 +346,170 @@ if _CLANG_FORMAT_AVAILABLE:
     ) -> str:
         """Format C++ source code using clang-format."""
 
-        args = ["clang-format"]
-        if style:
-            args.append(f"--style={style}")
-        if fallback_style:
-            args.append(f"--fallback-style={style}")
-        if sort_includes:
-            args.append("--sort-includes")
-
-        p = Popen(args, stdout=PIPE, stdin=PIPE, encoding="utf8")
+        p = Popen(
+            _clang_format_args(style, fallback_style, sort_includes),
+            stdout=PIPE,
+            stdin=PIPE,
+            encoding="utf8",
+        )
         formatted_source, _ = p.communicate(input=source)
         assert isinstance(formatted_source, str)
 
         return formatted_source
 
+    @register_batch_formatter("cpp")
+    def format_cpp_sources(
+        sources: Sequence[str],
+        *,
+        style: Optional[str] = None,
+        fallback_style: Optional[str] = None,
+        sort_includes: bool = False,
+    ) -> List[str]:
+        """Format several C++ sources with a single clang-format process.
+
+        The sources are formatted in a temporary directory, where the style file
+        found from the working directory is copied, so the results are the same
+        as with :func:`format_cpp_source`.
+        """
+
+        style_file = _find_clang_format_style_file()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            if style_file is not None:
+                shutil.copyfile(style_file, os.path.join(tmp_dir, os.path.basename(style_file)))
+            paths = [os.path.join(tmp_dir, f"source_{i}.cpp") for i in range(len(sources))]
+            for path, source in zip(paths, sources):
+                with open(path, "w", encoding="utf8") as f:
+                    f.write(source)
+            subprocess.run(
+                [*_clang_format_args(style, fallback_style, sort_includes), "-i", *paths],
+                check=True,
+            )
+            formatted_sources = []
+            for path in paths:
+                with open(path, encoding="utf8") as f:
+                    formatted_sources.append(f.read())
+
+        return formatted_sources
+
 
 def format_source(language: str, source: str, *, skip_errors: bool = True, **kwargs: Any) -> str:
-    """Format source code if a formatter exists for the specific language."""
+    """Format source code if a formatter exists for the specific language.
+
+    Formatted sources are cached (see :func:`format_sources`).
+    """
+
+    return format_sources(language, [source], skip_errors=skip_errors, **kwargs)[0]
+
 
+def format_sources(
+    language: str,
+    sources: Iterable[str],
+    *,
+    skip_errors: bool = True,
+    max_workers: Optional[int] = None,
+    **kwargs: Any,
+) -> List[str]:
+    """Format several source codes of the same language.
+
+    Results are cached by content, in memory and in the global
+    :data:`formatting_cache`, so only new sources are formatted (e.g. formatting
+    the code of each kernel separately only formats the modified kernels). The
+    new sources are formatted together with the batch formatter of the language,
+    if registered, or otherwise with a pool of ``max_workers`` processes (only
+    if ``max_workers`` is larger than 1).
+
+    Args:
+        language: Language of the sources.
+        sources: Sources to be formatted.
+        skip_errors: Return the unformatted sources when the formatting fails.
+        max_workers: Maximum number of processes for non-batch formatters.
+        **kwargs: Formatter options.
+
+    """
+
+    sources = list(sources)
     formatter = SOURCE_FORMATTERS.get(language, None)
-    try:
-        if formatter:
-            return formatter(source, **kwargs)  # type: ignore # Callable does not support **kwargs
-        else:
-            raise FormattingError(f"Missing formatter for '{language}' language")
-    except Exception as e:
+    if formatter is None:
         if skip_errors:
-            return source
+            return sources
+        raise FormattingError(f"Missing formatter for '{language}' language")
+
+    version_getter = SOURCE_FORMATTER_VERSIONS.get(language, None)
+    version = version_getter() if version_getter is not None else None
+    options = _stable_repr(sorted(kwargs.items()))
+    prefix = (language, version or f"{id(formatter)}", options)
+
+    results: List[Optional[str]] = []
+    missing: Dict[str, Tuple[str, Optional[str]]] = {}  # memory key -> (source, disk key)
+    for source in sources:
+        key = _content_hash(*prefix, source)
+        result = _formatted_sources.get(key, None)
+        if result is None:
+            disk_key = formatting_cache.key(language, version, options, source)
+            result = formatting_cache.load(disk_key)
+            if isinstance(result, str):
+                _remember_formatted_source(key, result)
+            else:
+                result = None
+                missing[key] = (source, disk_key)
+        results.append(result)
+
+    if missing:
+        new_sources = [source for source, _ in missing.values()]
+        try:
+            formatted_sources = _run_formatter(language, new_sources, max_workers, kwargs)
+        except Exception as e:
+            if not skip_errors:
+                raise FormattingError(
+                    f"Something went wrong when trying to format '{language}' source code"
+                ) from e
+            formatted_sources = [
+                format_source(language, source, skip_errors=True, **kwargs)
+                if len(new_sources) > 1
+                else source
+                for source in new_sources
+            ]
         else:
-            raise FormattingError(
-                f"Something went wrong when trying to format '{language}' source code"
-            ) from e
+            for (key, (_, disk_key)), formatted in zip(missing.items(), formatted_sources):
+                _remember_formatted_source(key, formatted)
+                formatting_cache.store(disk_key, formatted)
+
+        formatted_by_source = dict(zip(new_sources, formatted_sources))
+        results = [
+            formatted_by_source[source] if result is None else result
+            for source, result in zip(sources, results)
+        ]
+
+    return cast(List[str], results)
+
+
+def _run_formatter(
+    language: str, sources: List[str], max_workers: Optional[int], kwargs: Dict[str, Any]
+) -> List[str]:
+    batch_formatter = BATCH_SOURCE_FORMATTERS.get(language, None)
+    if batch_formatter is not None and len(sources) > 1:
+        return batch_formatter(sources, **kwargs)  # type: ignore # Callable without **kwargs
+
+    formatter = functools.partial(SOURCE_FORMATTERS[language], **kwargs)
+    if max_workers is not None and max_workers > 1 and len(sources) > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers) as executor:
+            return list(executor.map(formatter, sources))
+    return [formatter(source) for source in sources]
+
+
+def _remember_formatted_source(key: str, formatted_source: str) -> None:
+    if len(_formatted_sources) >= MAX_FORMATTED_SOURCES_IN_MEMORY:
+        del _formatted_sources[next(iter(_formatted_sources))]
+    _formatted_sources[key] = formatted_source
+
+
+def _stable_repr(value: Any) -> str:
+    # Representation of formatter options independent of the hash seed
+    if isinstance(value, (set, frozenset)):
+        return "{" + ", ".join(sorted(_stable_repr(item) for item in value)) + "}"
+    if isinstance(value, (list, tuple)):
+        return "(" + ", ".join(_stable_repr(item) for item in value) + ")"
+    return repr(value)
 
 
 class Name:
@@ -340,6 +669,18 @@ class TextBlock:
 
 TemplateT = TypeVar("TemplateT", bound="Template")
 
+#: Names giving templates dynamic access to their rendering context
+_DYNAMIC_ACCESS_NAMES = frozenset(["context", "pageargs", "locals", "vars", "eval"])
+
+#: Mako tags forwarding the rendering context to other templates
+_MAKO_DYNAMIC_TAGS = (
+    mako.parsetree.IncludeTag,
+    mako.parsetree.InheritTag,
+    mako.parsetree.NamespaceTag,
+    mako.parsetree.CallNamespaceTag,
+    mako.parsetree.PageTag,
+)
+
 
 @typing.runtime_checkable
 class Template(Protocol):
@@ -403,17 +744,25 @@ class BaseTemplate(Template):
     definition: Any
     definition_loc: Optional[Tuple[str, int]]
 
+    def referenced_names(self) -> Optional[FrozenSet[str]]:
+        """Return the names of the placeholders used by the template.
+
+        The result may contain extra names, but never misses a placeholder
+        used in the template. ``None`` means that the names are unknown
+        (e.g. if the template could access its context dynamically).
+        """
+        return None
+
     def __init__(self) -> None:
         self.definition_loc = None
-        frame = inspect.currentframe()
         try:
-            if frame is not None:
-                (filename, lineno, _, _, _) = inspect.getframeinfo(frame.f_back.f_back)
-                self.definition_loc = (filename, lineno)
+            # Avoid inspect.getframeinfo(), which reads the source file
+            frame = sys._getframe(2)
+            self.definition_loc = (frame.f_code.co_filename, frame.f_lineno)
         except Exception:
             self.definition_loc = None
         finally:
-            del frame
+            frame = None
 
     def __str__(self) -> str:
         result = f"<{type(self).__qualname__}: '{self.definition}'>"
@@ -427,13 +776,30 @@ class FormatTemplate(BaseTemplate):
 
     definition: str
 
+    _code: Optional[types.CodeType]
+
     def __init__(self, definition: str, **kwargs: Any) -> None:
         super().__init__()
         self.definition = f'(f"""{definition}""")'
+        self._code = None
+
+    def referenced_names(self) -> Optional[FrozenSet[str]]:
+        try:
+            tree = ast.parse(self.definition, mode="eval")
+        except SyntaxError:
+            return None
+        names = frozenset(
+            node.id
+            for node in ast.walk(tree)
+            if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load)
+        )
+        return None if names & _DYNAMIC_ACCESS_NAMES else names
 
     def render_values(self, **kwargs: Any) -> str:
         try:
-            result = eval(self.definition, {}, kwargs or {})
+            if self._code is None:
+                self._code = compile(self.definition, f"<{type(self).__name__}>", "eval")
+            result = eval(self._code, {}, kwargs or {})
             assert isinstance(result, str)
             return result
         except Exception as e:
@@ -457,6 +823,16 @@ class StringTemplate(BaseTemplate):
         assert isinstance(definition, string.Template)
         self.definition = definition
 
+    def referenced_names(self) -> Optional[FrozenSet[str]]:
+        names = set()
+        for match in self.definition.pattern.finditer(self.definition.template):
+            if match.group("invalid") is not None:
+                return None
+            name = match.group("named") or match.group("braced")
+            if name is not None:
+                names.add(name)
+        return frozenset(names)
+
     def render_values(self, **kwargs: Any) -> str:
         try:
             return self.definition.substitute(**kwargs)
@@ -473,7 +849,84 @@ class StringTemplate(BaseTemplate):
             raise TemplateRenderingError(message, template=self) from e
 
 
-class JinjaTemplate(BaseTemplate):
+def _names_from_cache_data(data: Tuple[Any, ...]) -> Optional[FrozenSet[str]]:
+    return None if data[-1] is None else frozenset(data[-1])
+
+
+class CompiledTemplate(BaseTemplate):
+    """Base class for adapters of template engines compiling templates to Python code.
+
+    Definitions given as source strings are compiled through the global
+    :data:`template_cache`: definitions found in the cache are not compiled
+    again and their code is only loaded when the template is first used.
+    Subclasses implement the engine-specific methods.
+
+    """
+
+    _definition: Any
+    _source: Optional[str]
+    _cache_key: Optional[str]
+    _names: Optional[FrozenSet[str]]
+
+    @classmethod
+    @abc.abstractmethod
+    def engine_signature(cls) -> Optional[str]:
+        """Identify the engine version and settings (``None`` disables caching)."""
+        pass
+
+    @abc.abstractmethod
+    def compile_source(self, source: str) -> Tuple[Any, Any]:
+        """Compile a template source into a ``(definition, cache data)`` pair.
+
+        The cache data is a tuple whose last item contains the names of the
+        placeholders used in the template (see :meth:`referenced_names`).
+        """
+        pass
+
+    @abc.abstractmethod
+    def load_definition(self, data: Any) -> Any:
+        """Create the template definition from the cached data."""
+        pass
+
+    def referenced_names(self) -> Optional[FrozenSet[str]]:
+        self.definition  # compile or load the template if needed
+        return self._names
+
+    @property
+    def definition(self) -> Any:
+        if self._definition is None:
+            data = template_cache.load(self._cache_key)
+            if data is not None:
+                try:
+                    self._definition = self.load_definition(data)
+                    self._names = _names_from_cache_data(data)
+                except Exception:
+                    self._definition = None
+            if self._definition is None:
+                self._definition = self._compile()
+        return self._definition
+
+    def _init_definition(self, definition: Any) -> None:
+        self._definition = None if isinstance(definition, str) else definition
+        self._source = definition if isinstance(definition, str) else None
+        self._cache_key = None
+        self._names = None
+        if self._source is not None:
+            self._cache_key = template_cache.key(
+                self.engine_signature(), sys.implementation.cache_tag, self._source
+            )
+            if not template_cache.contains(self._cache_key):
+                self._definition = self._compile()
+
+    def _compile(self) -> Any:
+        assert self._source is not None
+        definition, data = self.compile_source(self._source)
+        template_cache.store(self._cache_key, data)
+        self._names = _names_from_cache_data(data)
+        return definition
+
+
+class JinjaTemplate(CompiledTemplate):
     """Template adapter for `jinja2.Template`."""
 
     definition: jinja2.Template
@@ -483,10 +936,8 @@ class JinjaTemplate(BaseTemplate):
     def __init__(self, definition: Union[str, jinja2.Template], **kwargs: Any) -> None:
         super().__init__()
         try:
-            if isinstance(definition, str):
-                definition = self.__jinja_env__.from_string(definition)
-            assert isinstance(definition, jinja2.Template)
-            self.definition = definition
+            self._init_definition(definition)
+            assert isinstance(self._definition, (jinja2.Template, type(None)))
         except Exception as e:
             message = "Error in JinjaTemplate"
             if self.definition_loc:
@@ -499,6 +950,47 @@ class JinjaTemplate(BaseTemplate):
 
             raise TemplateDefinitionError(message, definition=definition) from e
 
+    @classmethod
+    def engine_signature(cls) -> Optional[str]:
+        env = cls.__jinja_env__
+        if callable(env.autoescape):
+            return None
+        settings = (
+            env.block_start_string,
+            env.block_end_string,
+            env.variable_start_string,
+            env.variable_end_string,
+            env.comment_start_string,
+            env.comment_end_string,
+            env.line_statement_prefix,
+            env.line_comment_prefix,
+            env.trim_blocks,
+            env.lstrip_blocks,
+            env.newline_sequence,
+            env.keep_trailing_newline,
+            env.autoescape,
+            env.optimized,
+            sorted(env.extensions),
+        )
+        return f"jinja2-{jinja2.__version__}: {settings!r}"
+
+    def compile_source(
+        self, source: str
+    ) -> Tuple[jinja2.Template, Tuple[types.CodeType, Optional[Tuple[str, ...]]]]:
+        env = self.__jinja_env__
+        template_ast = env.parse(source)
+        names: Optional[Tuple[str, ...]] = None
+        if not any(True for _ in jinja2.meta.find_referenced_templates(template_ast)):
+            names = tuple(sorted(jinja2.meta.find_undeclared_variables(template_ast)))
+        data = (env.compile(template_ast), names)
+        return self.load_definition(data), data
+
+    def load_definition(
+        self, data: Tuple[types.CodeType, Optional[Tuple[str, ...]]]
+    ) -> jinja2.Template:
+        env = self.__jinja_env__
+        return env.template_class.from_code(env, data[0], env.make_globals(None), None)
+
     def render_values(self, **kwargs: Any) -> str:
         try:
             return self.definition.render(**kwargs)
@@ -514,18 +1006,16 @@ class JinjaTemplate(BaseTemplate):
             raise TemplateRenderingError(message, template=self) from e
 
 
-class MakoTemplate(BaseTemplate):
+class MakoTemplate(CompiledTemplate):
     """Template adapter for `mako.template.Template`."""
 
     definition: mako_tpl.Template
 
-    def __init__(self, definition: mako_tpl.Template, **kwargs: Any) -> None:
+    def __init__(self, definition: Union[str, mako_tpl.Template], **kwargs: Any) -> None:
         super().__init__()
         try:
-            if isinstance(definition, str):
-                definition = mako_tpl.Template(definition)
-            assert isinstance(definition, mako_tpl.Template)
-            self.definition = definition
+            self._init_definition(definition)
+            assert isinstance(self._definition, (mako_tpl.Template, type(None)))
         except Exception as e:
             message = "Error in MakoTemplate"
             if self.definition_loc:
@@ -537,6 +1027,42 @@ class MakoTemplate(BaseTemplate):
 
             raise TemplateDefinitionError(message, definition=definition) from e
 
+    @classmethod
+    def engine_signature(cls) -> Optional[str]:
+        return f"mako-{mako.__version__}"
+
+    @staticmethod
+    def _find_names(source: str) -> Optional[Tuple[str, ...]]:
+        names: Set[str] = set()
+        stack = [mako.lexer.Lexer(source).parse()]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, _MAKO_DYNAMIC_TAGS):
+                return None
+            if hasattr(item, "undeclared_identifiers"):
+                names.update(item.undeclared_identifiers())
+            stack.extend(item.get_children())
+        return None if names & _DYNAMIC_ACCESS_NAMES else tuple(sorted(names))
+
+    def compile_source(
+        self, source: str
+    ) -> Tuple[mako_tpl.Template, Tuple[str, types.CodeType, Optional[Tuple[str, ...]]]]:
+        # The uri is embedded in the generated code, so it should not depend on the instance
+        uri = f"memory:{self._cache_key[:16]}" if self._cache_key else None
+        template = mako_tpl.Template(source, uri=uri)
+        code = compile(template.code, template.module_id, "exec")
+        return template, (template.code, code, self._find_names(source))
+
+    def load_definition(
+        self, data: Tuple[str, types.CodeType, Optional[Tuple[str, ...]]]
+    ) -> mako_tpl.Template:
+        module_source, code, _ = data
+        module = types.ModuleType(code.co_filename)
+        exec(code, module.__dict__, module.__dict__)
+        return mako_tpl.ModuleTemplate(
+            module, module_source=module_source, template_source=self._source
+        )
+
     def render_values(self, **kwargs: Any) -> str:
         try:
             result = self.definition.render(**kwargs)
@@ -601,15 +1127,88 @@ class TemplatedGenerator(NodeVisitor):
     :meth:`generic_visit()` at the end with additional keyword arguments which will
     be forwarded to the node template.
 
+    Rendering is specialized for each node class the first time it is found:
+    templates only receive the keys they use (according to
+    :meth:`BaseTemplate.referenced_names`), and the ``_children`` and ``_impl``
+    dicts are only built if needed. Since the visit of a child node whose result is
+    not used by the template can only matter for its side effects, these children
+    are not visited at all in ``context_free`` generators. Subclasses redefining
+    :meth:`get_template`, :meth:`render_template`, :meth:`transform_children`
+    or :meth:`transform_impl_fields` always use the generic rendering process.
+
+    Large outputs can be emitted in chunks with :meth:`iter_apply` or
+    :meth:`apply_to`, instead of being built as a single string. In
+    ``context_free`` generators, the rendering of the instances of the node
+    classes given in the ``streamed_types`` class keyword argument is then
+    deferred until their text is emitted, so the memory used does not grow
+    with the output size::
+
+        class Generator(TemplatedGenerator, context_free=True, streamed_types=(Kernel,)):
+            ...
+
+    Templates receive placeholder strings instead of the results of these
+    nodes, so only the classes whose text is inserted verbatim by the
+    templates and visitor methods of their parents (interpolated, joined or
+    concatenated, but not inspected or transformed) should be streamed.
+    Templates dropping or splitting the placeholders are rendered again
+    without deferred nodes, but other changes cannot be detected.
+
+    The rendering of equal subtrees can be memoized for the node classes given
+    in the ``memoized_types`` class keyword argument::
+
+        class Generator(TemplatedGenerator, memoized_types=(Literal, FieldAccess)):
+            ...
+
+    Results are reused for nodes with the same :func:`eve.concepts.structural_hash`
+    (confirmed with :func:`eve.concepts.structural_eq`), equal keyword arguments
+    (compared by identity if they are not hashable) and the same value of
+    :meth:`render_memo_key`. Therefore, only the classes whose rendering depends
+    on nothing else (e.g. not on implementation fields or on the generator state)
+    should be memoized, unless :meth:`render_memo_key` is redefined to account for
+    the rest of the context (e.g. symbol references resolved in different scopes).
+    Deferred nodes in streaming visits are not memoized, nor the nodes whose
+    text contains deferred nodes.
+
     """
 
     __templates__: ClassVar[Mapping[str, Template]]
 
+    #: Cache of the (template, template key) pairs found for each node class
+    __templates_table__: ClassVar[Dict[type, Tuple[Optional[Template], Optional[str]]]]
+
+    #: Cache of the render functions specialized for each node class
+    __renderers__: ClassVar[Dict[type, _NodeRenderer]]
+
+    #: Nodes with deferred rendering in the current streaming visit (see :meth:`iter_visit`)
+    _deferred_nodes_: Optional[List[Tuple[_NodeRenderer, Node, Dict[str, Any]]]] = None
+
+    #: Node classes with memoized rendering (see ``memoized_types``)
+    __memoized_types__: ClassVar[Tuple[Type[Node], ...]] = ()
+
+    #: Node classes with deferred rendering in streaming visits (see ``streamed_types``)
+    __streamed_types__: ClassVar[Tuple[Type[Node], ...]] = ()
+
+    #: Memoized rendering results (and the values they depend on) by structural key
+    _render_memo_: Optional[
+        Dict[Any, Tuple[Node, Dict[str, Any], Any, Union[str, Collection[str]]]]
+    ] = None
+
     @classmethod
-    def __init_subclass__(cls, *, inherit_templates: bool = True, **kwargs: Any) -> None:
+    def __init_subclass__(
+        cls,
+        *,
+        inherit_templates: bool = True,
+        memoized_types: Optional[Tuple[Type[Node], ...]] = None,
+        streamed_types: Optional[Tuple[Type[Node], ...]] = None,
+        **kwargs: Any,
+    ) -> None:
         super().__init_subclass__(**kwargs)  # type: ignore  # mypy issues 4335, 4660
         if "__templates__" in cls.__dict__:
             raise TypeError(f"Invalid '__templates__' member in class {cls}")
+        if memoized_types is not None:
+            cls.__memoized_types__ = _check_node_types("memoized_types", memoized_types)
+        if streamed_types is not None:
+            cls.__streamed_types__ = _check_node_types("streamed_types", streamed_types)
 
         templates: Dict[str, Template] = {}
         if inherit_templates:
@@ -629,6 +1228,8 @@ class TemplatedGenerator(NodeVisitor):
         )
 
         cls.__templates__ = types.MappingProxyType(templates)
+        cls.__templates_table__ = {}
+        cls.__renderers__ = {}
 
     @classmethod
     def apply(cls, root: TreeNode, **kwargs: Any) -> Union[str, Collection[str]]:
@@ -647,6 +1248,79 @@ class TemplatedGenerator(NodeVisitor):
         """
         return cast(Union[str, Collection[str]], cls().visit(root, **kwargs))
 
+    @classmethod
+    def iter_apply(cls, root: TreeNode, **kwargs: Any) -> Iterator[str]:
+        """Build a class instance and generate the code of an IR node in chunks.
+
+        The chunks are the text of the result of :meth:`apply` (or of the
+        concatenation of its items if the result is a collection), without
+        the postprocessing done in :meth:`apply` by subclasses (e.g. formatting).
+        See :meth:`iter_visit` for details.
+        """
+        return cls().iter_visit(root, **kwargs)
+
+    @classmethod
+    def apply_to(cls, root: TreeNode, sink: IO[str], **kwargs: Any) -> None:
+        """Write the code generated for an IR node to a text sink (see :meth:`iter_apply`)."""
+        write = sink.write
+        for chunk in cls.iter_apply(root, **kwargs):
+            write(chunk)
+
+    def iter_visit(self, node: TreeNode, **kwargs: Any) -> Iterator[str]:
+        """Visit an IR node and yield the generated text in chunks.
+
+        In ``context_free`` generators, the instances of the ``streamed_types``
+        classes are rendered when their text is reached, so only the text of
+        the nodes being rendered is kept in memory (see class documentation).
+        Other generators render the whole tree before yielding any chunk.
+        """
+        if not (self.__context_free__ and self.__streamed_types__):
+            yield from _iter_text_items(self.visit(node, **kwargs))
+            return
+
+        self._deferred_nodes_ = []
+        try:
+            for text in _iter_text_items(self.visit(node, **kwargs)):
+                stack = [iter(self._split_deferred(text, lambda: self.visit(node, **kwargs)))]
+                while stack:
+                    for item in stack[-1]:
+                        if isinstance(item, str):
+                            if item:
+                                yield item
+                        else:
+                            renderer, child, child_kwargs = self._deferred_nodes_[item]
+                            rendered = renderer(self, child, child_kwargs)
+                            parts = self._split_deferred(
+                                rendered, lambda: renderer(self, child, child_kwargs)
+                            )
+                            stack.append(iter(parts))
+                            break
+                    else:
+                        stack.pop()
+        finally:
+            self._deferred_nodes_ = None
+
+    def _defer_node(self, renderer: _NodeRenderer, node: Node, kwargs: Dict[str, Any]) -> str:
+        assert self._deferred_nodes_ is not None
+        self._deferred_nodes_.append((renderer, node, kwargs))
+        return f"{_DEFERRED_START}{len(self._deferred_nodes_) - 1}{_DEFERRED_END}"
+
+    def _split_deferred(self, text: str, render_again: Callable[[], Any]) -> List[Any]:
+        """Split a text into strings and indices of deferred nodes (in even and odd positions)."""
+        parts: List[Any] = _DEFERRED_NODE_RE.split(text)
+        for i in range(0, len(parts), 2):
+            if _DEFERRED_START in parts[i] or _DEFERRED_END in parts[i]:
+                # Mangled placeholders: render the text again without deferred nodes
+                deferred_nodes = self._deferred_nodes_
+                self._deferred_nodes_ = None
+                try:
+                    return list(_iter_text_items(render_again()))
+                finally:
+                    self._deferred_nodes_ = deferred_nodes
+        for i in range(1, len(parts), 2):
+            parts[i] = int(parts[i])
+        return parts
+
     @classmethod
     def generic_dump(cls, node: TreeNode, **kwargs: Any) -> str:
         """Class-specific ``dump()`` function for primitive types.
@@ -658,24 +1332,16 @@ class TemplatedGenerator(NodeVisitor):
     def generic_visit(self, node: TreeNode, **kwargs: Any) -> Union[str, Collection[str]]:
         result: Union[str, Collection[str]] = ""
         if isinstance(node, Node):
-            template, key = self.get_template(node)
-            if template:
-                try:
-                    result = self.render_template(
-                        template,
-                        node,
-                        self.transform_children(node, **kwargs),
-                        self.transform_impl_fields(node, **kwargs),
-                        **kwargs,
-                    )
-                except TemplateRenderingError as e:
-                    # Raise a new exception with extra information keeping the original cause
-                    raise TemplateRenderingError(
-                        f"Error in '{key}' template when rendering node '{node}'.\n"
-                        + getattr(e, "message", str(e)),
-                        **e.info,
-                        node=node,
-                    ) from e.__cause__
+            try:
+                renderer = self.__renderers__[node.__class__]
+            except KeyError:
+                renderer = self._make_renderer(node.__class__)
+            if self._deferred_nodes_ is not None and isinstance(node, self.__streamed_types__):
+                result = self._defer_node(renderer, node, kwargs)
+            elif self.__memoized_types__ and isinstance(node, self.__memoized_types__):
+                result = self._render_memoized(renderer, node, kwargs)
+            else:
+                result = renderer(self, node, kwargs)
 
         elif isinstance(
             node, (collections.abc.Sequence, collections.abc.Set)
@@ -688,18 +1354,108 @@ class TemplatedGenerator(NodeVisitor):
 
         return result
 
+    def render_memo_key(self, node: Node, **kwargs: Any) -> Any:
+        """Return the extra context (besides its subtree and `kwargs`) a node rendering depends on.
+
+        It is only called for instances of the ``memoized_types`` classes and the
+        rendering results are only reused for nodes with the same value (compared
+        by identity if it is not hashable). The default implementation returns ``None``.
+        """
+        return None
+
+    def _render_memoized(
+        self, renderer: _NodeRenderer, node: Node, kwargs: Dict[str, Any]
+    ) -> Union[str, Collection[str]]:
+        context = self.render_memo_key(node, **kwargs)
+        if self._render_memo_ is None:
+            self._render_memo_ = {}
+        try:
+            key = (
+                node.__class__,
+                concepts.structural_hash(node),
+                _render_memo_value_key(context),
+                *((name, _render_memo_value_key(value)) for name, value in kwargs.items()),
+            )
+            entry = self._render_memo_.get(key, None)
+        except TypeError:
+            # Unhashable values in the subtree or inside the arguments
+            return renderer(self, node, kwargs)
+
+        if entry is not None and concepts.structural_eq(entry[0], node):
+            return entry[3]
+
+        result = renderer(self, node, kwargs)
+        if self._deferred_nodes_ is not None and not (
+            isinstance(result, str) and _DEFERRED_START not in result
+        ):
+            # Placeholders of deferred nodes are only valid in the current streaming visit
+            return result
+        # Keep the values compared by identity alive while the results are reused
+        self._render_memo_[key] = (node, kwargs, context, result)
+        return result
+
     def get_template(self, node: TreeNode) -> Tuple[Optional[Template], Optional[str]]:
         """Get a template for a node instance (see class documentation)."""
+        if isinstance(node, Node):
+            return self._find_template(node.__class__)
+        return None, None
+
+    @classmethod
+    def _find_template(cls, node_class: Type[Node]) -> Tuple[Optional[Template], Optional[str]]:
+        try:
+            return cls.__templates_table__[node_class]
+        except KeyError:
+            pass
+
         template: Optional[Template] = None
         template_key: Optional[str] = None
-        if isinstance(node, Node):
-            for node_class in node.__class__.__mro__:
-                template_key = node_class.__name__
-                template = self.__templates__.get(template_key, None)
-                if template is not None or node_class is Node:
-                    break
+        for base in node_class.__mro__:
+            template_key = base.__name__
+            template = cls.__templates__.get(template_key, None)
+            if template is not None or base is Node:
+                break
+        cls.__templates_table__[node_class] = (
+            template,
+            None if template is None else template_key,
+        )
+
+        return cls.__templates_table__[node_class]
 
-        return template, None if template is None else template_key
+    @classmethod
+    def _make_renderer(cls, node_class: Type[Node]) -> _NodeRenderer:
+        """Create the render function of a node class and store it in the cache."""
+        if any(
+            getattr(cls, name) is not getattr(TemplatedGenerator, name)
+            for name in _CUSTOMIZABLE_RENDERING_METHODS
+        ):
+            renderer = TemplatedGenerator._render_node
+        else:
+            template, key = cls._find_template(node_class)
+            if template is None:
+                renderer = _render_nothing
+            else:
+                assert key is not None
+                renderer = _make_template_renderer(
+                    template, key, node_class, prune_children=cls.__context_free__
+                )
+        cls.__renderers__[node_class] = renderer
+        return renderer
+
+    def _render_node(self, node: Node, kwargs: Dict[str, Any]) -> str:
+        """Render a node using the (customizable) generic rendering process."""
+        template, key = self.get_template(node)
+        if not template:
+            return ""
+        try:
+            return self.render_template(
+                template,
+                node,
+                self.transform_children(node, **kwargs),
+                self.transform_impl_fields(node, **kwargs),
+                **kwargs,
+            )
+        except TemplateRenderingError as e:
+            raise _add_rendering_error_info(e, key, node) from e.__cause__
 
     def render_template(
         self,
@@ -727,3 +1483,137 @@ class TemplatedGenerator(NodeVisitor):
 
     def transform_impl_fields(self, node: Node, **kwargs: Any) -> Dict[str, Any]:
         return {key: self.visit(value, **kwargs) for key, value in node.iter_impl_fields()}
+
+
+_NodeRenderer = Callable[[TemplatedGenerator, Node, Dict[str, Any]], str]
+
+_CUSTOMIZABLE_RENDERING_METHODS = (
+    "get_template",
+    "render_template",
+    "transform_children",
+    "transform_impl_fields",
+)
+
+
+#: Delimiters of the placeholders of deferred nodes (Unicode private use characters)
+_DEFERRED_START = "\ue000"
+_DEFERRED_END = "\ue001"
+_DEFERRED_NODE_RE = re.compile(f"{_DEFERRED_START}(\\d+){_DEFERRED_END}")
+
+
+def _check_node_types(name: str, value: Any) -> Tuple[Type[Node], ...]:
+    if not (
+        isinstance(value, tuple) and all(isinstance(t, type) and issubclass(t, Node) for t in value)
+    ):
+        raise TypeError(f"Invalid '{name}' value ({value}): use a tuple of node types")
+    return value
+
+
+def _iter_text_items(result: Any) -> Iterator[str]:
+    if isinstance(result, str):
+        yield result
+    elif isinstance(result, collections.abc.Iterable) and not isinstance(
+        result, collections.abc.Mapping
+    ):
+        for item in result:
+            yield from _iter_text_items(item)
+    else:
+        raise TypeError(f"Generated code cannot be emitted in chunks: {result!r}")
+
+
+#: Marker of the values compared by identity in the keys of memoized rendering results
+_BY_IDENTITY = object()
+
+
+def _render_memo_value_key(value: Any) -> Any:
+    if type(value).__hash__ is None:
+        return (_BY_IDENTITY, id(value))
+    return value
+
+
+def _render_nothing(generator: TemplatedGenerator, node: Node, kwargs: Dict[str, Any]) -> str:
+    return ""
+
+
+def _add_rendering_error_info(
+    error: TemplateRenderingError, key: Optional[str], node: Node
+) -> TemplateRenderingError:
+    # New exception with extra information (the caller should keep the original cause)
+    return TemplateRenderingError(
+        f"Error in '{key}' template when rendering node '{node}'.\n"
+        + getattr(error, "message", str(error)),
+        **error.info,
+        node=node,
+    )
+
+
+def _make_template_renderer(
+    template: Template, key: str, node_class: Type[Node], *, prune_children: bool
+) -> _NodeRenderer:
+    """Create a function rendering the nodes of a class with a template.
+
+    The function is equivalent to :meth:`TemplatedGenerator._render_node`
+    with the default rendering methods, but it only passes the keys used by
+    the template (and only visits the children used by the template if
+    ``prune_children`` is set).
+    """
+    names = template.referenced_names() if isinstance(template, BaseTemplate) else None
+
+    def is_used(name: str) -> bool:
+        return names is None or name in names
+
+    children_names = node_class.__node_children_names__
+    impl_names = node_class.__node_impl_fields_names__
+    visited_names = tuple(
+        name
+        for name in children_names + impl_names
+        if not prune_children
+        or is_used(name)
+        or is_used("_children" if name in children_names else "_impl")
+    )
+    passed_names = tuple(name for name in visited_names if is_used(name))
+    pass_children = is_used("_children")
+    pass_impl = is_used("_impl")
+    pass_node = is_used("_this_node")
+    pass_generator = is_used("_this_generator")
+    pass_module = is_used("_this_module")
+
+    getter = operator.attrgetter(*visited_names) if visited_names else lambda node: ()
+    single_value = len(visited_names) == 1
+    render = (
+        template.render_values
+        if getattr(type(template), "render", None) is Template.render
+        else template.render
+    )
+
+    def _render_template(
+        generator: TemplatedGenerator, node: Node, kwargs: Dict[str, Any]
+    ) -> str:
+        try:
+            visit = generator.visit
+            values = getter(node)
+            if single_value:
+                values = (values,)
+            results = {
+                name: visit(value, **kwargs) for name, value in zip(visited_names, values)
+            }
+            mapping = (
+                results
+                if len(passed_names) == len(visited_names)
+                else {name: results[name] for name in passed_names}
+            )
+            if pass_children:
+                mapping["_children"] = {name: results[name] for name in children_names}
+            if pass_impl:
+                mapping["_impl"] = {name: results[name] for name in impl_names}
+            if pass_node:
+                mapping["_this_node"] = node
+            if pass_generator:
+                mapping["_this_generator"] = generator
+            if pass_module:
+                mapping["_this_module"] = sys.modules[type(generator).__module__]
+            return render(**mapping, **kwargs)
+        except TemplateRenderingError as e:
+            raise _add_rendering_error_info(e, key, node) from e.__cause__
+
+    return _render_template
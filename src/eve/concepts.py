@@ -19,27 +19,47 @@
 
 from __future__ import annotations
 
+import collections.abc
+import contextlib
+import contextvars
+import copy
+import enum
 import functools
+import hashlib
+import operator
+import pickle
+import sys
+import weakref
 
 import pydantic
 import pydantic.generics
+import pydantic.typing
+import typing_inspect
+import xxhash
+from packaging.version import parse as parse_version
 
 from . import iterators, utils
 from .type_definitions import NOTHING, IntEnum, Str, StrEnum
 from .typingx import (
     Any,
     AnyNoArgCallable,
+    Callable,
     ClassVar,
+    Collection,
     Dict,
-    Generator,
+    FrozenSet,
+    Iterable,
+    Iterator,
     List,
     Optional,
+    Sequence,
     Set,
     Tuple,
     Type,
     TypedDict,
     TypeVar,
     Union,
+    cast,
     no_type_check,
 )
 
@@ -102,9 +122,82 @@ in_field = functools.partial(field, kind=FieldKind.INPUT)
 out_field = functools.partial(field, kind=FieldKind.OUTPUT)
 
 
+#: Counter of in-place tree modifications invalidating all cached node properties
+_node_property_epoch = 0
+
+
+def invalidate_node_properties() -> None:
+    """Invalidate the cached properties of all nodes after modifying trees in place.
+
+    See :class:`cached_node_property`.
+    """
+    global _node_property_epoch
+    _node_property_epoch += 1
+
+
+class cached_node_property:  # noqa: N801  # decorator name follows functools.cached_property
+    """Decorator for node properties computed on first access and cached in the node.
+
+    Cached values are treated like implementation data (not children)
+    and are recomputed lazily after any children field of the node is
+    reassigned or its subtree is modified by a :class:`eve.NodeMutator`.
+    Other in-place modifications (e.g. appending to a list field, or
+    reassigning a field of a descendant) are not detected: the cached
+    values of the modified node and of all its ancestors become stale
+    until :func:`invalidate_node_properties` is called. Cached values are
+    shared by all the callers and should not be modified.
+
+    Examples:
+        >>> class Block(Node):
+        ...     names: List[str]
+        ...
+        ...     @cached_node_property
+        ...     def names_set(self):
+        ...         return set(self.names)
+        >>> block = Block(names=["a", "b"])
+        >>> block.names_set is block.names_set
+        True
+        >>> block.names = ["c"]
+        >>> block.names_set
+        {'c'}
+
+    """
+
+    def __init__(self, func: Callable[[Any], Any]) -> None:
+        self.func = func
+        self.name = func.__name__
+        self.__doc__ = func.__doc__
+
+    def __set_name__(self, owner: Type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, node: Optional[BaseNode], owner: Optional[Type] = None) -> Any:
+        if node is None:
+            return self
+        epoch = _node_property_epoch
+        cache = node._node_property_cache
+        if cache is None:
+            cache = {}
+            object.__setattr__(node, "_node_property_cache", cache)
+        else:
+            entry = cache.get(self.name, None)
+            if entry is not None and entry[0] == epoch:
+                return entry[1]
+
+        value = self.func(node)
+        cache[self.name] = (epoch, value)
+        return value
+
+
 # -- Models --
 class BaseModelConfig:
     extra = "forbid"
+    keep_untouched = (cached_node_property,)
+    # Models used as field values are stored by reference, as in pydantic < 1.9
+    # (required to share subtrees between trees, e.g. in copy-on-write translations)
+    copy_on_model_validation = (
+        "none" if parse_version(pydantic.VERSION) >= parse_version("1.10") else False
+    )
 
 
 class FrozenModelConfig(BaseModelConfig):
@@ -121,7 +214,98 @@ class FrozenModel(pydantic.BaseModel):
         pass
 
 
+# -- Validation --
+class ValidationLevel(IntEnum):
+    """Amount of validation performed when creating new nodes.
+
+    * ``FULL``: all field and root validators run at construction (default).
+    * ``DEFERRED``: nodes are created without validation and marked as
+      pending, to be validated later by :func:`validate_tree`.
+    * ``TRUSTED``: nodes are created without any validation (like
+      :meth:`pydantic.BaseModel.construct`). Only use it when the input
+      data is known to be valid, since values are not converted either.
+
+    Root validators computing derived values (e.g. the symbol tables of
+    :class:`eve.SymbolTableTrait`) run with every level if they are marked
+    with :func:`computes_derived_values`.
+
+    """
+
+    TRUSTED = 0
+    DEFERRED = 1
+    FULL = 2
+
+
+_validation_level: contextvars.ContextVar[ValidationLevel] = contextvars.ContextVar(
+    "eve_validation_level", default=ValidationLevel.FULL
+)
+
+
+def get_validation_level() -> ValidationLevel:
+    """Return the validation level used for new nodes in the current context."""
+    return _validation_level.get()
+
+
+def set_validation_level(level: ValidationLevel) -> None:
+    """Set the validation level used for new nodes in the current context."""
+    _validation_level.set(ValidationLevel(level))
+
+
+@contextlib.contextmanager
+def validation_level(level: ValidationLevel) -> Iterator[None]:
+    """Context manager to create nodes with a specific validation level.
+
+    Examples:
+        >>> with validation_level(ValidationLevel.TRUSTED):
+        ...     node = Node()
+        >>> get_validation_level()
+        <ValidationLevel.FULL: 2>
+
+    """
+    token = _validation_level.set(ValidationLevel(level))
+    try:
+        yield
+    finally:
+        _validation_level.reset(token)
+
+
+def computes_derived_values(validator: Callable[..., Any]) -> Callable[..., Any]:
+    """Mark a root validator to run also for nodes created without validation.
+
+    It should be used (below ``pydantic.root_validator``) for root validators
+    filling in values derived from other fields, which would be missing in nodes
+    created with ``DEFERRED`` or ``TRUSTED`` validation otherwise.
+    """
+    validator.__eve_derived_values__ = True  # type: ignore  # function attribute
+    return validator
+
+
+def validate_tree(tree: TreeNode) -> TreeNode:
+    """Validate all the nodes of a tree created with ``DEFERRED`` validation.
+
+    Nodes are validated bottom-up, so root validators see already
+    validated children. Validation errors raise the same
+    :class:`pydantic.ValidationError` exceptions as a regular construction.
+    Nodes created by the validators (e.g. when trying the alternatives of
+    ``Union`` fields) are fully validated, whatever the current level.
+
+    Returns:
+        The input tree (validated nodes are updated in place).
+
+    """
+    pending_nodes = [
+        node
+        for node in iterators.iter_tree_post(tree).if_isinstance(BaseNode)
+        if node._pending_validation
+    ]
+    with validation_level(ValidationLevel.FULL):
+        for node in pending_nodes:
+            node._validate_pending()
+    return tree
+
+
 # -- Nodes --
+_DERIVED_VALUES_ATTR = "__eve_derived_values__"
 _EVE_NODE_INTERNAL_SUFFIX = "__"
 _EVE_NODE_IMPL_SUFFIX = "_"
 
@@ -131,6 +315,12 @@ LeafNode = Union[AnyNode, ValueNode]
 TreeNode = Union[AnyNode, Union[List[LeafNode], Dict[Any, LeafNode], Set[LeafNode]]]
 
 
+#: Counter of created node classes (used to invalidate caches depending on node types)
+_node_classes_version = 0
+
+_reachable_types_cache: Dict[Type, Optional[FrozenSet[Type]]] = {}
+
+
 class NodeMetaclass(pydantic.main.ModelMetaclass):
     """Custom metaclass for Node classes.
 
@@ -159,8 +349,51 @@ class NodeMetaclass(pydantic.main.ModelMetaclass):
         cls.__node_impl_fields__ = impl_fields_metadata
         cls.__node_children__ = children_metadata
 
+        # Precomputed field names and accessors for fast iteration
+        cls.__node_impl_fields_names__ = tuple(impl_fields_metadata.keys())
+        cls.__node_children_names__ = tuple(children_metadata.keys())
+        cls.__node_impl_fields_getter__ = staticmethod(
+            _make_fields_getter(cls.__node_impl_fields_names__)
+        )
+        cls.__node_children_getter__ = staticmethod(
+            _make_fields_getter(cls.__node_children_names__)
+        )
+
+        # Root validators running also without validation (see computes_derived_values())
+        cls.__node_pre_derived_values_validators__ = tuple(
+            func for func in cls.__pre_root_validators__ if hasattr(func, _DERIVED_VALUES_ATTR)
+        )
+        cls.__node_post_derived_values_validators__ = tuple(
+            func
+            for _, func in cls.__post_root_validators__
+            if hasattr(func, _DERIVED_VALUES_ATTR)
+        )
+
+        # New node classes change the results of the static analysis of node types
+        global _node_classes_version
+        _node_classes_version += 1
+        _reachable_types_cache.clear()
+
         return cls
 
+    @no_type_check
+    def __call__(cls, *args, **kwargs):
+        node = super().__call__(*args, **kwargs)
+        if cls.__node_interned__:
+            node = _intern_node(node)
+        return node
+
+
+def _make_fields_getter(names: Tuple[str, ...]) -> Callable[[Any], Tuple[Any, ...]]:
+    # operator.attrgetter() only returns a tuple when called with several attributes
+    if len(names) > 1:
+        return operator.attrgetter(*names)
+    elif len(names) == 1:
+        getter = operator.attrgetter(names[0])
+        return lambda node: (getter(node),)
+    else:
+        return lambda node: ()
+
 
 class BaseNode(pydantic.BaseModel, metaclass=NodeMetaclass):
     """Base class representing an IR node.
@@ -192,36 +425,113 @@ class BaseNode(pydantic.BaseModel, metaclass=NodeMetaclass):
 
     __node_impl_fields__: ClassVar[NodeImplFieldMetadataDict]
     __node_children__: ClassVar[NodeChildrenMetadataDict]
+    __node_impl_fields_names__: ClassVar[Tuple[str, ...]]
+    __node_children_names__: ClassVar[Tuple[str, ...]]
+    __node_impl_fields_getter__: ClassVar[Callable[[BaseNode], Tuple[Any, ...]]]
+    __node_children_getter__: ClassVar[Callable[[BaseNode], Tuple[Any, ...]]]
+    __node_pre_derived_values_validators__: ClassVar[Tuple[Callable[..., Any], ...]]
+    __node_post_derived_values_validators__: ClassVar[Tuple[Callable[..., Any], ...]]
+    __node_interned__: ClassVar[bool] = False
 
     # Node fields
-    #: Unique node-id (implementation field)
+    #: Unique node-id (implementation field, generated on first access)
     id_: Optional[Str] = None
 
-    @pydantic.validator("id_", pre=True, always=True)
-    def _id_validator(cls: Type[AnyNode], v: Optional[str]) -> str:  # type: ignore  # validators are classmethods
-        if v is None:
-            v = utils.UIDGenerator.sequential_id(prefix=cls.__qualname__)
-        if not isinstance(v, str):
+    #: True if the node was created with deferred validation and not validated yet
+    _pending_validation: bool = pydantic.PrivateAttr(default=False)
+
+    #: Values of the cached node properties: name -> (mutation epoch, value)
+    _node_property_cache: Optional[Dict[str, Tuple[int, Any]]] = pydantic.PrivateAttr(
+        default=None
+    )
+
+    def __init__(__pydantic_self__, **data: Any) -> None:  # noqa: N805  # pydantic convention
+        level = _validation_level.get()
+        if level is ValidationLevel.FULL:
+            super().__init__(**data)
+            return
+
+        # Construct the node like pydantic.BaseModel.construct(), without validation
+        node_class = __pydantic_self__.__class__
+        for validator in node_class.__node_pre_derived_values_validators__:
+            data = validator(node_class, data)
+        values = {}
+        for name, model_field in __pydantic_self__.__fields__.items():
+            if name in data:
+                values[name] = data[name]
+            elif not model_field.required:
+                values[name] = model_field.get_default()
+        values["id_"] = __pydantic_self__._id_validator(values.get("id_", None))
+        for validator in node_class.__node_post_derived_values_validators__:
+            values = validator(node_class, values)
+
+        object.__setattr__(__pydantic_self__, "__dict__", values)
+        object.__setattr__(__pydantic_self__, "__fields_set__", set(data.keys()))
+        __pydantic_self__._init_private_attributes()
+        if level is ValidationLevel.DEFERRED:
+            __pydantic_self__._pending_validation = True
+
+    def _validate_pending(self) -> None:
+        values, _, error = pydantic.validate_model(self.__class__, self.__dict__)
+        if error:
+            raise error
+        object.__setattr__(self, "__dict__", values)
+        object.__setattr__(self, "_node_property_cache", None)
+        self._pending_validation = False
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if self._node_property_cache and name in self.__node_children__:
+            object.__setattr__(self, "_node_property_cache", None)
+
+    def copy(self: AnyNode, **kwargs: Any) -> AnyNode:
+        if kwargs == {"deep": True} and not isinstance(self, FrozenNode):
+            # Frozen subtrees are shared (see clone_tree()). Like the pydantic
+            # deep copies, the copied nodes get the ids of the original ones
+            return cast(AnyNode, _clone_subtree(self, generate_ids=True))
+        result = super().copy(**kwargs)
+        object.__setattr__(result, "_node_property_cache", None)
+        return result
+
+    def __getstate__(self) -> Dict[str, Any]:
+        _get_node_id(self)
+        return super().__getstate__()
+
+    def __setstate__(self, state: Any) -> None:
+        super().__setstate__(state)
+        object.__setattr__(self, "_node_property_cache", None)
+
+    def __iter__(self) -> Iterator[Tuple[str, Any]]:  # type: ignore  # pydantic signature
+        _get_node_id(self)
+        return super().__iter__()
+
+    def __repr_args__(self) -> Sequence[Tuple[Optional[str], Any]]:
+        _get_node_id(self)
+        return super().__repr_args__()
+
+    def _iter(self, *args: Any, **kwargs: Any) -> Iterator[Tuple[str, Any]]:  # type: ignore
+        # Used by dict(), json(), copy() and comparisons of pydantic models
+        _get_node_id(self)
+        return super()._iter(*args, **kwargs)
+
+    @pydantic.validator("id_", pre=True)
+    def _id_validator(cls: Type[AnyNode], v: Optional[str]) -> Optional[str]:  # type: ignore  # validators are classmethods
+        if v is not None and not isinstance(v, str):
             raise TypeError(f"id_ is not an 'str' instance ({type(v)})")
         return v
 
-    def iter_impl_fields(self) -> Generator[Tuple[str, Any], None, None]:
-        for name, _ in self.__fields__.items():
-            if name.endswith(_EVE_NODE_IMPL_SUFFIX) and not name.endswith(
-                _EVE_NODE_INTERNAL_SUFFIX
-            ):
-                yield name, getattr(self, name)
+    def iter_impl_fields(self) -> Iterator[Tuple[str, Any]]:
+        node_class = self.__class__
+        return zip(
+            node_class.__node_impl_fields_names__, node_class.__node_impl_fields_getter__(self)
+        )
 
-    def iter_children(self) -> Generator[Tuple[str, Any], None, None]:
-        for name, _ in self.__fields__.items():
-            if not (
-                name.endswith(_EVE_NODE_IMPL_SUFFIX) or name.endswith(_EVE_NODE_INTERNAL_SUFFIX)
-            ):
-                yield name, getattr(self, name)
+    def iter_children(self) -> Iterator[Tuple[str, Any]]:
+        node_class = self.__class__
+        return zip(node_class.__node_children_names__, node_class.__node_children_getter__(self))
 
-    def iter_children_values(self) -> Generator[Any, None, None]:
-        for _, node in self.iter_children():
-            yield node
+    def iter_children_values(self) -> Iterator[Any]:
+        return iter(self.__class__.__node_children_getter__(self))
 
     def iter_tree_pre(self) -> utils.XIterator:
         return iterators.iter_tree_pre(self)
@@ -238,6 +548,32 @@ class BaseNode(pydantic.BaseModel, metaclass=NodeMetaclass):
         pass
 
 
+def _get_node_id(node: BaseNode) -> str:
+    # Unique ids are only generated (and stored) when they are actually used
+    node_id = node.__dict__.get("id_", None)
+    if node_id is None:
+        node_id = utils.UIDGenerator.sequential_id(prefix=node.__class__.__qualname__)
+        node.__dict__["id_"] = node_id
+    return node_id
+
+
+class _NodeIdDescriptor:
+    """Data descriptor of the ``id_`` field of nodes (taking precedence over ``__dict__``)."""
+
+    def __get__(self, node: Optional[BaseNode], owner: Optional[Type] = None) -> Any:
+        if node is None:
+            # Like other fields, not available as class attribute (pydantic relies on it)
+            raise AttributeError("id_")
+        return _get_node_id(node)
+
+    def __set__(self, node: BaseNode, value: Optional[str]) -> None:
+        node.__dict__["id_"] = value
+
+
+# pydantic removes the fields from the class namespace, so the descriptor is added afterwards
+BaseNode.id_ = _NodeIdDescriptor()  # type: ignore
+
+
 class GenericNode(BaseNode, pydantic.generics.GenericModel):
     pass
 
@@ -249,12 +585,741 @@ class Node(BaseNode):
 
 
 class FrozenNode(Node):
-    """Default public name for an inmutable base node class."""
+    """Default public name for an inmutable base node class.
+
+    Frozen nodes are hashable and compared by structure (see
+    :func:`structural_hash` and :func:`structural_eq`), ignoring the
+    implementation fields. The hash is computed once and cached in the
+    node, so children nodes should not be modified after creation.
+
+    Subclasses defined with the ``interned=True`` class keyword argument
+    are hash-consed: creating a node structurally equal to an existing one
+    returns the existing instance (including its ``id_``), and deep copies
+    return the node itself. Interned classes cannot have implementation
+    fields other than ``id_``::
+
+        class NeighborChain(FrozenNode, interned=True):
+            elements: Tuple[LocationType, ...]
+
+    Nodes created with deferred validation or with :meth:`copy` are not
+    interned.
+    """
+
+    __slots__ = ("__weakref__",)
+
+    #: Cached structural hash of the node
+    _structural_hash: Optional[int] = pydantic.PrivateAttr(default=None)
+
+    @classmethod
+    def __init_subclass__(cls, *, interned: Optional[bool] = None, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)  # type: ignore  # mypy issues 4335, 4660
+        if interned is not None:
+            cls.__node_interned__ = interned
+        if cls.__node_interned__:
+            impl_fields = [
+                name
+                for name in cls.__fields__
+                if name.endswith(_EVE_NODE_IMPL_SUFFIX) and name != "id_"
+            ]
+            if impl_fields:
+                raise TypeError(
+                    f"Interned node class '{cls.__name__}' has implementation fields "
+                    f"({impl_fields})"
+                )
+            cls.__deepcopy__ = _deepcopy_interned_node  # type: ignore
+
+    def __hash__(self) -> int:
+        return structural_hash(self)
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, BaseNode):
+            return NotImplemented
+        return structural_eq(self, other)
+
+    def copy(self: AnyNode, **kwargs: Any) -> AnyNode:
+        result = super().copy(**kwargs)
+        object.__setattr__(result, "_structural_hash", None)
+        return result
+
+    def __setstate__(self, state: Any) -> None:
+        # Hashes of str and bytes values are not stable across processes
+        super().__setstate__(state)
+        object.__setattr__(self, "_structural_hash", None)
 
     class Config(FrozenModelConfig):
         pass
 
 
+def _deepcopy_interned_node(node: FrozenNode, memo: Dict[int, Any]) -> FrozenNode:
+    return node
+
+
+#: Table of interned nodes: (node class, structural hash) -> node
+_interned_nodes: weakref.WeakValueDictionary[
+    Tuple[Type[FrozenNode], int], FrozenNode
+] = weakref.WeakValueDictionary()
+
+
+def _intern_node(node: FrozenNode) -> FrozenNode:
+    if node._pending_validation:
+        return node
+    key = (node.__class__, structural_hash(node))
+    existing = _interned_nodes.get(key, None)
+    if existing is None:
+        _interned_nodes[key] = node
+        return node
+    # Keep the new node in the (unlikely) case of a hash collision
+    return existing if structural_eq(existing, node) else node
+
+
+# -- Structural hashing and equality --
+_HASH_EXPAND = 0
+_HASH_ORDERED = 1
+_HASH_UNORDERED = 2
+_HASH_MAPPING = 3
+_HASH_FROZEN_NODE = 4
+
+_STRUCTURAL_HASH_ATTR = "_structural_hash"
+
+
+@functools.lru_cache(maxsize=None)
+def _type_hash_tag(type_: Type) -> str:
+    # Use names instead of the (id-based) class hashes to get reproducible hashes
+    return f"{type_.__module__}.{type_.__qualname__}"
+
+
+def structural_hash(value: Any) -> int:
+    """Compute a hash of a tree from its structure and leaf values.
+
+    Implementation fields (including ``id_``) are ignored and the hashes are
+    propagated bottom-up, so trees which are equal according to
+    :func:`structural_eq` have the same hash. The hashes of
+    :class:`FrozenNode` instances are cached and reused, while mutable nodes
+    are hashed again in every call.
+
+    Raises:
+        TypeError: if a leaf value is not hashable.
+    """
+    results: List[int] = []
+    stack: List[Tuple[Any, int, int]] = [(value, _HASH_EXPAND, 0)]
+    while stack:
+        item, kind, size = stack.pop()
+        if kind == _HASH_EXPAND:
+            if isinstance(item, iterators._ATOMIC_TYPES):
+                results.append(hash(item))
+                continue
+
+            # Check first the most common types (node classes are checked through
+            # their metaclass, since ABCMeta.__instancecheck__() is much slower)
+            children: Collection[Any]
+            if isinstance(item.__class__, NodeMetaclass):
+                if _STRUCTURAL_HASH_ATTR in item.__private_attributes__:
+                    cached = item._structural_hash
+                    if cached is not None:
+                        results.append(cached)
+                        continue
+                    kind = _HASH_FROZEN_NODE
+                else:
+                    kind = _HASH_ORDERED
+                children = item.__node_children_getter__(item)
+            elif isinstance(item, (list, tuple)):
+                children, kind = item, _HASH_ORDERED
+            elif isinstance(item, pydantic.BaseModel):
+                children, kind = tuple(item.__dict__.values()), _HASH_ORDERED
+            elif isinstance(item, collections.abc.Mapping):
+                children, kind = [v for pair in item.items() for v in pair], _HASH_MAPPING
+            elif isinstance(item, collections.abc.Set):
+                children, kind = list(item), _HASH_UNORDERED
+            elif isinstance(item, collections.abc.Sequence):
+                children, kind = item, _HASH_ORDERED
+            else:
+                results.append(hash(item))
+                continue
+
+            stack.append((item, kind, len(children)))
+            stack.extend((child, _HASH_EXPAND, 0) for child in reversed(children))  # type: ignore
+
+        else:
+            children_hashes = results[len(results) - size :]
+            del results[len(results) - size :]
+            content: Any
+            if kind == _HASH_MAPPING:
+                content = frozenset(zip(children_hashes[0::2], children_hashes[1::2]))
+            elif kind == _HASH_UNORDERED:
+                content = frozenset(children_hashes)
+            else:
+                content = tuple(children_hashes)
+            result = hash((_type_hash_tag(item.__class__), content))
+            if kind == _HASH_FROZEN_NODE:
+                object.__setattr__(item, _STRUCTURAL_HASH_ATTR, result)
+            results.append(result)
+
+    return results[0]
+
+
+def structural_eq(a: Any, b: Any) -> bool:
+    """Compare two trees by structure and leaf values, ignoring implementation fields.
+
+    The comparison short-circuits on identical subtrees and on
+    :class:`FrozenNode` subtrees with different structural hashes.
+    """
+    stack = [(a, b)]
+    while stack:
+        x, y = stack.pop()
+        if x is y:
+            continue
+        if isinstance(x, iterators._ATOMIC_TYPES):
+            if x != y:
+                return False
+            continue
+        if isinstance(x.__class__, NodeMetaclass):
+            pairs = _node_eq_pairs(x, y)
+        else:
+            pairs = _value_eq_pairs(x, y)
+        if pairs is None:
+            return False
+        stack.extend(pairs)
+
+    return True
+
+
+def _node_eq_pairs(x: Any, y: Any) -> Optional[Iterable[Tuple[Any, Any]]]:
+    # Pairs of children to compare or None if the nodes are already known to be different
+    if x.__class__ is not y.__class__:
+        return None
+    if _STRUCTURAL_HASH_ATTR in x.__private_attributes__ and (
+        x._structural_hash or structural_hash(x)
+    ) != (y._structural_hash or structural_hash(y)):
+        return None
+    getter = x.__class__.__node_children_getter__
+    return zip(getter(x), getter(y))
+
+
+def _value_eq_pairs(x: Any, y: Any) -> Optional[Iterable[Tuple[Any, Any]]]:
+    # Pairs of items to compare or None if the values are already known to be different
+    if isinstance(x, (list, tuple)):
+        if x.__class__ is not y.__class__ or len(x) != len(y):
+            return None
+        return zip(x, y)
+    elif isinstance(x, pydantic.BaseModel):
+        if x.__class__ is not y.__class__:
+            return None
+        return zip(x.__dict__.values(), y.__dict__.values())
+    elif isinstance(x, collections.abc.Mapping):
+        if x.__class__ is not y.__class__ or x.keys() != y.keys():
+            return None
+        return [(x[key], y[key]) for key in x]
+    elif isinstance(x, collections.abc.Sequence):
+        if x.__class__ is not y.__class__ or len(x) != len(y):
+            return None
+        return zip(x, y)
+    return None if x != y else ()
+
+
+# -- Tree cloning --
+#: Private attributes caching values derived from the node contents (reset in copies)
+_NODE_CACHE_ATTRS = ("_node_property_cache", _STRUCTURAL_HASH_ATTR)
+
+#: Kinds of values in tree cloning
+_CLONE_SHARED = 0  # immutable values shared by the original and the cloned trees
+_CLONE_NODE = 1
+_CLONE_COLLECTION = 2  # builtin collections (list, tuple, dict, set)
+_CLONE_OTHER = 3  # values copied with copy.deepcopy()
+
+_clone_kinds: Dict[Type, int] = {}
+
+
+def _get_clone_kind(value_class: Type) -> int:
+    try:
+        return _clone_kinds[value_class]
+    except KeyError:
+        if issubclass(value_class, (*iterators._ATOMIC_TYPES, enum.Enum, FrozenNode, frozenset)):
+            kind = _CLONE_SHARED
+        elif issubclass(value_class, BaseNode):
+            kind = _CLONE_NODE
+        elif issubclass(value_class, (list, tuple, dict, set)):
+            kind = _CLONE_COLLECTION
+        else:
+            kind = _CLONE_OTHER
+        _clone_kinds[value_class] = kind
+        return kind
+
+
+def clone_tree(tree: Any, *, path: Optional[Sequence[Any]] = None) -> Any:
+    """Create a copy of a tree which can be modified without affecting the original one.
+
+    Unlike :func:`copy.deepcopy` or ``node.copy(deep=True)``, the tree is
+    traversed using the precomputed children metadata of the node classes,
+    nodes are created without running the validators, and immutable leaf
+    values (strings, numbers, enum members) and :class:`FrozenNode` subtrees
+    are shared with the original tree. Nodes appearing several times in the
+    tree are cloned once, and implementation fields are deep copied, so
+    references to nodes of the tree (e.g. symbol tables) point to the clones.
+    Node ids are copied only if they have already been generated (otherwise
+    the cloned nodes get their own ids when they are used).
+
+    Args:
+        path: If provided, only the nodes and collections on this path are
+            copied (shallowly) and all the other subtrees are shared. The path
+            is a sequence of children field names (for nodes), indices (for
+            sequences) and keys (for mappings), starting at the root of the tree.
+
+    Examples:
+        >>> class Block(Node):
+        ...     names: List[str]
+        >>> tree = [Block(names=["a"]), Block(names=["b"])]
+        >>> cloned = clone_tree(tree, path=[1, "names"])
+        >>> cloned[1].names.append("c")
+        >>> tree[1].names, cloned[1].names, cloned[0] is tree[0]
+        (['b'], ['b', 'c'], True)
+
+    """
+    if path is None:
+        return _clone_subtree(tree)
+
+    ancestors: List[Tuple[Any, Any]] = []
+    current = tree
+    for key in path:
+        ancestors.append((current, key))
+        try:
+            if isinstance(current, BaseNode):
+                if key not in current.__node_children__:
+                    raise KeyError(key)
+                current = getattr(current, key)
+            elif isinstance(current, (collections.abc.Sequence, collections.abc.Mapping)):
+                current = current[key]
+            else:
+                raise KeyError(key)
+        except LookupError as e:
+            raise ValueError(f"Invalid path {path} at {key!r} (in {type(current)}).") from e
+
+    result = _shallow_copy(current, {})
+    for parent, key in reversed(ancestors):
+        result = _shallow_copy(parent, {key: result})
+    return result
+
+
+def _copy_node(node: BaseNode, values: Dict[str, Any]) -> BaseNode:
+    # Create a node with the same metadata without running the validators
+    node_class = node.__class__
+    result = node_class.__new__(node_class)
+    object.__setattr__(result, "__dict__", values)
+    object.__setattr__(result, "__fields_set__", set(node.__fields_set__))
+    for name in node_class.__private_attributes__:
+        object.__setattr__(
+            result, name, None if name in _NODE_CACHE_ATTRS else getattr(node, name, None)
+        )
+    return result
+
+
+def _shallow_copy(value: Any, replacements: Dict[Any, Any]) -> Any:
+    if isinstance(value, BaseNode):
+        return _copy_node(value, {**value.__dict__, **replacements})
+    if isinstance(value, collections.abc.Mapping):
+        return _rebuild_mapping(value, {**value, **replacements}.items())
+    if isinstance(value, collections.abc.Sequence) and not isinstance(value, (str, bytes)):
+        items = list(value)
+        for index, item in replacements.items():
+            items[index] = item
+        return items if isinstance(value, list) else _rebuild_sequence(value, items)
+    if isinstance(value, collections.abc.Set):
+        return value.__class__(value)  # type: ignore  # set constructors
+    return copy.copy(value)
+
+
+def _rebuild_mapping(value: Any, items: Iterable[Tuple[Any, Any]]) -> Any:
+    # Mapping constructors have different signatures (e.g. defaultdict)
+    if value.__class__ is dict:
+        return dict(items)
+    if isinstance(value, collections.abc.MutableMapping):
+        result = copy.copy(value)
+        result.clear()
+        result.update(items)
+        return result
+    return value.__class__(items)
+
+
+def _rebuild_sequence(value: Any, items: List[Any]) -> Any:
+    # Named tuples do not accept an iterable in the constructor
+    if isinstance(value, tuple) and hasattr(value, "_make"):
+        return value._make(items)
+    return value.__class__(items)
+
+
+def _clone_subtree(tree: Any, *, generate_ids: bool = False) -> Any:
+    # Iterative post-order traversal: (item, None) entries are expanded and
+    # (item, number_of_cloned_children) entries rebuilt from the last results
+    memo: Dict[int, Any] = {}
+    results: List[Any] = []
+    stack: List[Tuple[Any, Optional[int]]] = [(tree, None)]
+    while stack:
+        item, count = stack.pop()
+        kind = _clone_kinds.get(item.__class__, None)
+        if kind is None:
+            kind = _get_clone_kind(item.__class__)
+
+        if count is None:
+            if kind == _CLONE_SHARED:
+                results.append(item)
+            elif id(item) in memo:
+                results.append(memo[id(item)])
+            elif kind == _CLONE_NODE:
+                children = item.__node_children_getter__(item)
+                stack.append((item, len(children)))
+                stack.extend((child, None) for child in reversed(children))
+            elif kind == _CLONE_COLLECTION:
+                children = list(item.values() if isinstance(item, dict) else item)
+                stack.append((item, len(children)))
+                stack.extend((child, None) for child in reversed(children))
+            else:
+                # Other values (including pydantic models) are copied as usual
+                results.append(copy.deepcopy(item, memo))
+            continue
+
+        values = results[len(results) - count :]  # noqa: E203  # black formatting
+        del results[len(results) - count :]  # noqa: E203  # black formatting
+        if kind == _CLONE_NODE:
+            if generate_ids:
+                _get_node_id(item)
+            new_values = dict(item.__dict__)
+            for name in item.__node_impl_fields_names__:
+                value = new_values[name]
+                if _get_clone_kind(value.__class__) != _CLONE_SHARED:
+                    new_values[name] = copy.deepcopy(value, memo)
+            new_values.update(zip(item.__node_children_names__, values))
+            result: Any = _copy_node(item, new_values)
+        elif isinstance(item, dict):
+            result = _rebuild_mapping(item, zip(item.keys(), values))
+        elif isinstance(item, tuple) and all(a is b for a, b in zip(item, values)):
+            result = item  # immutable tuples of shared values are shared
+        elif item.__class__ is list:
+            result = values
+        else:
+            result = _rebuild_sequence(item, values)
+        memo[id(item)] = result
+        results.append(result)
+
+    return results.pop()
+
+
+# -- Stable fingerprints --
+_FINGERPRINT_END = object()
+
+#: Size of the encoded data buffered before updating the hash algorithm
+_FINGERPRINT_CHUNK_SIZE = 1 << 16
+
+
+def fingerprint(
+    value: Any,
+    *,
+    ignore_fields: Optional[Collection[str]] = None,
+    hash_algorithm: Optional[Any] = None,
+) -> str:
+    """Compute a stable hash (hex digest) of a tree.
+
+    Unlike :func:`structural_hash`, the result is the same across
+    interpreter runs, so it can be used as a persistent cache key.
+    Unlike :func:`eve.utils.shash`, trees are not pickled: class names,
+    field names and leaf values are encoded and fed to the hash algorithm
+    incrementally during the traversal. The items of sets and mappings are
+    hashed independently of their order. Other values without a specific
+    encoding are pickled.
+
+    Args:
+        ignore_fields: Names of the node fields to be ignored. Defaults to
+            all the implementation fields (e.g. ``id_``), otherwise only the
+            given fields are ignored.
+        hash_algorithm: object implementing the `hash algorithm` interface
+            from :mod:`hashlib` or canonical name (`str`) of the
+            hash algorithm as defined in :mod:`hashlib`.
+            Defaults to :class:`xxhash.xxh64`.
+
+    """
+    if hash_algorithm is None:
+        hash_algorithm = xxhash.xxh64()
+    elif isinstance(hash_algorithm, str):
+        hash_algorithm = hashlib.new(hash_algorithm)
+
+    _update_fingerprint(hash_algorithm, value, ignore_fields)
+    result = hash_algorithm.hexdigest()
+    assert isinstance(result, str)
+
+    return result
+
+
+def _new_hash_algorithm(like: Any) -> Any:
+    try:
+        return hashlib.new(like.name)
+    except (AttributeError, ValueError):
+        return type(like)()
+
+
+#: Cache of the encoded header and the fields getter of each (node class, ignored fields) pair
+_fingerprint_node_encodings: Dict[
+    Tuple[Type, Optional[FrozenSet[str]]], Tuple[bytes, Callable[[Any], Tuple[Any, ...]]]
+] = {}
+
+
+def _get_fingerprint_node_encoding(
+    node_class: Type[BaseNode], ignore_fields: Optional[FrozenSet[str]]
+) -> Tuple[bytes, Callable[[Any], Tuple[Any, ...]]]:
+    # Field names are encoded once in the header, followed by the field values
+    try:
+        return _fingerprint_node_encodings[(node_class, ignore_fields)]
+    except KeyError:
+        pass
+
+    if ignore_fields is None:
+        names = node_class.__node_children_names__
+        getter = node_class.__node_children_getter__
+    else:
+        names = tuple(
+            name
+            for name in (
+                *node_class.__node_children_names__,
+                *node_class.__node_impl_fields_names__,
+            )
+            if name not in ignore_fields
+        )
+        getter = _make_fields_getter(names)
+    header = f"({_type_hash_tag(node_class)}[{','.join(names)}];".encode()
+    _fingerprint_node_encodings[(node_class, ignore_fields)] = (header, getter)
+    return header, getter
+
+
+def _encode_fingerprint_leaf(buffer: bytearray, item: Any) -> bool:
+    # Append the encoding of a leaf value (other than exact str instances) to the buffer
+    if item is None:
+        buffer += b"N"
+    elif isinstance(item, enum.Enum):
+        buffer += f"E{_type_hash_tag(item.__class__)}.{item.name};".encode()
+    elif item.__class__ is bool:
+        buffer += b"T" if item else b"F"
+    elif isinstance(item, int):
+        buffer += b"i%d;" % item
+    elif isinstance(item, float):
+        buffer += f"f{item.hex()};".encode()
+    elif isinstance(item, str):
+        data = item.encode()
+        buffer += b"s%d:" % len(data)
+        buffer += data
+    elif isinstance(item, bytes):
+        buffer += b"b%d:" % len(item)
+        buffer += item
+    else:
+        return False
+    return True
+
+
+def _fingerprint_children(
+    hash_algorithm: Any,
+    item: Any,
+    ignored: Optional[FrozenSet[str]],
+    ignore_fields: Optional[Collection[str]],
+) -> Optional[Collection[Any]]:
+    # Items of a collection or model, in a deterministic order (None for other values)
+    if isinstance(item, (list, tuple)):
+        return item
+    if isinstance(item, pydantic.BaseModel):
+        return [pair for pair in item.__dict__.items() if ignored is None or pair[0] not in ignored]
+    if isinstance(item, collections.abc.Mapping):
+        return sorted(
+            _fingerprint_digest(hash_algorithm, pair, ignore_fields) for pair in item.items()
+        )
+    if isinstance(item, collections.abc.Set):
+        return sorted(
+            _fingerprint_digest(hash_algorithm, element, ignore_fields) for element in item
+        )
+    return None
+
+
+def _update_fingerprint(
+    hash_algorithm: Any, value: Any, ignore_fields: Optional[Collection[str]]
+) -> None:
+    ignored = None if ignore_fields is None else frozenset(ignore_fields)
+    buffer = bytearray()
+    stack: List[Any] = [value]
+    while stack:
+        if len(buffer) > _FINGERPRINT_CHUNK_SIZE:
+            hash_algorithm.update(buffer)
+            buffer.clear()
+
+        item = stack.pop()
+        item_class = item.__class__
+        # Check first the most common types
+        if item_class is str:
+            data = item.encode()
+            buffer += b"s%d:" % len(data)
+            buffer += data
+        elif isinstance(item_class, NodeMetaclass):
+            header, getter = _get_fingerprint_node_encoding(item_class, ignored)
+            buffer += header
+            stack.append(_FINGERPRINT_END)
+            stack.extend(reversed(getter(item)))
+        elif item is _FINGERPRINT_END:
+            buffer += b")"
+        elif not _encode_fingerprint_leaf(buffer, item):
+            children = _fingerprint_children(hash_algorithm, item, ignored, ignore_fields)
+            if children is None:
+                data = pickle.dumps(item)
+                buffer += b"p%d:" % len(data)
+                buffer += data
+            else:
+                buffer += f"({_type_hash_tag(item_class)};".encode()
+                stack.append(_FINGERPRINT_END)
+                stack.extend(reversed(children))  # type: ignore
+
+    hash_algorithm.update(buffer)
+
+
+def _fingerprint_digest(
+    like: Any, value: Any, ignore_fields: Optional[Collection[str]]
+) -> bytes:
+    # Digests of the items of unordered collections, using the same kind of hash algorithm
+    hash_algorithm = _new_hash_algorithm(like)
+    _update_fingerprint(hash_algorithm, value, ignore_fields)
+    result = hash_algorithm.digest()
+    assert isinstance(result, bytes)
+
+    return result
+
+
+class ContentUIDGenerator:
+    """Generator of deterministic unique ids derived from the contents of the nodes.
+
+    Unlike :class:`eve.utils.UIDGenerator`, ids do not depend on any global
+    state: they are formed by a prefix and the first characters of the
+    :func:`fingerprint` of the value. Values with the same fingerprint get
+    a numeric suffix following the order of the calls, so ids only depend
+    on the content and the position of the nodes when the calls follow the
+    traversal order of the tree (as in a translation), and generated code
+    using them is the same across interpreter runs.
+
+    Examples:
+        >>> generator = ContentUIDGenerator()
+        >>> first = generator.id([1, 2], prefix="kernel")
+        >>> first == ContentUIDGenerator().id([1, 2], prefix="kernel")
+        True
+        >>> generator.id([1, 2], prefix="kernel") == first + "_1"
+        True
+
+    """
+
+    width: int
+    _counts: Dict[str, int]
+
+    def __init__(self, *, width: int = 8) -> None:
+        if width < 1:
+            raise ValueError(f"Width must be a positive number ({width} provided).")
+        self.width = width
+        self._counts = {}
+
+    def id(self, value: Any, *, prefix: Optional[str] = None) -> str:  # noqa: A003
+        """Generate an id from the content of ``value`` (ignoring implementation fields)."""
+        s = fingerprint(value)[: self.width]
+        s = f"{prefix}_{s}" if prefix else s
+        count = self._counts.get(s, 0)
+        self._counts[s] = count + 1
+        return f"{s}_{count}" if count else s
+
+
+# -- Static analysis of node types --
+def get_node_classes_version() -> int:
+    """Return a counter which changes every time a new node class is created."""
+    return _node_classes_version
+
+
+def _collect_annotation_types(
+    annotation: Any, collected: Set[Type], namespace: Dict[str, Any]
+) -> bool:
+    # Add the node classes and leaf types found in a field annotation to `collected`
+    # (return False if the possible values of the field are unknown)
+    if annotation is Ellipsis or typing_inspect.is_literal_type(annotation):
+        return True
+    if typing_inspect.is_forward_ref(annotation):
+        try:
+            annotation = pydantic.typing.evaluate_forwardref(annotation, namespace, None)
+        except Exception:
+            return False
+    if typing_inspect.get_origin(annotation) is not None:
+        args = typing_inspect.get_args(annotation, evaluate=True)
+        return bool(args) and all(
+            _collect_annotation_types(arg, collected, namespace) for arg in args
+        )
+    if annotation is Any or not isinstance(annotation, type):
+        # Any, TypeVars, unresolved ForwardRefs, etc.
+        return False
+    if not issubclass(annotation, (BaseNode, str, bytes, pydantic.BaseModel)) and (
+        issubclass(annotation, collections.abc.Collection) or annotation is object
+    ):
+        return False
+    collected.add(annotation)
+    return True
+
+
+def _get_subclasses(node_class: Type[BaseNode]) -> Set[Type[BaseNode]]:
+    result = {node_class}
+    pending = [node_class]
+    while pending:
+        for subclass in pending.pop().__subclasses__():
+            if subclass not in result:
+                result.add(subclass)
+                pending.append(subclass)
+    return result
+
+
+def _get_reachable_types(node_class: Type[BaseNode]) -> Optional[FrozenSet[Type]]:
+    # Node classes (with their subclasses) and leaf types found in the subtrees of a node class
+    try:
+        return _reachable_types_cache[node_class]
+    except KeyError:
+        pass
+
+    reachable: Set[Type] = set()
+    pending = [node_class]
+    visited = set()
+    result: Optional[FrozenSet[Type]] = None
+    while pending:
+        current = pending.pop()
+        if current in visited:
+            continue
+        visited.add(current)
+        annotated: Set[Type] = set()
+        namespace = {**vars(sys.modules[current.__module__]), current.__name__: current}
+        if not all(
+            _collect_annotation_types(metadata["definition"].outer_type_, annotated, namespace)
+            for metadata in current.__node_children__.values()
+        ):
+            break
+        for annotated_type in annotated:
+            if issubclass(annotated_type, BaseNode):
+                for child_class in _get_subclasses(annotated_type):
+                    reachable.add(child_class)
+                    pending.append(child_class)
+            else:
+                reachable.add(annotated_type)
+    else:
+        result = frozenset(reachable)
+
+    _reachable_types_cache[node_class] = result
+    return result
+
+
+def get_reachable_node_classes(node_class: Type[BaseNode]) -> Optional[FrozenSet[Type[BaseNode]]]:
+    """Return the classes of the nodes which can be found in the subtree of a node class.
+
+    The result is computed from the annotations of the children fields
+    (including all the currently defined subclasses of the annotated
+    node classes) and does not include ``node_class`` itself, unless it
+    can be nested. ``None`` is returned if the analysis cannot determine
+    the types of some of the values (e.g. fields annotated as ``Any``).
+    """
+    reachable = _get_reachable_types(node_class)
+    if reachable is None:
+        return None
+    return frozenset(item for item in reachable if issubclass(item, BaseNode))
+
+
 # -- Misc --
 class VType(FrozenModel):
 
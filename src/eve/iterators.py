@@ -19,11 +19,25 @@
 
 from __future__ import annotations
 
+import bisect
 import collections.abc
 
-from . import concepts, utils
+from . import concepts, exceptions, utils
 from .type_definitions import Enum
-from .typingx import Any, Generator, Iterable, List, Optional, Tuple, Union
+from .typingx import (
+    Any,
+    ClassVar,
+    Deque,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 
 
 try:
@@ -33,6 +47,11 @@ except ModuleNotFoundError:
 
 
 KeyValue = Tuple[Union[int, str], Any]
+
+#: Types of leaf values which never contain children (checked before the slower ABC checks)
+_ATOMIC_TYPES = (bool, bytes, int, float, str, type(None))
+
+_SUBTREE_END = object()
 TreeIterationItem = Union[Any, Tuple[KeyValue, Any]]
 
 
@@ -51,6 +70,8 @@ def generic_iter_children(
     children_iterator: Iterable[Union[Any, Tuple[KeyValue, Any]]] = iter(())
     if isinstance(node, concepts.Node):
         children_iterator = node.iter_children() if with_keys else node.iter_children_values()
+    elif isinstance(node, _ATOMIC_TYPES):
+        pass
     elif isinstance(node, collections.abc.Sequence) and utils.is_collection(node):
         children_iterator = enumerate(node) if with_keys else iter(node)
     elif isinstance(node, collections.abc.Set):
@@ -79,15 +100,23 @@ def iter_tree_pre(
             Defaults to `False`.
 
     """
-
+    # Nodes are traversed with an explicit stack (children are pushed in reverse order)
     if with_keys:
-        yield __key__, node
-        for key, child in generic_iter_children(node, with_keys=True):
-            yield from iter_tree_pre(child, with_keys=True, __key__=key)
+        keyed_stack: List[Tuple[Any, Any]] = [(__key__, node)]
+        while keyed_stack:
+            item = keyed_stack.pop()
+            yield item
+            children = list(generic_iter_children(item[1], with_keys=True))
+            children.reverse()
+            keyed_stack.extend(children)
     else:
-        yield node
-        for child in generic_iter_children(node, with_keys=False):
-            yield from iter_tree_pre(child, with_keys=False)
+        stack: List[Any] = [node]
+        while stack:
+            item = stack.pop()
+            yield item
+            children = list(generic_iter_children(item, with_keys=False))
+            children.reverse()
+            stack.extend(children)
 
 
 @utils.as_xiter
@@ -102,23 +131,27 @@ def iter_tree_post(
             Defaults to `False`.
 
     """
-    if with_keys:
-        for key, child in generic_iter_children(node, with_keys=True):
-            yield from iter_tree_post(child, with_keys=True, __key__=key)
-        yield __key__, node
-    else:
-        for child in generic_iter_children(node, with_keys=False):
-            yield from iter_tree_post(child, with_keys=False)
-        yield node
+    # Each stack entry keeps the iterator over the children still to be traversed
+    stack: List[Tuple[TreeIterationItem, Iterator[Any]]] = [
+        (
+            (__key__, node) if with_keys else node,
+            iter(generic_iter_children(node, with_keys=with_keys)),
+        )
+    ]
+    while stack:
+        item, children = stack[-1]
+        for child in children:
+            child_node = child[1] if with_keys else child
+            stack.append((child, iter(generic_iter_children(child_node, with_keys=with_keys))))
+            break
+        else:
+            stack.pop()
+            yield item
 
 
 @utils.as_xiter
 def iter_tree_levels(
-    node: concepts.TreeNode,
-    *,
-    with_keys: bool = False,
-    __key__: Optional[Any] = None,
-    __queue__: Optional[List] = None,
+    node: concepts.TreeNode, *, with_keys: bool = False, __key__: Optional[Any] = None
 ) -> Generator[TreeIterationItem, None, None]:
     """Create a tree traversal iterator by levels (Breadth-First Search).
 
@@ -128,19 +161,17 @@ def iter_tree_levels(
             Defaults to `False`.
 
     """
-    __queue__ = __queue__ or []
+    queue: Deque[Any] = collections.deque([(__key__, node) if with_keys else node])
     if with_keys:
-        yield __key__, node
-        __queue__.extend(generic_iter_children(node, with_keys=True))
-        if __queue__:
-            key, child = __queue__.pop(0)
-            yield from iter_tree_levels(child, with_keys=True, __key__=key, __queue__=__queue__)
+        while queue:
+            item = queue.popleft()
+            yield item
+            queue.extend(generic_iter_children(item[1], with_keys=True))
     else:
-        yield node
-        __queue__.extend(generic_iter_children(node, with_keys=False))
-        if __queue__:
-            child = __queue__.pop(0)
-            yield from iter_tree_levels(child, with_keys=False, __queue__=__queue__)
+        while queue:
+            item = queue.popleft()
+            yield item
+            queue.extend(generic_iter_children(item, with_keys=False))
 
 
 def iter_tree(
@@ -163,3 +194,191 @@ def iter_tree(
     assert isinstance(iterator, utils.XIterator)
 
     return iterator
+
+
+class TreeIndex:
+    """Index of the nodes of a tree by node class.
+
+    The index is built with a single pre-order traversal of the tree and
+    maps every node class (including its base node classes) to the node
+    instances of the tree and their parent nodes, so queries only cost
+    time proportional to the number of results (plus a binary search
+    when the results are restricted to a subtree).
+
+    Node instances are returned in pre-order, like
+    ``iter_tree(tree).if_isinstance(node_class)``. An index can be
+    shared by several passes working on the same tree: modifications
+    applied with a :class:`eve.NodeMutator` invalidate all indices, which
+    are then rebuilt automatically on the next query. Other in-place
+    modifications of the tree require an explicit call to :meth:`refresh`.
+
+    Nodes appearing several times in the tree (e.g. interned nodes) are
+    returned once per occurrence by :meth:`find`, but :meth:`parent` and
+    the ``within`` argument of the queries use their first occurrence.
+
+    Examples:
+        >>> class Leaf(concepts.Node):
+        ...     value: int
+        >>> class Pair(concepts.Node):
+        ...     left: concepts.Node
+        ...     right: concepts.Node
+        >>> tree = [Pair(left=Leaf(value=1), right=Leaf(value=2)), Leaf(value=3)]
+        >>> index = TreeIndex(tree)
+        >>> [leaf.value for leaf in index.find(Leaf)]
+        [1, 2, 3]
+        >>> [leaf.value for leaf in index.find(Leaf, within=tree[0])]
+        [1, 2]
+        >>> index.parent(tree[0].left) is tree[0]
+        True
+
+    """
+
+    #: Counter of in-place tree modifications (see :meth:`notify_mutation`)
+    _mutation_epoch: ClassVar[int] = 0
+
+    #: Cache of the indexed classes for each node class
+    _indexed_classes: ClassVar[Dict[Type, Tuple[Type, ...]]] = {}
+
+    tree: concepts.TreeNode
+    _epoch: int
+    _nodes: List[concepts.BaseNode]
+    _parents: List[Optional[concepts.BaseNode]]
+    _ends: List[int]
+    _positions: Dict[int, int]
+    _by_class: Dict[Type, List[int]]
+
+    @classmethod
+    def notify_mutation(cls, *, invalidate_properties: bool = True) -> None:
+        """Invalidate all indices and cached node properties after modifying a tree in place.
+
+        Args:
+            invalidate_properties: Invalidate also all cached node properties
+                (see :func:`eve.concepts.invalidate_node_properties`). Only skip
+                it if the property caches of the modified nodes and their
+                ancestors are cleared explicitly (as :class:`eve.NodeMutator` does).
+
+        """
+        cls._mutation_epoch += 1
+        if invalidate_properties:
+            concepts.invalidate_node_properties()
+
+    def __init__(self, tree: concepts.TreeNode) -> None:
+        self.tree = tree
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Rebuild the index from the current contents of the tree."""
+        self._epoch = TreeIndex._mutation_epoch
+        self._nodes = []
+        self._parents = []
+        self._ends = []
+        self._positions = {}
+        self._by_class = collections.defaultdict(list)
+
+        # Stack items: (value, parent_node) or (_SUBTREE_END, position)
+        stack: List[Tuple[Any, Any]] = [(self.tree, None)]
+        while stack:
+            item, parent = stack.pop()
+            if item is _SUBTREE_END:
+                self._ends[parent] = len(self._nodes)
+                continue
+
+            if isinstance(item, concepts.BaseNode):
+                position = len(self._nodes)
+                self._nodes.append(item)
+                self._parents.append(parent)
+                self._ends.append(position + 1)
+                self._positions.setdefault(id(item), position)
+                for node_class in self._get_indexed_classes(item.__class__):
+                    self._by_class[node_class].append(position)
+                stack.append((_SUBTREE_END, position))
+                parent = item
+
+            children = list(generic_iter_children(item))
+            children.reverse()
+            stack.extend((child, parent) for child in children)
+
+    def find(
+        self,
+        node_class: Union[Type, Tuple[Type, ...]],
+        *,
+        within: Optional[concepts.BaseNode] = None,
+    ) -> List[Any]:
+        """Return the nodes which are instances of ``node_class`` (in pre-order).
+
+        Args:
+            node_class: Node class or tuple of node classes.
+            within: Only return nodes from the subtree of this node (including itself).
+
+        """
+        return [self._nodes[position] for position in self._find_positions(node_class, within)]
+
+    def find_with_parents(
+        self,
+        node_class: Union[Type, Tuple[Type, ...]],
+        *,
+        within: Optional[concepts.BaseNode] = None,
+    ) -> List[Tuple[Optional[concepts.BaseNode], Any]]:
+        """Return ``(parent, node)`` pairs for the nodes which are instances of ``node_class``.
+
+        The parent is the closest ancestor which is a node (``None`` for the root nodes).
+        """
+        return [
+            (self._parents[position], self._nodes[position])
+            for position in self._find_positions(node_class, within)
+        ]
+
+    def parent(self, node: concepts.BaseNode) -> Optional[concepts.BaseNode]:
+        """Return the closest ancestor node of ``node`` (``None`` for the root nodes)."""
+        return self._parents[self._get_position(node)]
+
+    def __contains__(self, node: Any) -> bool:
+        self._check_epoch()
+        return id(node) in self._positions
+
+    def __len__(self) -> int:
+        self._check_epoch()
+        return len(self._nodes)
+
+    @classmethod
+    def _get_indexed_classes(cls, node_class: Type) -> Tuple[Type, ...]:
+        try:
+            return cls._indexed_classes[node_class]
+        except KeyError:
+            indexed = tuple(
+                base
+                for base in node_class.__mro__
+                if isinstance(base, type) and issubclass(base, concepts.BaseNode)
+            )
+            cls._indexed_classes[node_class] = indexed
+            return indexed
+
+    def _check_epoch(self) -> None:
+        if self._epoch != TreeIndex._mutation_epoch:
+            self.refresh()
+
+    def _get_position(self, node: concepts.BaseNode) -> int:
+        self._check_epoch()
+        try:
+            return self._positions[id(node)]
+        except KeyError as e:
+            raise exceptions.EveValueError(f"Node '{node}' is not part of the indexed tree") from e
+
+    def _find_positions(
+        self, node_class: Union[Type, Tuple[Type, ...]], within: Optional[concepts.BaseNode]
+    ) -> List[int]:
+        if within is None:
+            self._check_epoch()
+            start, end = 0, len(self._nodes)
+        else:
+            start = self._get_position(within)
+            end = self._ends[start]
+
+        if isinstance(node_class, tuple):
+            positions = sorted(
+                set().union(*(self._by_class.get(cls, ()) for cls in node_class))  # type: ignore
+            )
+        else:
+            positions = self._by_class.get(node_class, [])
+
+        return positions[bisect.bisect_left(positions, start) : bisect.bisect_left(positions, end)]
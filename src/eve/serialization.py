@@ -0,0 +1,647 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""Compact binary serialization of Eve trees with lazy loading.
+
+Serialized trees are a sequence of records, one for each model (nodes and
+other pydantic models) of the tree, followed by tables with the strings and
+the types found in the tree. Records are written bottom-up and reference the
+records of their children models by offset, so any subtree can be decoded
+without decoding the rest of the tree::
+
+    from eve import serialization
+
+    serialization.dump(computation, "computation.eve")
+
+    with serialization.TreeArchive("computation.eve") as archive:
+        # only the records of the first kernel are decoded
+        kernel = archive.load(["kernels", 0])
+
+Field values are encoded after the field names stored once per type in the
+tables, strings are stored once and referenced by index, and models
+appearing several times in the tree are encoded once and restored as shared
+instances. Models are restored without running the validators, so the
+definitions of the model classes should not change between the
+serialization and the deserialization of a tree. Values which are neither
+models, builtin collections nor atomic values (numbers, strings, enum
+members) are pickled.
+
+Unique ids (``id_``) of nodes are only stored if they have already been
+generated (see :class:`eve.concepts.BaseNode`), otherwise the loaded nodes
+get new ids on first access.
+"""
+
+
+from __future__ import annotations
+
+import enum
+import importlib
+import mmap
+import os
+import pickle
+import struct
+
+import pydantic
+
+from . import concepts, exceptions
+from .typingx import IO, Any, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+
+_MAGIC = b"EVETREE1"
+
+#: File header: magic, offset of the tables, offset of the root record
+_HEADER = struct.Struct("<8sQQ")
+
+_FLOAT = struct.Struct("<d")
+
+# Tags of encoded values
+_NONE = 0
+_FALSE = 1
+_TRUE = 2
+_INT = 3  # zigzag encoded varint
+_FLOAT_TAG = 4  # 8 bytes (little-endian double)
+_STR = 5  # varint index in the strings table
+_BYTES = 6  # varint length + data
+_ENUM = 7  # varint index in the types table + value of the member
+_REF = 8  # varint index in the references of the record
+_LIST = 9  # varint length + items
+_TUPLE = 10
+_SET = 11
+_FROZENSET = 12
+_DICT = 13  # varint length + (key, value) items
+_PICKLE = 14  # varint length + pickled data
+
+# Kinds of values, resolved once per class
+_KIND_STR = 0
+_KIND_MODEL = 1
+_KIND_CONSTANT = 2  # None, False, True
+_KIND_INT = 3
+_KIND_FLOAT = 4
+_KIND_BYTES = 5
+_KIND_ENUM = 6
+_KIND_COLLECTION = 7
+_KIND_OTHER = 8
+
+_COLLECTION_TAGS: Dict[type, int] = {
+    list: _LIST,
+    tuple: _TUPLE,
+    set: _SET,
+    frozenset: _FROZENSET,
+    dict: _DICT,
+}
+
+_value_kinds: Dict[type, int] = {}
+
+_IMMUTABLE_DEFAULT_TYPES = (bool, int, float, str, bytes, type(None))
+
+
+def _get_value_kind(value_class: type) -> int:
+    try:
+        return _value_kinds[value_class]
+    except KeyError:
+        if issubclass(value_class, enum.Enum):
+            kind = _KIND_ENUM
+        elif issubclass(value_class, (bool, type(None))):
+            kind = _KIND_CONSTANT
+        elif issubclass(value_class, str):
+            kind = _KIND_STR
+        elif issubclass(value_class, int):
+            kind = _KIND_INT
+        elif issubclass(value_class, float):
+            kind = _KIND_FLOAT
+        elif issubclass(value_class, bytes):
+            kind = _KIND_BYTES
+        elif issubclass(value_class, pydantic.BaseModel):
+            kind = _KIND_MODEL
+        elif value_class in _COLLECTION_TAGS:
+            kind = _KIND_COLLECTION
+        else:
+            kind = _KIND_OTHER
+        _value_kinds[value_class] = kind
+        return kind
+
+
+def _write_uint(buffer: bytearray, value: int) -> None:
+    while value > 0x7F:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+class _Encoder:
+    buffer: bytearray
+    strings: Dict[str, int]
+    types: Dict[Any, int]
+    type_entries: List[Tuple[Any, ...]]
+    offsets: Dict[int, int]
+
+    def __init__(self) -> None:
+        self.buffer = bytearray(_HEADER.size)
+        self.strings = {}
+        self.types = {}
+        # Type 0 is the wrapper record of the root value
+        self.type_entries = [("root", "", "", ("",))]
+        self.offsets = {}
+
+    def encode(self, tree: Any) -> bytes:
+        self._write_models(tree)
+        root_offset = self._write_record(0, 0, [tree], self._iter_models(tree))
+        tables_offset = len(self.buffer)
+        self.buffer += pickle.dumps(
+            (list(self.strings), self.type_entries), protocol=pickle.HIGHEST_PROTOCOL
+        )
+        _HEADER.pack_into(self.buffer, 0, _MAGIC, tables_offset, root_offset)
+        return bytes(self.buffer)
+
+    def _type_index(self, type_: type) -> int:
+        index = self.types.get(type_, None)
+        if index is None:
+            if issubclass(type_, pydantic.BaseModel):
+                entry: Tuple[Any, ...] = (
+                    "model",
+                    type_.__module__,
+                    type_.__qualname__,
+                    tuple(type_.__fields__),
+                )
+            else:
+                entry = ("enum", type_.__module__, type_.__qualname__)
+            index = self.types[type_] = len(self.type_entries)
+            self.type_entries.append(entry)
+        return index
+
+    def _iter_models(self, value: Any) -> List[pydantic.BaseModel]:
+        # Models found in a value (without entering the models)
+        models = []
+        stack = [value]
+        while stack:
+            item = stack.pop()
+            kind = _value_kinds.get(item.__class__, None)
+            if kind is None:
+                kind = _get_value_kind(item.__class__)
+            if kind == _KIND_MODEL:
+                models.append(item)
+            elif kind == _KIND_COLLECTION:
+                if item.__class__ is dict:
+                    stack.extend(item.keys())
+                    stack.extend(item.values())
+                else:
+                    stack.extend(item)
+        return models
+
+    def _write_models(self, tree: Any) -> None:
+        # Post-order traversal: (model, None, None) entries are expanded and
+        # (model, values, children) entries written once all their children are written
+        offsets = self.offsets
+        stack: List[Tuple[Any, Optional[List[Any]], Optional[List[Any]]]] = [
+            (model, None, None) for model in self._iter_models(tree)
+        ]
+        while stack:
+            model, values, children = stack.pop()
+            if id(model) in offsets:
+                continue
+            if values is None:
+                names = model.__fields__
+                values = [model.__dict__.get(name, None) for name in names]
+                children = self._iter_models(values)
+                stack.append((model, values, children))
+                stack.extend(
+                    (child, None, None) for child in children if id(child) not in offsets
+                )
+            else:
+                fields_set = model.__fields_set__
+                mask = 0
+                for i, name in enumerate(model.__fields__):
+                    if name in fields_set:
+                        mask |= 1 << i
+                offsets[id(model)] = self._write_record(
+                    self._type_index(model.__class__), mask, values, children  # type: ignore
+                )
+
+    def _write_record(
+        self, type_index: int, mask: int, values: List[Any], children: List[Any]
+    ) -> int:
+        refs: Dict[int, int] = {}
+        for child in children:
+            refs.setdefault(id(child), len(refs))
+
+        buffer = self.buffer
+        offset = len(buffer)
+        _write_uint(buffer, type_index)
+        _write_uint(buffer, mask)
+        _write_uint(buffer, len(refs))
+        for model_id in refs:
+            # Children records are always written before: store the (positive) distance
+            _write_uint(buffer, offset - self.offsets[model_id])
+        for value in values:
+            self._write_value(buffer, value, refs)
+        return offset
+
+    def _write_value(self, buffer: bytearray, value: Any, refs: Dict[int, int]) -> None:
+        kind = _value_kinds.get(value.__class__, None)
+        if kind is None:
+            kind = _get_value_kind(value.__class__)
+
+        if kind == _KIND_STR:
+            index = self.strings.get(value, None)
+            if index is None:
+                index = self.strings[value] = len(self.strings)
+            buffer.append(_STR)
+            if index < 0x80:
+                buffer.append(index)
+            else:
+                _write_uint(buffer, index)
+        elif kind == _KIND_MODEL:
+            index = refs[id(value)]
+            buffer.append(_REF)
+            if index < 0x80:
+                buffer.append(index)
+            else:
+                _write_uint(buffer, index)
+        elif kind == _KIND_CONSTANT:
+            buffer.append(_NONE if value is None else (_TRUE if value else _FALSE))
+        elif kind == _KIND_INT:
+            buffer.append(_INT)
+            _write_uint(buffer, (value << 1) if value >= 0 else ((-value) << 1) - 1)
+        elif kind == _KIND_FLOAT:
+            buffer.append(_FLOAT_TAG)
+            buffer += _FLOAT.pack(value)
+        elif kind == _KIND_BYTES:
+            buffer.append(_BYTES)
+            _write_uint(buffer, len(value))
+            buffer += value
+        elif kind == _KIND_COLLECTION:
+            buffer.append(_COLLECTION_TAGS[value.__class__])
+            _write_uint(buffer, len(value))
+            if value.__class__ is dict:
+                for key, item in value.items():
+                    self._write_value(buffer, key, refs)
+                    self._write_value(buffer, item, refs)
+            else:
+                for item in value:
+                    self._write_value(buffer, item, refs)
+        elif kind == _KIND_ENUM:
+            buffer.append(_ENUM)
+            _write_uint(buffer, self._type_index(value.__class__))
+            self._write_value(buffer, value.value, refs)
+        else:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            buffer.append(_PICKLE)
+            _write_uint(buffer, len(data))
+            buffer += data
+
+
+def dumps(tree: Any) -> bytes:
+    """Serialize a tree (or any value containing nodes) to bytes."""
+    return _Encoder().encode(tree)
+
+
+def dump(tree: Any, file: Union[str, os.PathLike, IO[bytes]]) -> None:
+    """Serialize a tree to a binary file (path or file object)."""
+    data = dumps(tree)
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "wb") as f:
+            f.write(data)
+    else:
+        file.write(data)
+
+
+def loads(data: bytes) -> Any:
+    """Deserialize a tree from bytes."""
+    return TreeArchive(data).load()
+
+
+def load(file: Union[str, os.PathLike, IO[bytes]]) -> Any:
+    """Deserialize a tree from a binary file (path or file object)."""
+    if isinstance(file, (str, os.PathLike)):
+        with TreeArchive(file) as archive:
+            return archive.load()
+    return loads(file.read())
+
+
+class _Ref(NamedTuple):
+    """Reference to a not yet decoded record (used to navigate the archive)."""
+
+    offset: int
+
+
+class TreeArchive:
+    """Read-only access to a serialized tree, decoding only the requested subtrees.
+
+    Files are memory-mapped, so opening an archive only reads the header and
+    the tables, and records are decoded (once) the first time a subtree
+    containing them is loaded. Loaded subtrees share the models with the
+    subtrees loaded before.
+
+    Args:
+        source: Serialized data or path of a file created with :func:`dump`.
+
+    """
+
+    _data: Union[bytes, mmap.mmap]
+    _strings: List[str]
+    _type_entries: List[Tuple[Any, ...]]
+    _decoders: List[Optional[Tuple[Any, ...]]]
+    _types: Dict[int, Any]
+    _objects: Dict[int, Any]
+    _root_offset: int
+    _tables_offset: int
+
+    def __init__(self, source: Union[bytes, str, os.PathLike]) -> None:
+        self._file: Optional[IO[bytes]] = None
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            self._data = bytes(source)
+        else:
+            self._file = open(source, "rb")
+            try:
+                self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:  # empty files
+                self._file.close()
+                raise exceptions.EveValueError(f"'{source}' is not a serialized tree") from e
+
+        if len(self._data) < _HEADER.size or self._data[:8] != _MAGIC:
+            self.close()
+            raise exceptions.EveValueError("Data is not a serialized tree")
+        _, self._tables_offset, self._root_offset = _HEADER.unpack_from(self._data, 0)
+        self._strings, self._type_entries = pickle.loads(self._data[self._tables_offset :])
+        self._decoders = [None] * len(self._type_entries)
+        self._types = {}
+        self._objects = {}
+
+    def __enter__(self) -> TreeArchive:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the mapped file (loaded subtrees remain valid)."""
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def load(self, path: Sequence[Any] = ()) -> Any:
+        """Decode the subtree found at ``path``.
+
+        The path is a sequence of field names (for models), indices (for
+        sequences) and keys (for mappings), starting at the root of the tree.
+        """
+        if not path:
+            if self._root_offset not in self._objects:
+                self._load_all()
+            return self._objects[self._root_offset]
+        return self._materialize(self._navigate(path))
+
+    def keys(self, path: Sequence[Any] = ()) -> List[Any]:
+        """Return the field names, indices or keys of the value at ``path`` without decoding it."""
+        value = self._navigate(path)
+        if isinstance(value, _Ref):
+            return list(self._type_entries[self._read_header(value.offset)[0]][3])
+        if isinstance(value, dict):
+            return list(value.keys())
+        if isinstance(value, (list, tuple)):
+            return list(range(len(value)))
+        raise exceptions.EveValueError(f"Value at {path} has no children")
+
+    # -- Navigation --
+    def _navigate(self, path: Sequence[Any]) -> Any:
+        # Return the value at path with placeholders (_Ref) for the models
+        value = self._read_placeholder_values(self._root_offset)[0]
+        for key in path:
+            try:
+                if isinstance(value, _Ref):
+                    names = self._type_entries[self._read_header(value.offset)[0]][3]
+                    value = self._read_placeholder_values(value.offset)[names.index(key)]
+                elif isinstance(value, (list, tuple, dict)):
+                    value = value[key]
+                else:
+                    raise KeyError(key)
+            except (LookupError, ValueError) as e:
+                raise exceptions.EveValueError(f"Invalid path {path} at {key!r}") from e
+        return value
+
+    def _read_placeholder_values(self, offset: int) -> List[Any]:
+        type_index, _, refs, pos = self._read_header(offset)
+        models = [_Ref(ref) for ref in refs]
+        values = []
+        for _ in self._type_entries[type_index][3]:
+            value, pos = self._read_value(pos, models)
+            values.append(value)
+        return values
+
+    def _materialize(self, value: Any) -> Any:
+        if isinstance(value, _Ref):
+            return self._load_record(value.offset)
+        if isinstance(value, dict):
+            return {
+                self._materialize(key): self._materialize(item) for key, item in value.items()
+            }
+        if isinstance(value, (list, tuple, set, frozenset)):
+            return value.__class__(self._materialize(item) for item in value)
+        return value
+
+    # -- Decoding --
+    def _load_all(self) -> None:
+        # Records are stored bottom-up, so a linear scan always finds the children first
+        objects = self._objects
+        offset = _HEADER.size
+        while offset < self._tables_offset:
+            value, end = self._decode_record(offset)
+            objects.setdefault(offset, value)
+            offset = end
+
+    def _load_record(self, offset: int) -> Any:
+        objects = self._objects
+        stack = [offset]
+        while stack:
+            current = stack[-1]
+            if current in objects:
+                stack.pop()
+                continue
+            missing = [ref for ref in self._read_header(current)[2] if ref not in objects]
+            if missing:
+                stack.extend(missing)
+            else:
+                stack.pop()
+                objects[current] = self._decode_record(current)[0]
+
+        return objects[offset]
+
+    def _read_header(self, offset: int) -> Tuple[int, int, List[int], int]:
+        # Return type index, fields mask, offsets of the references and position of the values
+        data = self._data
+        pos = offset
+        header = [0, 0, 0]
+        for i in range(3):
+            byte = data[pos]
+            pos += 1
+            result = byte & 0x7F
+            shift = 7
+            while byte & 0x80:
+                byte = data[pos]
+                pos += 1
+                result |= (byte & 0x7F) << shift
+                shift += 7
+            header[i] = result
+
+        refs = []
+        for _ in range(header[2]):
+            byte = data[pos]
+            pos += 1
+            result = byte & 0x7F
+            shift = 7
+            while byte & 0x80:
+                byte = data[pos]
+                pos += 1
+                result |= (byte & 0x7F) << shift
+                shift += 7
+            refs.append(offset - result)
+        return header[0], header[1], refs, pos
+
+    def _decode_record(self, offset: int) -> Tuple[Any, int]:
+        # Decode a record whose references have already been decoded
+        type_index, mask, refs, pos = self._read_header(offset)
+        objects = self._objects
+        models = [objects[ref] for ref in refs]
+        decoder = self._decoders[type_index] or self._make_decoder(type_index)
+        model_class, names, private_defaults, interned, fields_sets = decoder
+
+        # Fast path for the most common values (other values use _read_value())
+        data = self._data
+        strings = self._strings
+        values = []
+        for _ in names:
+            tag = data[pos]
+            number = data[pos + 1]
+            if number < 0x80 and (tag == _STR or tag == _REF):
+                pos += 2
+                values.append(strings[number] if tag == _STR else models[number])
+            elif tag == _NONE:
+                pos += 1
+                values.append(None)
+            else:
+                value, pos = self._read_value(pos, models)
+                values.append(value)
+
+        if model_class is None:
+            return values[0], pos
+
+        fields_set = fields_sets.get(mask, None)
+        if fields_set is None:
+            fields_set = fields_sets[mask] = frozenset(
+                name for i, name in enumerate(names) if mask & (1 << i)
+            )
+        model = model_class.__new__(model_class)
+        object.__setattr__(model, "__dict__", dict(zip(names, values)))
+        object.__setattr__(model, "__fields_set__", set(fields_set))
+        for name, default, private_attr in private_defaults:
+            object.__setattr__(model, name, private_attr.get_default() if private_attr else default)
+        if interned:
+            model = concepts._intern_node(model)
+        return model, pos
+
+    def _read_value(self, pos: int, models: List[Any]) -> Tuple[Any, int]:  # noqa: C901
+        data = self._data
+        tag = data[pos]
+        pos += 1
+        if tag <= _TRUE:
+            return (None, False, True)[tag], pos
+        if tag == _FLOAT_TAG:
+            return _FLOAT.unpack_from(data, pos)[0], pos + 8
+
+        # All the other values start with a varint
+        byte = data[pos]
+        pos += 1
+        number = byte & 0x7F
+        shift = 7
+        while byte & 0x80:
+            byte = data[pos]
+            pos += 1
+            number |= (byte & 0x7F) << shift
+            shift += 7
+
+        if tag == _STR:
+            return self._strings[number], pos
+        elif tag == _REF:
+            return models[number], pos
+        elif tag == _INT:
+            return (number >> 1) if not number & 1 else -((number + 1) >> 1), pos
+        elif tag == _ENUM:
+            member_value, pos = self._read_value(pos, models)
+            return self._get_type(number)(member_value), pos
+        elif tag == _LIST or tag == _TUPLE or tag == _SET or tag == _FROZENSET:
+            items = []
+            for _ in range(number):
+                item, pos = self._read_value(pos, models)
+                items.append(item)
+            if tag == _LIST:
+                return items, pos
+            return (tuple, set, frozenset)[tag - _TUPLE](items), pos
+        elif tag == _DICT:
+            result = {}
+            for _ in range(number):
+                key, pos = self._read_value(pos, models)
+                result[key], pos = self._read_value(pos, models)
+            return result, pos
+        elif tag == _BYTES:
+            return bytes(data[pos : pos + number]), pos + number  # noqa: E203
+        elif tag == _PICKLE:
+            return pickle.loads(data[pos : pos + number]), pos + number  # noqa: E203
+
+        raise exceptions.EveValueError(f"Invalid serialized data (tag {tag} at {pos - 1})")
+
+    def _make_decoder(self, type_index: int) -> Tuple[Any, ...]:
+        names = self._type_entries[type_index][3]
+        if type_index == 0:
+            decoder: Tuple[Any, ...] = (None, names, (), False, {})
+        else:
+            model_class = self._get_type(type_index)
+            private_defaults = []
+            for name, private_attr in model_class.__private_attributes__.items():
+                if private_attr.default_factory is None and isinstance(
+                    private_attr.default, _IMMUTABLE_DEFAULT_TYPES
+                ):
+                    # Immutable defaults do not need to be copied for every model
+                    private_defaults.append((name, private_attr.default, None))
+                else:
+                    private_defaults.append((name, None, private_attr))
+            interned = getattr(model_class, "__node_interned__", False)
+            decoder = (model_class, names, tuple(private_defaults), interned, {})
+        self._decoders[type_index] = decoder
+        return decoder
+
+    def _get_type(self, type_index: int) -> Any:
+        type_ = self._types.get(type_index, None)
+        if type_ is None:
+            type_ = self._types[type_index] = self._import_type(type_index)
+        return type_
+
+    def _import_type(self, type_index: int) -> Any:
+        kind, module_name, qualname, *fields = self._type_entries[type_index]
+        try:
+            type_ = importlib.import_module(module_name)
+            for name in qualname.split("."):
+                type_ = getattr(type_, name)
+        except (ImportError, AttributeError) as e:
+            raise exceptions.EveValueError(
+                f"Serialized type '{module_name}.{qualname}' not found"
+            ) from e
+        if kind == "model" and tuple(type_.__fields__) != fields[0]:  # type: ignore
+            raise exceptions.EveValueError(
+                f"Fields of '{module_name}.{qualname}' do not match the serialized fields"
+            )
+        return type_
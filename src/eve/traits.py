@@ -21,45 +21,254 @@ from __future__ import annotations
 
 import pydantic
 
-from . import concepts, visitors
-from .type_definitions import SymbolName
-from .typingx import Any, Dict, Type
+from . import concepts, exceptions, iterators
+from .type_definitions import SymbolName, SymbolRef
+from .typingx import Any, Dict, Iterable, List, Mapping, Optional, Tuple, Type, Union
 
 
-class _CollectSymbols(visitors.NodeVisitor):
-    def __init__(self) -> None:
-        self.collected: Dict[str, Any] = {}
+#: Shared (read-only) result for subtrees without symbol declarations
+_NO_SYMBOLS: Mapping[str, Any] = {}
 
-    def visit_Node(self, node: concepts.Node) -> None:
-        for name, metadata in node.__node_children__.items():
-            if isinstance(metadata["definition"].type_, type) and issubclass(
-                metadata["definition"].type_, SymbolName
-            ):
-                self.collected[getattr(node, name)] = node
-        if not isinstance(node, SymbolTableTrait):
-            # don't recurse into a new scope (i.e. node with SymbolTableTrait)
-            self.generic_visit(node)
+#: Cache of the names of the SymbolName fields of each node class
+_symbol_fields: Dict[Type, Tuple[str, ...]] = {}
 
-    @classmethod
-    def apply(cls, node: concepts.TreeNode) -> Dict[str, Any]:
-        instance = cls()
-        instance.generic_visit(node)
-        return instance.collected
+#: Cache of the names of the SymbolRef fields of each node class
+_reference_fields: Dict[Type, Tuple[str, ...]] = {}
+
+
+def _get_fields_of_type(
+    node_class: Type[concepts.Node], field_type: Type, cache: Dict[Type, Tuple[str, ...]]
+) -> Tuple[str, ...]:
+    try:
+        return cache[node_class]
+    except KeyError:
+        names = tuple(
+            name
+            for name, metadata in node_class.__node_children__.items()
+            if isinstance(metadata["definition"].type_, type)
+            and issubclass(metadata["definition"].type_, field_type)
+        )
+        cache[node_class] = names
+        return names
+
+
+def _get_symbol_fields(node_class: Type[concepts.Node]) -> Tuple[str, ...]:
+    return _get_fields_of_type(node_class, SymbolName, _symbol_fields)
+
+
+def _get_reference_fields(node_class: Type[concepts.Node]) -> Tuple[str, ...]:
+    return _get_fields_of_type(node_class, SymbolRef, _reference_fields)
+
+
+def _merge_symbols(sources: Iterable[Mapping[str, Any]]) -> Mapping[str, Any]:
+    # Later sources take precedence. Single non-empty sources are shared, not copied
+    non_empty = [source for source in sources if source]
+    if not non_empty:
+        return _NO_SYMBOLS
+    if len(non_empty) == 1:
+        return non_empty[0]
+    merged: Dict[str, Any] = {}
+    for source in non_empty:
+        merged.update(source)
+    return merged
+
+
+def _declared_symbols(node: concepts.Node) -> Mapping[str, Any]:
+    # Symbols declared in the subtree of a node visible from the enclosing scope
+    own_symbols = {getattr(node, name): node for name in _get_symbol_fields(node.__class__)}
+    if isinstance(node, SymbolTableTrait):
+        # don't look into a new scope (i.e. node with SymbolTableTrait)
+        return own_symbols or _NO_SYMBOLS
+    return _merge_symbols(
+        [own_symbols, *(_subtree_symbols(child) for child in node.iter_children_values())]
+    )
+
+
+def _subtree_symbols(value: Any) -> Mapping[str, Any]:
+    if isinstance(value, concepts.Node):
+        return _declared_symbols(value)
+    if isinstance(value, iterators._ATOMIC_TYPES):
+        return _NO_SYMBOLS
+    return _merge_symbols(
+        _subtree_symbols(child) for child in iterators.generic_iter_children(value)
+    )
 
 
 class SymbolTableTrait(concepts.Model):
+    """Node trait collecting the symbols declared in the scope defined by the node.
+
+    The symbol table (``symtable_``) maps the names of the :class:`eve.SymbolName`
+    fields found in the subtree (excluding the contents of nested scopes) to
+    the nodes declaring them. Tables are built bottom-up from the symbols
+    declared by each child subtree when the scope node is created. The
+    declarations are not cached in the children, which can be modified
+    in place, and the traversal stops at the nested scopes.
+
+    Tables are updated when a children field of the scope node is reassigned
+    and when its subtree is modified by a :class:`eve.NodeMutator`. Other
+    in-place modifications require an explicit call to :meth:`collect_symbols`.
+    """
+
     symtable_: Dict[str, Any] = pydantic.Field(default_factory=dict)
 
     @staticmethod
-    def _collect_symbols(root_node: concepts.TreeNode) -> Dict[str, Any]:
-        return _CollectSymbols.apply(root_node)
+    def _collect_symbols(children: Iterable[Any]) -> Dict[str, Any]:
+        return dict(_merge_symbols(_subtree_symbols(child) for child in children))
 
     @pydantic.root_validator(skip_on_failure=True)
+    @concepts.computes_derived_values
     def _collect_symbols_validator(  # type: ignore  # validators are classmethods
         cls: Type[SymbolTableTrait], values: Dict[str, Any]
     ) -> Dict[str, Any]:
-        values["symtable_"] = cls._collect_symbols(values)
+        values["symtable_"] = cls._collect_symbols(
+            values[name] for name in cls.__node_children_names__ if name in values  # type: ignore
+        )
         return values
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name in self.__node_children__:  # type: ignore  # defined in node classes
+            self._update_symtable()
+
+    def _update_symtable(self) -> None:
+        # Set directly, since frozen scope nodes are also updated after in-place modifications
+        object.__setattr__(
+            self, "symtable_", self._collect_symbols(self.iter_children_values())  # type: ignore
+        )
+
     def collect_symbols(self) -> None:
-        self.symtable_ = self._collect_symbols(self)
+        """Collect again all the symbols of the scope."""
+        self._update_symtable()
+
+
+#: Scope records of SymbolIndex: (symbols declared in the scope, enclosing scope record)
+_ScopeRecord = Tuple[Dict[str, Any], Optional[Tuple[Any, ...]]]
+
+
+class SymbolIndex:
+    """Index of the symbol references of a tree to the nodes declaring them.
+
+    The index is built with a single traversal of the tree, without copying
+    or modifying it. Symbols are declared by the :class:`eve.SymbolName`
+    fields of the nodes and referenced by the :class:`eve.SymbolRef` fields.
+    Scopes are defined by the nodes with the :class:`SymbolTableTrait` and
+    by the instances of the ``scopes`` node classes: the symbols declared
+    in a scope (excluding its nested scopes) are visible in the whole scope
+    and in its nested scopes. The symbols declared by a scope node itself
+    belong to the enclosing scope, while its references are resolved in
+    its own scope. Once built, each resolution is a single dict lookup.
+
+    Like :class:`eve.iterators.TreeIndex`, the index is rebuilt
+    automatically on the next query after modifications applied with a
+    :class:`eve.NodeMutator`, and other in-place modifications of the tree
+    require an explicit call to :meth:`refresh`. Nodes appearing several
+    times in the tree are resolved in the scope of their first occurrence.
+
+    Examples:
+        >>> class Decl(concepts.Node):
+        ...     name: SymbolName
+        >>> class Ref(concepts.Node):
+        ...     target: SymbolRef
+        >>> class Block(concepts.Node):
+        ...     decls: List[concepts.Node]
+        ...     refs: List[concepts.Node]
+        >>> tree = Block(decls=[Decl(name="a")], refs=[Ref(target="a")])
+        >>> index = SymbolIndex(tree)
+        >>> index.resolve(tree.refs[0], "target") is tree.decls[0]
+        True
+
+    """
+
+    tree: concepts.TreeNode
+    scope_classes: Tuple[Type, ...]
+    _epoch: int
+    _scopes: Dict[int, Dict[str, Any]]
+    _references: Dict[Tuple[int, str], Any]
+
+    def __init__(
+        self, tree: concepts.TreeNode, *, scopes: Union[Type, Tuple[Type, ...]] = ()
+    ) -> None:
+        self.tree = tree
+        self.scope_classes = (
+            SymbolTableTrait,
+            *(scopes if isinstance(scopes, tuple) else (scopes,)),
+        )
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Rebuild the index from the current contents of the tree."""
+        self._epoch = iterators.TreeIndex._mutation_epoch
+        self._scopes = {}
+        self._references = {}
+
+        root_record: _ScopeRecord = ({}, None)
+        self._scopes[id(self.tree)] = root_record[0]
+        # (reference key, referenced name, scope record) items resolved at the end
+        references: List[Tuple[Tuple[int, str], str, _ScopeRecord]] = []
+
+        stack: List[Tuple[Any, _ScopeRecord]] = [(self.tree, root_record)]
+        while stack:
+            item, record = stack.pop()
+            if isinstance(item, concepts.Node):
+                for name in _get_symbol_fields(item.__class__):
+                    record[0][getattr(item, name)] = item
+                if isinstance(item, self.scope_classes) and item is not self.tree:
+                    if id(item) in self._scopes:
+                        continue
+                    record = ({}, record)
+                    self._scopes[id(item)] = record[0]
+                for name in _get_reference_fields(item.__class__):
+                    value = getattr(item, name)
+                    if isinstance(value, str):
+                        references.append(((id(item), name), value, record))
+            elif isinstance(item, iterators._ATOMIC_TYPES):
+                continue
+
+            children = list(iterators.generic_iter_children(item))
+            children.reverse()
+            stack.extend((child, record) for child in children)
+
+        for key, name, scope in references:
+            if key in self._references:
+                continue
+            declaration = None
+            current: Optional[_ScopeRecord] = scope
+            while current is not None:
+                declaration = current[0].get(name, None)
+                if declaration is not None:
+                    break
+                current = current[1]  # type: ignore  # nested tuple types
+            self._references[key] = declaration
+
+    def resolve(self, node: concepts.Node, field_name: str) -> Any:
+        """Return the node declaring the symbol referenced by a :class:`eve.SymbolRef` field.
+
+        Raises:
+            EveValueError: if the field is not a reference of the indexed
+                tree or the referenced symbol is not declared.
+
+        """
+        if self._epoch != iterators.TreeIndex._mutation_epoch:
+            self.refresh()
+        try:
+            declaration = self._references[(id(node), field_name)]
+        except KeyError as e:
+            raise exceptions.EveValueError(
+                f"'{field_name}' of node '{node}' is not a symbol reference of the indexed tree"
+            ) from e
+        if declaration is None:
+            raise exceptions.EveValueError(
+                f"Symbol '{getattr(node, field_name)}' referenced by node '{node}' is not declared"
+            )
+        return declaration
+
+    def symbols(self, scope: Optional[concepts.Node] = None) -> Mapping[str, Any]:
+        """Return the symbols declared in a scope node (by default, the root scope)."""
+        if self._epoch != iterators.TreeIndex._mutation_epoch:
+            self.refresh()
+        try:
+            return self._scopes[id(self.tree if scope is None else scope)]
+        except KeyError as e:
+            raise exceptions.EveValueError(
+                f"Node '{scope}' is not a scope of the indexed tree"
+            ) from e
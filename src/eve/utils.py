@@ -249,7 +249,9 @@ def shash(*args: Any, hash_algorithm: Optional[Any] = None) -> str:
     It provides a customizable hash function for any kind of data.
     Unlike the builtin `hash` function, it is stable (same hash value across
     interpreter reboots) and it does not use hash customizations on user
-    classes (it uses `pickle` internally to get a byte stream).
+    classes (it uses `pickle` internally to get a byte stream). Use
+    :func:`eve.concepts.fingerprint` for IR trees, which is faster
+    and ignores the implementation fields of the nodes (e.g. ``id_``).
 
     Args:
         hash_algorithm: object implementing the `hash algorithm` interface
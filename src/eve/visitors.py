@@ -21,23 +21,44 @@ from __future__ import annotations
 
 import collections.abc
 import copy
+import enum
+import inspect
 import operator
 
-from . import concepts, iterators, utils
+from . import concepts, iterators, traits, utils
 from .concepts import NOTHING
+from .iterators import _ATOMIC_TYPES
 from .typingx import (
     Any,
     Callable,
+    ClassVar,
     Collection,
     Dict,
     Iterable,
+    List,
     MutableSequence,
     MutableSet,
+    Optional,
     Tuple,
+    Type,
     Union,
 )
 
 
+VisitorFunc = Callable[..., Any]
+
+#: Types of immutable leaf values which are never copied by translators
+_IMMUTABLE_LEAF_TYPES = (*_ATOMIC_TYPES, enum.Enum)
+
+
+def _forward_to_attribute(name: str) -> VisitorFunc:
+    # Used for visitor methods which are not plain functions (e.g. static methods)
+    def _visitor(self: NodeVisitor, node: concepts.TreeNode, **kwargs: Any) -> Any:
+        return getattr(self, name)(node, **kwargs)
+
+    return _visitor
+
+
 class NodeVisitor:
     """Simple node visitor class based on :class:`ast.NodeVisitor`.
 
@@ -64,7 +85,10 @@ class NodeVisitor:
         3. ``self.generic_visit()``.
 
     This dispatching mechanism is implemented in the main :meth:`visit`
-    method and can be overriden in subclasses.
+    method and can be overriden in subclasses. The visitor functions of a
+    class are collected the first time the class is used and the result of
+    the search for each node class is cached in a per-class dispatch table,
+    so the lookup cost is only paid once per (visitor class, node class) pair.
 
     Note that return values are not forwarded to the caller in the default
     :meth:`generic_visit` implementation. If you want to return a value from
@@ -95,6 +119,48 @@ class NodeVisitor:
         * If the visitor has internal state, make sure visitor instances
           are never reused or clean up the state at the end.
 
+    Very deep trees can be processed by subclasses defined with the
+    ``iterative=True`` class keyword argument, which replaces :meth:`generic_visit`
+    with :meth:`iterative_generic_visit`. The iterative implementation uses an
+    explicit work stack to traverse all the nodes without a specific visitor
+    function, so only user-defined visitor functions add Python frames::
+
+        class Visitor(NodeVisitor, iterative=True):
+            ...
+
+    Since the visitor functions are collected from the visitor class (and
+    used by both the dispatch and the subtree pruning described below),
+    ``visit_*`` methods cannot be assigned to visitor instances, and
+    :meth:`refresh_visitor_functions` should be called after adding methods
+    to a visitor class already in use.
+
+    Visitors only interested in some node classes can skip the subtrees which
+    cannot contain any of them (according to the static analysis of the field
+    annotations done by :func:`eve.concepts.get_reachable_node_classes`),
+    with the ``visit_types`` class keyword argument. It accepts a tuple of node
+    classes or ``"auto"`` to use the class names of the ``visit_*`` methods::
+
+        class Visitor(NodeVisitor, visit_types="auto"):
+            def visit_FieldAccess(self, node, **kwargs):
+                ...
+
+    Note that subtrees are only skipped when :meth:`generic_visit` is called,
+    and that ``"auto"`` pruning is disabled if some visitor function does not
+    match the name of a node class.
+
+    Visitors whose results only depend on the visited node and the keyword
+    arguments (no state accumulated in the visitor and no side effects) can
+    be defined with the ``context_free=True`` class keyword argument. The
+    result of visiting a node is then computed once per top-level
+    :meth:`visit` call and reused for every other occurrence of the same
+    node instance (e.g. interned nodes or subtrees shared by copy-on-write
+    translations) with the same keyword arguments (compared by identity)::
+
+        class Generator(TemplatedGenerator, context_free=True):
+            ...
+
+    Note that the results of context-free translators may also share nodes.
+
     Notes:
         If you want to apply changes to nodes during the traversal,
         use the :class:`NodeMutator` subclass, which handles correctly
@@ -102,28 +168,287 @@ class NodeVisitor:
 
     """
 
-    def visit(self, node: concepts.TreeNode, **kwargs: Any) -> Any:
-        visitor = self.generic_visit
-
-        method_name = "visit_" + node.__class__.__name__
-        if hasattr(self, method_name):
-            visitor = getattr(self, method_name)
-        elif isinstance(node, concepts.Node):
-            for node_class in node.__class__.__mro__[1:]:
-                method_name = "visit_" + node_class.__name__
-                if hasattr(self, method_name):
-                    visitor = getattr(self, method_name)
+    #: Visitor functions indexed by the class name in their ``visit_CLASS_NAME`` method name
+    #: (``None`` until they are collected in the first use of the class)
+    __visitor_functions__: ClassVar[Optional[Dict[str, VisitorFunc]]] = None
+
+    #: Cache of resolved visitor functions for each visited node class (``None``
+    #: means :meth:`generic_visit`)
+    __dispatch_table__: ClassVar[Dict[Type, Optional[VisitorFunc]]] = {}
+
+    #: True if :meth:`generic_visit` uses the non-recursive traversal engine
+    __iterative__: ClassVar[bool] = False
+
+    #: True if the results of visiting nodes are memoized (see ``context_free``)
+    __context_free__: ClassVar[bool] = False
+
+    #: Node classes of interest (``"auto"`` or ``None`` to disable subtree pruning)
+    __visit_types__: ClassVar[Union[None, str, Tuple[Type, ...]]] = None
+
+    #: Cache of prunable node classes (valid for a version of the defined node classes)
+    __prune_table__: ClassVar[Dict[Type, bool]] = {}
+    __prune_table_version__: ClassVar[int] = -1
+
+    @classmethod
+    def __init_subclass__(
+        cls,
+        *,
+        iterative: bool = False,
+        visit_types: Union[None, str, Tuple[Type, ...]] = None,
+        context_free: Optional[bool] = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init_subclass__(**kwargs)  # type: ignore  # mypy issues 4335, 4660
+        if context_free is not None:
+            cls.__context_free__ = context_free
+        if visit_types is not None:
+            if visit_types != "auto" and not (
+                isinstance(visit_types, tuple) and all(isinstance(t, type) for t in visit_types)
+            ):
+                raise TypeError(
+                    f"Invalid 'visit_types' value ({visit_types}): use 'auto' or a tuple of types"
+                )
+            cls.__visit_types__ = visit_types
+        if iterative and not cls.__iterative__:
+            owner = next(c for c in cls.__mro__ if "generic_visit" in c.__dict__)
+            if "iterative_generic_visit" not in owner.__dict__:
+                raise TypeError(
+                    f"Iterative traversal is not supported by '{owner.__qualname__}.generic_visit'"
+                )
+            cls.generic_visit = owner.__dict__["iterative_generic_visit"]  # type: ignore
+            cls.__iterative__ = True
+
+        cls.refresh_visitor_functions()
+
+    @classmethod
+    def refresh_visitor_functions(cls) -> None:
+        """Collect again the visitor functions of the class, when it is used next.
+
+        Only needed after adding or replacing ``visit_*`` methods of a visitor
+        class which has already been used.
+        """
+        cls.__visitor_functions__ = None
+        cls.__dispatch_table__ = {}
+        cls.__prune_table__ = {}
+        cls.__prune_table_version__ = -1
+
+    @classmethod
+    def _get_visitor_functions(cls) -> Dict[str, VisitorFunc]:
+        visitor_functions = cls.__visitor_functions__
+        if visitor_functions is None:
+            visitor_functions = {}
+            for name in dir(cls):
+                if name.startswith("visit_"):
+                    func = inspect.getattr_static(cls, name)
+                    if not inspect.isfunction(func):
+                        func = _forward_to_attribute(name)
+                    visitor_functions[name[len("visit_") :]] = func  # noqa: E203
+            cls.__visitor_functions__ = visitor_functions
+        return visitor_functions
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name.startswith("visit_"):
+            raise AttributeError(
+                f"Visitor functions must be defined in the visitor class ('{name}' assigned "
+                f"to an instance of '{self.__class__.__qualname__}')"
+            )
+        super().__setattr__(name, value)
+
+    @classmethod
+    def _resolve_visitor(cls, node_class: Type) -> Optional[VisitorFunc]:
+        """Find the visitor function for a node class and store it in the dispatch table."""
+        visitor = cls._find_visitor_function(node_class.__name__)
+        if visitor is None and issubclass(node_class, concepts.Node):
+            for base in node_class.__mro__[1:]:
+                visitor = cls._find_visitor_function(base.__name__)
+                if visitor is not None or base is concepts.Node:
                     break
 
-                if node_class is concepts.Node:
-                    break
+        cls.__dispatch_table__[node_class] = visitor
+        return visitor
+
+    @classmethod
+    def _find_visitor_function(cls, class_name: str) -> Optional[VisitorFunc]:
+        return cls._get_visitor_functions().get(class_name, None)
+
+    @classmethod
+    def _is_prunable(cls, node_class: Type) -> bool:
+        """Check if the subtrees of a node class cannot contain any node of interest."""
+        version = concepts.get_node_classes_version()
+        if cls.__prune_table_version__ != version:
+            cls.__prune_table__ = {}
+            cls.__prune_table_version__ = version
+        try:
+            return cls.__prune_table__[node_class]
+        except KeyError:
+            pass
+
+        result = False
+        reachable = concepts._get_reachable_types(node_class)
+        if reachable is not None:
+            if cls.__visit_types__ == "auto":
+                # Leaf types are included in the check, since the visitor
+                # function names could also match non-node classes
+                names = set(cls._get_visitor_functions().keys())
+                node_names = {c.__name__ for c in concepts._get_subclasses(concepts.BaseNode)}
+                result = names <= node_names and not any(
+                    base.__name__ in names for item in reachable for base in item.__mro__
+                )
+            else:
+                visit_types = cls.__visit_types__
+                result = not any(
+                    issubclass(item, visit_types)  # type: ignore
+                    for item in reachable
+                    if issubclass(item, concepts.BaseNode)
+                )
 
-        return visitor(node, **kwargs)
+        cls.__prune_table__[node_class] = result
+        return result
+
+    def visit(self, node: concepts.TreeNode, **kwargs: Any) -> Any:
+        if self.__context_free__:
+            return self._memoized_visit(node, kwargs)
+
+        try:
+            visitor = self.__dispatch_table__[node.__class__]
+        except KeyError:
+            visitor = self._resolve_visitor(node.__class__)
+
+        if visitor is None:
+            return self.generic_visit(node, **kwargs)
+        return visitor(self, node, **kwargs)
+
+    def _memoized_visit(self, node: concepts.TreeNode, kwargs: Dict[str, Any]) -> Any:
+        memo = self.__dict__.get("_visit_memo_", None)
+        if memo is None:
+            # Top-level call: the memo only lives during the current visit
+            self._visit_memo_: Dict[Any, Tuple[Any, ...]] = {}
+            try:
+                return self._memoized_visit(node, kwargs)
+            finally:
+                del self._visit_memo_
+
+        key = None
+        if isinstance(node, concepts.BaseNode):
+            key = _memo_key(node, kwargs)
+            entry = memo.get(key, None)
+            if entry is not None:
+                return entry[-1]
+
+        try:
+            visitor = self.__dispatch_table__[node.__class__]
+        except KeyError:
+            visitor = self._resolve_visitor(node.__class__)
+        if visitor is None:
+            result = self.generic_visit(node, **kwargs)
+        else:
+            result = visitor(self, node, **kwargs)
+
+        if key is not None:
+            # Keep references to the keys to avoid the reuse of their ids
+            memo[key] = (node, kwargs, result)
+        return result
 
     def generic_visit(self, node: concepts.TreeNode, **kwargs: Any) -> Any:
+        if (
+            self.__visit_types__ is not None
+            and isinstance(node, concepts.Node)
+            and self._is_prunable(node.__class__)
+        ):
+            return
         for child in iterators.generic_iter_children(node):
             self.visit(child, **kwargs)
 
+    def iterative_generic_visit(self, node: concepts.TreeNode, **kwargs: Any) -> Any:
+        """Visit the children of a node using an explicit stack instead of recursion.
+
+        Nodes without a specific visitor function are expanded in place
+        and only the visitor functions defined by the user are called
+        (following the same pre-order as :meth:`generic_visit`).
+        """
+        dispatch_table = self.__dispatch_table__
+        prune = self.__visit_types__ is not None
+        if prune and isinstance(node, concepts.Node) and self._is_prunable(node.__class__):
+            return
+        memo = self.__dict__.get("_visit_memo_", None)
+        stack = list(iterators.generic_iter_children(node))
+        stack.reverse()
+        while stack:
+            item = stack.pop()
+            key = None
+            if memo is not None and isinstance(item, concepts.BaseNode):
+                key = _memo_key(item, kwargs)
+                if key in memo:
+                    continue
+            try:
+                visitor = dispatch_table[item.__class__]
+            except KeyError:
+                visitor = self._resolve_visitor(item.__class__)
+
+            if visitor is None:
+                if key is not None:
+                    # Like generic_visit(), expanded nodes return None
+                    memo[key] = (item, kwargs, None)
+                if isinstance(item, concepts.Node):
+                    if prune and self._is_prunable(item.__class__):
+                        continue
+                    children = list(item.__class__.__node_children_getter__(item))
+                elif isinstance(item, _ATOMIC_TYPES):
+                    continue
+                else:
+                    children = list(iterators.generic_iter_children(item))
+                children.reverse()
+                stack.extend(children)
+            else:
+                result = visitor(self, item, **kwargs)
+                if key is not None:
+                    memo[key] = (item, kwargs, result)
+
+
+def _memo_key(node: concepts.BaseNode, kwargs: Dict[str, Any]) -> Any:
+    if kwargs:
+        return (id(node), *((name, id(value)) for name, value in kwargs.items()))
+    return id(node)
+
+
+_VISIT = object()
+_REBUILD = object()
+
+
+def _translation_children(node: Any) -> Optional[Tuple[Optional[List[Any]], List[Any]]]:
+    # Return the keys (if any) and values of the children to be translated or None for leaves
+    if isinstance(node, _ATOMIC_TYPES):
+        return None
+    if isinstance(node, (concepts.Node, collections.abc.Collection)) and utils.is_collection(node):
+        if isinstance(node, concepts.Node):
+            node_class = node.__class__
+            return (
+                list(node_class.__node_children_names__),
+                list(node_class.__node_children_getter__(node)),
+            )
+        elif isinstance(node, (collections.abc.Sequence, collections.abc.Set)):
+            return None, list(node)
+        elif isinstance(node, collections.abc.Mapping):
+            return list(node.keys()), list(node.values())
+        else:
+            return None, []
+
+    return None
+
+
+def _are_children_unchanged(node: Any, keys: Optional[List[Any]], values: List[Any]) -> bool:
+    # Check if all the translated values are the original children (by identity)
+    if isinstance(node, concepts.Node):
+        assert keys is not None
+        return all(getattr(node, key) is value for key, value in zip(keys, values))
+    elif isinstance(node, collections.abc.Mapping):
+        assert keys is not None
+        return all(node[key] is value for key, value in zip(keys, values))
+    else:
+        return len(node) == len(values) and all(
+            old_value is value for old_value, value in zip(node, values)
+        )
+
 
 class NodeTranslator(NodeVisitor):
     """Special `NodeVisitor` to translate nodes and trees.
@@ -144,49 +469,160 @@ class NodeTranslator(NodeVisitor):
 
        output_node = YourTranslator.apply(input_node)
 
+    Translators defined with the ``copy_on_write=True`` class keyword argument
+    share the unchanged parts of the input tree with the output tree: leaf
+    values are returned as they are and nodes and collections are only
+    rebuilt if at least one of their children has been replaced, so the cost
+    of the translation is proportional to the size of the changes::
+
+        class Translator(NodeTranslator, copy_on_write=True):
+            ...
+
+    Since the output tree may contain nodes of the input tree, copy-on-write
+    translators should not be combined with in-place modifications of any
+    of the trees. Only copy-on-write translators support subtree pruning
+    with the ``visit_types`` class keyword argument (see :class:`NodeVisitor`),
+    which returns the skipped subtrees as they are. Immutable leaf values
+    (strings, numbers, enum members, etc.) are never copied in any mode.
+
     Notes:
         Check :class:`NodeVisitor` documentation for more details.
 
     """
 
+    #: True if unchanged subtrees are shared with the input tree instead of copied
+    __copy_on_write__: ClassVar[bool] = False
+
     _memo_dict_: Dict[int, Any]
 
+    @classmethod
+    def __init_subclass__(cls, *, copy_on_write: Optional[bool] = None, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        if copy_on_write is not None:
+            cls.__copy_on_write__ = copy_on_write
+        if cls.__visit_types__ is not None and not cls.__copy_on_write__:
+            raise TypeError("Subtree pruning ('visit_types') requires 'copy_on_write=True'")
+
     def generic_visit(self, node: concepts.TreeNode, **kwargs: Any) -> Any:
-        result: Any = None
-        if isinstance(node, (concepts.Node, collections.abc.Collection)) and utils.is_collection(
-            node
+        if (
+            self.__visit_types__ is not None
+            and isinstance(node, concepts.Node)
+            and self._is_prunable(node.__class__)
         ):
-            tmp_items: Collection[concepts.TreeNode] = []
-            if isinstance(node, concepts.Node):
-                tmp_items = {
-                    key: self.visit(value, **kwargs) for key, value in node.iter_children()
-                }
-                result = node.__class__(  # type: ignore
-                    **{key: value for key, value in node.iter_impl_fields()},
-                    **{key: value for key, value in tmp_items.items() if value is not NOTHING},
-                )
-
-            elif isinstance(node, (collections.abc.Sequence, collections.abc.Set)):
-                # Sequence or set: create a new container instance with the new values
-                tmp_items = [self.visit(value, **kwargs) for value in node]
-                result = node.__class__(  # type: ignore
-                    value for value in tmp_items if value is not NOTHING
-                )
-
-            elif isinstance(node, collections.abc.Mapping):
-                # Mapping: create a new mapping instance with the new values
-                tmp_items = {key: self.visit(value, **kwargs) for key, value in node.items()}
-                result = node.__class__(  # type: ignore
-                    {key: value for key, value in tmp_items.items() if value is not NOTHING}
-                )
+            return node
+        children = _translation_children(node)
+        if children is None:
+            return self.copy_leaf(node)
+
+        keys, values = children
+        return self.rebuild(node, keys, [self.visit(value, **kwargs) for value in values])
+
+    def iterative_generic_visit(self, node: concepts.TreeNode, **kwargs: Any) -> Any:
+        """Translate a node using an explicit stack instead of recursion.
+
+        Nodes without a specific visitor function are expanded in place
+        and rebuilt once all their children have been translated, so only
+        the visitor functions defined by the user add Python frames.
+        """
+        dispatch_table = self.__dispatch_table__
+        results: List[Any] = []
+        # Work items: (_VISIT, item) or (_REBUILD, item, keys, number_of_translated_children)
+        stack: List[Tuple[Any, ...]] = []
+
+        prune = self.__visit_types__ is not None
+
+        def expand(item: Any) -> None:
+            if prune and isinstance(item, concepts.Node) and self._is_prunable(item.__class__):
+                results.append(item)
+                return
+            children = _translation_children(item)
+            if children is None:
+                results.append(self.copy_leaf(item))
+            else:
+                keys, values = children
+                stack.append((_REBUILD, item, keys, len(values)))
+                stack.extend((_VISIT, value) for value in reversed(values))
+
+        memo = self.__dict__.get("_visit_memo_", None)
+
+        expand(node)
+        while stack:
+            entry = stack.pop()
+            if entry[0] is _VISIT:
+                item = entry[1]
+                key = None
+                if memo is not None and isinstance(item, concepts.BaseNode):
+                    key = _memo_key(item, kwargs)
+                    memo_entry = memo.get(key, None)
+                    if memo_entry is not None:
+                        results.append(memo_entry[-1])
+                        continue
+
+                try:
+                    visitor = dispatch_table[item.__class__]
+                except KeyError:
+                    visitor = self._resolve_visitor(item.__class__)
+
+                if visitor is None:
+                    expand(item)
+                else:
+                    results.append(visitor(self, item, **kwargs))
+                    if key is not None:
+                        memo[key] = (item, kwargs, results[-1])  # type: ignore
+            else:
+                _, item, keys, count = entry
+                values = results[len(results) - count :]  # noqa: E203
+                del results[len(results) - count :]  # noqa: E203
+                results.append(self.rebuild(item, keys, values))
+                if memo is not None and isinstance(item, concepts.BaseNode) and stack:
+                    memo[_memo_key(item, kwargs)] = (item, kwargs, results[-1])
+
+        return results.pop()
+
+    def rebuild(self, node: concepts.TreeNode, keys: Optional[List[Any]], values: List[Any]) -> Any:
+        """Create a new node or collection from the translated values of its children.
+
+        In copy-on-write translators, the original node is returned instead
+        if all the values are the original children.
+
+        Args:
+            node: Original node or collection.
+            keys: Field names or mapping keys of the children (``None`` for sequences and sets).
+            values: Translated children values (:obj:`eve.NOTHING` values are removed).
+
+        """
+        if self.__copy_on_write__ and _are_children_unchanged(node, keys, values):
+            return node
 
-        else:
-            if not hasattr(self, "_memo_dict_"):
-                self._memo_dict_ = {}
-            result = copy.deepcopy(node, memo=self._memo_dict_)
+        result: Any = None
+        if isinstance(node, concepts.Node):
+            assert keys is not None
+            result = node.__class__(  # type: ignore
+                **{key: value for key, value in node.iter_impl_fields()},
+                **{key: value for key, value in zip(keys, values) if value is not NOTHING},
+            )
+        elif isinstance(node, (collections.abc.Sequence, collections.abc.Set)):
+            # Sequence or set: create a new container instance with the new values
+            result = node.__class__(  # type: ignore
+                value for value in values if value is not NOTHING
+            )
+        elif isinstance(node, collections.abc.Mapping):
+            # Mapping: create a new mapping instance with the new values
+            assert keys is not None
+            result = node.__class__(  # type: ignore
+                {key: value for key, value in zip(keys, values) if value is not NOTHING}
+            )
 
         return result
 
+    def copy_leaf(self, node: Any) -> Any:
+        """Return a copy of a leaf value of the tree (or the value itself if it is immutable)."""
+        if self.__copy_on_write__ or isinstance(node, _IMMUTABLE_LEAF_TYPES):
+            return node
+        if not hasattr(self, "_memo_dict_"):
+            self._memo_dict_ = {}
+        return copy.deepcopy(node, memo=self._memo_dict_)
+
 
 class NodeMutator(NodeVisitor):
     """Special `NodeVisitor` to modify nodes in place.
@@ -210,6 +646,12 @@ class NodeMutator(NodeVisitor):
 
        YourMutator.apply(node)
 
+    Modifications applied by :meth:`generic_visit` invalidate all the
+    existing :class:`eve.iterators.TreeIndex` instances and the cached
+    properties (see :class:`eve.cached_node_property`) of the modified
+    nodes and their ancestors, and update the symbol tables of the
+    enclosing scopes (see :class:`eve.SymbolTableTrait`).
+
     Notes:
         Check :class:`NodeVisitor` documentation for more details.
 
@@ -217,6 +659,12 @@ class NodeMutator(NodeVisitor):
 
     def generic_visit(self, node: concepts.TreeNode, **kwargs: Any) -> Any:
         result: Any = node
+        if (
+            self.__visit_types__ is not None
+            and isinstance(node, concepts.Node)
+            and self._is_prunable(node.__class__)
+        ):
+            return result
         if isinstance(node, (concepts.Node, collections.abc.Collection)) and utils.is_collection(
             node
         ):
@@ -225,6 +673,8 @@ class NodeMutator(NodeVisitor):
             set_op: Union[Callable[[Any, str, Any], None], Callable[[Any, int, Any], None]]
             del_op: Union[Callable[[Any, str], None], Callable[[Any, int], None]]
 
+            epoch = iterators.TreeIndex._mutation_epoch
+
             if isinstance(node, concepts.Node):
                 items = list(node.iter_children())
                 set_op = setattr
@@ -274,11 +724,145 @@ class NodeMutator(NodeVisitor):
                 )
 
             # Finally, in case current node object is mutable, process selected items (if any)
-            for key, value in items:
-                new_value = self.visit(value, **kwargs)
-                if new_value is concepts.NOTHING:
-                    del_op(result, key)
-                elif new_value != value:
-                    set_op(result, key, new_value)
+            self._mutate_items(result, items, set_op, del_op, kwargs)
+
+            if isinstance(node, concepts.Node) and epoch != iterators.TreeIndex._mutation_epoch:
+                _refresh_modified_node(node)
 
         return result
+
+    def _mutate_items(
+        self,
+        container: Any,
+        items: Iterable[Tuple[Any, Any]],
+        set_op: Callable[..., None],
+        del_op: Callable[..., None],
+        kwargs: Dict[str, Any],
+    ) -> None:
+        for key, value in items:
+            new_value = self.visit(value, **kwargs)
+            if new_value is concepts.NOTHING:
+                del_op(container, key)
+                iterators.TreeIndex.notify_mutation(invalidate_properties=False)
+            elif new_value is not value:
+                set_op(container, key, new_value)
+                iterators.TreeIndex.notify_mutation(invalidate_properties=False)
+
+
+def _refresh_modified_node(node: concepts.Node) -> None:
+    # Cached properties and symbol tables of nodes depend on their whole subtree
+    if node._node_property_cache:
+        object.__setattr__(node, "_node_property_cache", None)
+    if isinstance(node, traits.SymbolTableTrait):
+        node._update_symtable()
+
+
+class FusedNodeVisitor:
+    """Run several independent read-only :class:`NodeVisitor` instances in a single traversal.
+
+    The tree is walked only once and, for every visited item, each one of
+    the fused visitors calls its own visitor function (found with the usual
+    dispatching mechanism) with its own state. Calls to ``self.generic_visit(node)``
+    inside the visitor functions do not traverse the subtree immediately:
+    they just ask the fused traversal to keep visiting the children of
+    ``node`` (with the provided keyword arguments) for that visitor, so
+    visitor functions can still prune subtrees, restrict the traversal to
+    some of the children or pass context information down to the children.
+    Only the children of the current node are visited in the fused traversal,
+    the subtrees of other descendants are traversed just for the visitor
+    requesting them::
+
+        FusedNodeVisitor(VisitorA(), VisitorB(), VisitorC()).visit(tree)
+
+    Since all the visitor functions are called in pre-order, a visitor can
+    be fused only if:
+
+        * it does not modify the tree, and its visitor functions do not
+          depend on return values or on code executed after the calls
+          to ``self.generic_visit()``.
+        * ``self.generic_visit()`` is only called with the current node or
+          some of its descendants.
+        * it does not depend on the results of the other fused visitors
+          for the same tree (visitors are called in the given order at
+          each node, not one after the other for the whole tree).
+
+    """
+
+    visitors: Tuple[NodeVisitor, ...]
+
+    def __init__(self, *visitors: NodeVisitor) -> None:
+        for visitor in visitors:
+            if not isinstance(visitor, NodeVisitor) or isinstance(
+                visitor, (NodeTranslator, NodeMutator)
+            ):
+                raise TypeError(
+                    f"Only read-only NodeVisitor instances can be fused (got '{visitor}')"
+                )
+        self.visitors = visitors
+
+    @classmethod
+    def apply(
+        cls, tree: concepts.TreeNode, *visitors: NodeVisitor, **kwargs: Any
+    ) -> Tuple[NodeVisitor, ...]:
+        """Visit ``tree`` with all the ``visitors`` and return them (to access their results)."""
+        cls(*visitors).visit(tree, **kwargs)
+        return visitors
+
+    def visit(self, node: concepts.TreeNode, **kwargs: Any) -> None:
+        # Nodes whose children should be visited by a visitor (and its kwargs), as
+        # requested by the visitor functions called for the current item
+        requests: List[Tuple[Any, NodeVisitor, Dict[str, Any]]] = []
+
+        def make_generic_visit(visitor: NodeVisitor) -> VisitorFunc:
+            def _generic_visit(node: concepts.TreeNode, **kwargs: Any) -> None:
+                requests.append((node, visitor, kwargs))
+
+            return _generic_visit
+
+        for visitor in self.visitors:
+            visitor.generic_visit = make_generic_visit(visitor)  # type: ignore  # shadow method
+
+        try:
+            stack: List[Tuple[Any, List[Tuple[NodeVisitor, Dict[str, Any]]]]] = [
+                (node, [(visitor, kwargs) for visitor in self.visitors])
+            ]
+            while stack:
+                item, active = stack.pop()
+                children_active = []
+                for visitor, visitor_kwargs in active:
+                    try:
+                        visitor_func = visitor.__dispatch_table__[item.__class__]
+                    except KeyError:
+                        visitor_func = visitor._resolve_visitor(item.__class__)
+
+                    if visitor_func is None:
+                        if (
+                            visitor.__visit_types__ is None
+                            or not isinstance(item, concepts.Node)
+                            or not visitor._is_prunable(item.__class__)
+                        ):
+                            children_active.append((visitor, visitor_kwargs))
+                    else:
+                        visitor_func(visitor, item, **visitor_kwargs)
+
+                # The children of the current item are visited in the fused traversal,
+                # while descendants requested by a visitor are visited only for that
+                # visitor right after the item (occurrences of shared nodes at other
+                # positions cannot be told apart by identity)
+                separate = []
+                for requested, visitor, visitor_kwargs in requests:
+                    if requested is item:
+                        children_active.append((visitor, visitor_kwargs))
+                    else:
+                        separate.append((requested, [(visitor, visitor_kwargs)]))
+                requests.clear()
+
+                for subtree, subtree_active in [(item, children_active), *reversed(separate)]:
+                    if subtree_active:
+                        children = list(iterators.generic_iter_children(subtree))
+                        children.reverse()
+                        stack.extend((child, subtree_active) for child in children)
+
+        finally:
+            for visitor in self.visitors:
+                visitor.__dict__.pop("generic_visit", None)
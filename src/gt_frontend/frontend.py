@@ -29,6 +29,7 @@ from gt_frontend.gtscript_to_gtir import (
 )
 from gt_frontend.py_to_gtscript import PyToGTScript
 
+import eve
 from gtc import common
 from gtc.unstructured.gtir_to_nir import GtirToNir
 from gtc.unstructured.nir_passes.merge_horizontal_loops import find_and_merge_horizontal_loops
@@ -95,11 +96,24 @@ class GTScriptCompilationTask:
 
         return self.gtir
 
-    def _generate_cpp(self, *, debug=False, code_generator=UsidGpuCodeGenerator):
+    def _generate_cpp(
+        self,
+        *,
+        debug=False,
+        code_generator=UsidGpuCodeGenerator,
+        validation_level=eve.ValidationLevel.FULL,
+    ):
+        def lowered(tree):
+            # With DEFERRED validation, each lowered tree is validated before the next pass
+            if validation_level == eve.ValidationLevel.DEFERRED:
+                eve.validate_tree(tree)
+            return tree
+
         # Code generation
-        nir_comp = GtirToNir().visit(self.gtir)
-        nir_comp = find_and_merge_horizontal_loops(nir_comp)
-        usid_comp = NirToUsid().visit(nir_comp)
+        with eve.validation_level(validation_level):
+            nir_comp = lowered(GtirToNir().visit(self.gtir))
+            nir_comp = lowered(find_and_merge_horizontal_loops(nir_comp))
+            usid_comp = lowered(NirToUsid().visit(nir_comp))
 
         if debug:
             devtools.debug(nir_comp)
@@ -109,12 +123,26 @@ class GTScriptCompilationTask:
 
         return self.cpp_code
 
-    def generate(self, *, debug=False, code_generator=UsidGpuCodeGenerator):
+    def generate(
+        self,
+        *,
+        debug=False,
+        code_generator=UsidGpuCodeGenerator,
+        validation_level=eve.ValidationLevel.FULL,
+    ):
         """
         Generate c++ code of the stencil.
+
+        The nodes created by the lowering passes are fully validated by default.
+        Since these passes build nodes from valid nodes, ``validation_level``
+        can be set to ``TRUSTED`` to skip the validation, or to ``DEFERRED`` to
+        validate each lowered tree once it is complete (see
+        :class:`eve.ValidationLevel`).
         """
         self._generate_gtscript_ast()
         self._generate_gtir()
-        self._generate_cpp(debug=debug, code_generator=code_generator)
+        self._generate_cpp(
+            debug=debug, code_generator=code_generator, validation_level=validation_level
+        )
 
         return self.cpp_code
@@ -19,7 +19,7 @@ from typing import Generic, TypeVar
 
 from pydantic import root_validator
 
-from eve import GenericNode, IntEnum, Node, Str, StrEnum
+from eve import GenericNode, IntEnum, Node, Str, StrEnum, computes_derived_values
 
 
 class AssignmentKind(StrEnum):
@@ -107,6 +107,7 @@ class BinaryOp(Expr, GenericNode, Generic[ExprT]):
     right: ExprT
 
     @root_validator(pre=True)
+    @computes_derived_values
     def check_location_type(cls, values):
         if values["left"].location_type != values["right"].location_type:
             raise ValueError("Location type mismatch")
@@ -132,6 +133,7 @@ class AssignStmt(Stmt, GenericNode, Generic[LeftT, ExprT]):
     right: ExprT
 
     @root_validator(pre=True)
+    @computes_derived_values
     def check_location_type(cls, values):
         if values["left"].location_type != values["right"].location_type:
             raise ValueError("Location type mismatch")
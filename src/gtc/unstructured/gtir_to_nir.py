@@ -48,8 +48,12 @@ class GtirToNir(eve.NodeTranslator):
         }
     )
 
+    def __init__(self, **kwargs):
+        super().__init__()
+        self.uid_generator = eve.ContentUIDGenerator()
+
     def visit_NeighborChain(self, node: gtir.NeighborChain, **kwargs):
-        return nir.NeighborChain(elements=node.elements)
+        return nir.NeighborChain(elements=tuple(node.elements))
 
     def visit_HorizontalDimension(self, node: gtir.HorizontalDimension, **kwargs):
         return nir.HorizontalDimension(
@@ -112,8 +116,8 @@ class GtirToNir(eve.NodeTranslator):
         return nir.FieldAccess(
             name=node.name,
             location_type=node.location_type,
-            primary=primary_chain,
-            secondary=secondary_chain,
+            primary=self.visit(primary_chain),
+            secondary=self.visit(secondary_chain) if secondary_chain else None,
         )
 
     def visit_NeighborReduce(self, node: gtir.NeighborReduce, *, last_block, **kwargs):
@@ -123,7 +127,7 @@ class GtirToNir(eve.NodeTranslator):
         kwargs["location_comprehensions"] = loc_comprehension
 
         body_location = node.neighbors.chain.elements[-1]
-        reduce_var_name = "local" + str(node.id_)
+        reduce_var_name = self.uid_generator.id(node, prefix="local")
         last_block.declarations.append(
             nir.LocalVar(
                 name=reduce_var_name,
@@ -20,7 +20,7 @@ from typing import List, Optional, Tuple
 
 from pydantic import root_validator
 
-from eve import Bool, Int, IntEnum, Node, Str
+from eve import Bool, Int, IntEnum, Node, Str, computes_derived_values
 from gtc import common
 
 
@@ -60,6 +60,7 @@ class BinaryOp(Expr):
     right: Expr
 
     @root_validator(pre=True)
+    @computes_derived_values
     def check_location_type(cls, values):
         if values["left"].location_type != values["right"].location_type:
             raise ValueError("Location type mismatch")
@@ -82,6 +83,7 @@ class AssignmentExpr(Expr):
     right: Expr
 
     @root_validator(pre=True)
+    @computes_derived_values
     def check_location_type(cls, values):
         if not (values["left"].location_type == values["right"].location_type):
             raise ValueError("Location type mismatch")
@@ -102,6 +104,7 @@ class ReduceOverNeighbourExpr(Expr):
     right_location_type: LocationType  # TODO Doesn't make sense?
 
     @root_validator(pre=True)
+    @computes_derived_values
     def check_location_type(cls, values):
         # TODO location type of init? Do we need a `NoLocation` location type?
         if "right_location_type" not in values:
@@ -115,6 +118,7 @@ class BlockStmt(Stmt):
     statements: List[Stmt]
 
     @root_validator(pre=True)
+    @computes_derived_values
     def check_location_type(cls, values):
         statements = values["statements"]
         if len(statements) == 0:
@@ -134,6 +138,7 @@ class ExprStmt(Stmt):
     expr: AssignmentExpr
 
     @root_validator(pre=True)
+    @computes_derived_values
     def check_location_type(cls, values):
         if "location_type" not in values:
             values["location_type"] = values["expr"].location_type
@@ -155,6 +160,7 @@ class HorizontalLoop(Node):
     ast: BlockStmt
 
     @root_validator(pre=True)
+    @computes_derived_values
     def check_location_type(cls, values):
         if "location_type" not in values:
             values["location_type"] = values["ast"].location_type
@@ -19,8 +19,7 @@ from typing import List, Optional, Tuple, Union
 from devtools import debug  # noqa: F401
 from pydantic import root_validator, validator
 
-import eve
-from eve import Node, Str
+from eve import FrozenNode, Node, Str, computes_derived_values
 from gtc import common
 
 
@@ -39,19 +38,9 @@ class Literal(Expr):
     vtype: common.DataType
 
 
-class NeighborChain(Node):
+class NeighborChain(FrozenNode, interned=True):
     elements: Tuple[common.LocationType, ...]
 
-    class Config(eve.concepts.FrozenModelConfig):
-        pass
-
-    # TODO see https://github.com/eth-cscs/eve_toolchain/issues/40
-    def __hash__(self):
-        return hash(self.elements)
-
-    def __eq__(self, other):
-        return self.elements == other.elements
-
     @validator("elements")
     def not_empty(cls, elements):
         if len(elements) < 1:
@@ -76,6 +65,7 @@ class BlockStmt(Stmt):
         validate_assignment = True
 
     @root_validator(pre=True)
+    @computes_derived_values
     def check_location_type(cls, values):
         all_locations = [s.location_type for s in values["statements"]] + [
             d.location_type for d in values["declarations"]
@@ -18,7 +18,6 @@ from typing import List
 
 import networkx as nx
 
-import eve  # noqa: F401
 from eve import Node, NodeTranslator, NodeVisitor
 from gtc.unstructured import nir
 from gtc.unstructured.nir_passes.field_dependency_graph import generate_dependency_graph
@@ -85,6 +84,37 @@ def _find_merge_candidates(root: nir.VerticalLoop):
     return _FindMergeCandidatesAnalysis().find(root)
 
 
+def _merge_horizontal_loops(
+    horizontal_loops: List[nir.HorizontalLoop], merge_candidates: List[List[nir.HorizontalLoop]]
+) -> List[nir.HorizontalLoop]:
+    """Return a new list of loops where each merge candidate is replaced by a single loop."""
+    result = list(horizontal_loops)
+    for candidate in merge_candidates:
+        declarations = []
+        statements = []
+        location_type = candidate[0].location_type
+
+        first_index = result.index(candidate[0])
+        last_index = result.index(candidate[-1])
+
+        for loop in candidate:
+            declarations += loop.stmt.declarations
+            statements += loop.stmt.statements
+
+        result[first_index : last_index + 1] = [  # noqa: E203
+            nir.HorizontalLoop(
+                stmt=nir.BlockStmt(
+                    declarations=declarations,
+                    statements=statements,
+                    location_type=location_type,
+                ),
+                location_type=location_type,
+            )
+        ]
+
+    return result
+
+
 class MergeHorizontalLoops(NodeTranslator):
     """"""
 
@@ -97,29 +127,7 @@ class MergeHorizontalLoops(NodeTranslator):
     def visit_VerticalLoop(
         self, node: nir.VerticalLoop, *, merge_candidates: List[List[nir.HorizontalLoop]], **kwargs
     ):
-        for candidate in merge_candidates:
-            declarations = []
-            statements = []
-            location_type = candidate[0].location_type
-
-            first_index = node.horizontal_loops.index(candidate[0])
-            last_index = node.horizontal_loops.index(candidate[-1])
-
-            for loop in candidate:
-                declarations += loop.stmt.declarations
-                statements += loop.stmt.statements
-
-            node.horizontal_loops[first_index : last_index + 1] = [  # noqa: E203
-                nir.HorizontalLoop(
-                    stmt=nir.BlockStmt(
-                        declarations=declarations,
-                        statements=statements,
-                        location_type=location_type,
-                    ),
-                    location_type=location_type,
-                )
-            ]
-
+        node.horizontal_loops[:] = _merge_horizontal_loops(node.horizontal_loops, merge_candidates)
         return node
 
 
@@ -129,10 +137,19 @@ def merge_horizontal_loops(
     return MergeHorizontalLoops().apply(root, merge_candidates)
 
 
-def find_and_merge_horizontal_loops(root: Node):
-    copy = root.copy(deep=True)
-    vertical_loops = eve.iter_tree(copy).if_isinstance(nir.VerticalLoop).to_list()
-    for loop in vertical_loops:
-        loop = merge_horizontal_loops(loop, _find_merge_candidates(loop))
+class _FindAndMergeHorizontalLoops(NodeTranslator, copy_on_write=True, visit_types="auto"):
+    """Merge the horizontal loops of all vertical loops, sharing the unchanged subtrees."""
+
+    def visit_VerticalLoop(self, node: nir.VerticalLoop, **kwargs):
+        merge_candidates = _find_merge_candidates(node)
+        if not merge_candidates:
+            return node
+
+        return nir.VerticalLoop(
+            horizontal_loops=_merge_horizontal_loops(node.horizontal_loops, merge_candidates),
+            loop_order=node.loop_order,
+        )
 
-    return copy
+
+def find_and_merge_horizontal_loops(root: Node):
+    return _FindAndMergeHorizontalLoops().visit(root)
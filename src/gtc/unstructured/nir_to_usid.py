@@ -36,6 +36,7 @@ class NirToUsid(eve.NodeTranslator):
     def __init__(self, **kwargs):
         super().__init__()
         self.fields = dict()  # poor man symbol table
+        self.uid_generator = eve.ContentUIDGenerator()
 
     def convert_dimensions(self, dims: nir.Dimensions):
         dimensions = []
@@ -49,7 +50,7 @@ class NirToUsid(eve.NodeTranslator):
         return dimensions
 
     def visit_NeighborChain(self, node: nir.NeighborChain, **kwargs):
-        return usid.NeighborChain(elements=[location for location in node.elements])
+        return usid.NeighborChain(elements=tuple(node.elements))
 
     def visit_VerticalDimension(self, node: nir.VerticalDimension, **kwargs):
         return usid.VerticalDimension()
@@ -76,12 +77,11 @@ class NirToUsid(eve.NodeTranslator):
         return usid.Literal(value=node.value, vtype=node.vtype, location_type=node.location_type)
 
     def visit_NeighborLoop(self, node: nir.NeighborLoop, **kwargs):
+        neighbors = self.visit(node.neighbors)
         return usid.NeighborLoop(
-            outer_sid=kwargs["sids_tbl"][usid.NeighborChain(elements=[node.location_type])].name,
-            connectivity=kwargs["conn_tbl"][node.neighbors].name,
-            sid=kwargs["sids_tbl"][node.neighbors].name
-            if node.neighbors in kwargs["sids_tbl"]
-            else None,
+            outer_sid=kwargs["sids_tbl"][usid.NeighborChain(elements=(node.location_type,))].name,
+            connectivity=kwargs["conn_tbl"][neighbors].name,
+            sid=kwargs["sids_tbl"][neighbors].name if neighbors in kwargs["sids_tbl"] else None,
             location_type=node.location_type,
             body_location_type=node.neighbors.elements[-1],
             body=self.visit(node.body, **kwargs),
@@ -124,21 +124,25 @@ class NirToUsid(eve.NodeTranslator):
     def visit_HorizontalLoop(self, node: nir.HorizontalLoop, **kwargs):
         location_type_str = str(common.LocationType(node.location_type).name).lower()
         primary_connectivity = location_type_str + "_conn"
-        connectivities = set()
-        connectivities.add(
+        # dicts are used as ordered sets to get a deterministic order in the generated code
+        connectivities = {}
+        connectivities[
             usid.Connectivity(
-                name=primary_connectivity, chain=usid.NeighborChain(elements=[node.location_type])
+                name=primary_connectivity, chain=usid.NeighborChain(elements=(node.location_type,))
             )
-        )
+        ] = None
 
-        field_accesses = eve.iter_tree(node.stmt).if_isinstance(nir.FieldAccess).to_list()
+        tree_index = kwargs.get("tree_index", None)
+        if tree_index is None:
+            tree_index = eve.TreeIndex(node.stmt)
+        field_accesses = tree_index.find(nir.FieldAccess, within=node.stmt)
 
         other_sids_entries = {}
-        primary_sid_entries = set()
+        primary_sid_entries = {}
         for acc in field_accesses:
             if len(acc.primary.elements) == 1:
                 assert acc.primary.elements[0] == node.location_type
-                primary_sid_entries.add(usid.SidCompositeEntry(name=acc.name))
+                primary_sid_entries[usid.SidCompositeEntry(name=acc.name)] = None
             else:
                 assert (
                     len(acc.primary.elements) == 2
@@ -147,37 +151,37 @@ class NirToUsid(eve.NodeTranslator):
                     -1
                 ]  # TODO change if we have more than one level of nesting
                 if secondary_loc not in other_sids_entries:
-                    other_sids_entries[secondary_loc] = set()
-                other_sids_entries[secondary_loc].add(usid.SidCompositeEntry(name=acc.name))
+                    other_sids_entries[secondary_loc] = {}
+                other_sids_entries[secondary_loc][usid.SidCompositeEntry(name=acc.name)] = None
 
-        neighloops = eve.iter_tree(node.stmt).if_isinstance(nir.NeighborLoop).to_list()
+        neighloops = tree_index.find(nir.NeighborLoop, within=node.stmt)
         for loop in neighloops:
             transformed_neighbors = self.visit(loop.neighbors, **kwargs)
             connectivity_name = str(transformed_neighbors) + "_conn"
-            connectivities.add(
+            connectivities[
                 usid.Connectivity(name=connectivity_name, chain=transformed_neighbors)
-            )
-            primary_sid_entries.add(
+            ] = None
+            primary_sid_entries[
                 usid.SidCompositeNeighborTableEntry(connectivity=connectivity_name)
-            )
+            ] = None
 
         primary_sid = location_type_str
         sids = []
         sids.append(
             usid.SidComposite(
                 name=primary_sid,
-                entries=primary_sid_entries,
-                location=usid.NeighborChain(elements=[node.location_type]),
+                entries=list(primary_sid_entries),
+                location=usid.NeighborChain(elements=(node.location_type,)),
             )
         )
 
         for k, v in other_sids_entries.items():
-            chain = usid.NeighborChain(elements=[node.location_type, k])
+            chain = usid.NeighborChain(elements=(node.location_type, k))
             sids.append(
-                usid.SidComposite(name=str(chain), entries=v, location=chain)
+                usid.SidComposite(name=str(chain), entries=list(v), location=chain)
             )  # TODO _conn via property
 
-        kernel_name = "kernel_" + node.id_
+        kernel_name = self.uid_generator.id(node, prefix="kernel")
         kernel = usid.Kernel(
             ast=self.visit(
                 node.stmt,
@@ -188,7 +192,7 @@ class NirToUsid(eve.NodeTranslator):
             name=kernel_name,
             primary_connectivity=primary_connectivity,
             primary_sid=primary_sid,
-            connectivities=connectivities,
+            connectivities=list(connectivities),
             sids=sids,
         )
         return kernel, usid.KernelCall(name=kernel_name)
@@ -213,6 +217,7 @@ class NirToUsid(eve.NodeTranslator):
         return kernels, kernel_calls
 
     def visit_Computation(self, node: nir.Computation, **kwargs):
+        tree_index = eve.TreeIndex(node)
         parameters = []
         for f in node.params:  # before visiting stencils!
             converted_param = self.visit(f)
@@ -228,7 +233,7 @@ class NirToUsid(eve.NodeTranslator):
         kernels = []
         ctrlflow_ast = []
         for s in node.stencils:
-            kernel, kernel_call = self.visit(s)
+            kernel, kernel_call = self.visit(s, tree_index=tree_index)
             kernels.extend(kernel)
             ctrlflow_ast.extend(kernel_call)
 
@@ -21,7 +21,7 @@ from devtools import debug  # noqa: F401
 from pydantic import validator
 
 import eve
-from eve import Node, Str
+from eve import FrozenNode, Node, Str, SymbolName, SymbolRef
 from gtc import common
 
 
@@ -33,19 +33,9 @@ class Stmt(Node):
     location_type: common.LocationType
 
 
-class NeighborChain(Node):
+class NeighborChain(FrozenNode, interned=True):
     elements: Tuple[common.LocationType, ...]
 
-    class Config(eve.concepts.FrozenModelConfig):
-        pass
-
-    # TODO see https://github.com/eth-cscs/eve_toolchain/issues/40
-    def __hash__(self):
-        return hash(self.elements)
-
-    def __eq__(self, other):
-        return self.elements == other.elements
-
     @validator("elements")
     def not_empty(cls, elements):
         if len(elements) < 1:
@@ -57,8 +47,8 @@ class NeighborChain(Node):
 
 
 class FieldAccess(Expr):
-    name: Str  # symbol ref to SidCompositeEntry
-    sid: Str  # symbol ref
+    name: Str  # symbol ref to SidCompositeEntry (in the symbol_tbl of sid)
+    sid: SymbolRef
 
 
 class VarDecl(Stmt):
@@ -87,66 +77,29 @@ class BinaryOp(common.BinaryOp[Expr], Expr):
     pass
 
 
-class Connectivity(Node):
-    name: Str  # symbol name
+class Connectivity(FrozenNode, interned=True):
+    name: SymbolName
     chain: NeighborChain
 
     @property
     def neighbor_tbl_tag(self):
         return self.name + "_neighbor_tbl_tag"
 
-    class Config(eve.concepts.FrozenModelConfig):
-        pass
-
-    # TODO see https://github.com/eth-cscs/eve_toolchain/issues/40
-    def __hash__(self):
-        return hash((self.name, self.chain))
-
-    def __eq__(self, other):
-        return self.name == other.name and self.chain == other.chain
 
-
-class SidCompositeEntry(Node):
+class SidCompositeEntry(FrozenNode, interned=True):
     name: Str  # symbol decl (TODO ensure field exists via symbol table)
 
     @property
     def tag_name(self):
         return self.name + "_tag"
 
-    class Config(eve.concepts.FrozenModelConfig):
-        pass
-
-    # TODO see https://github.com/eth-cscs/eve_toolchain/issues/40
-    def __hash__(self):
-        return hash(self.name)
-
-    def __eq__(self, other):
-        return self.name == other.name
-
 
-class SidCompositeNeighborTableEntry(Node):
-    connectivity: Str
-    connectivity_deref_: Optional[
-        Connectivity
-    ]  # TODO temporary workaround for symbol tbl reference
-
-    @property
-    def tag_name(self):
-        return self.connectivity_deref_.neighbor_tbl_tag
-
-    class Config(eve.concepts.FrozenModelConfig):
-        pass
-
-    # TODO see https://github.com/eth-cscs/eve_toolchain/issues/40
-    def __hash__(self):
-        return hash(self.connectivity)
-
-    def __eq__(self, other):
-        return self.connectivity == other.connectivity
+class SidCompositeNeighborTableEntry(FrozenNode):
+    connectivity: SymbolRef
 
 
 class SidComposite(Node):
-    name: Str  # symbol
+    name: SymbolName
     location: NeighborChain
     entries: List[
         Union[SidCompositeEntry, SidCompositeNeighborTableEntry]
@@ -160,7 +113,7 @@ class SidComposite(Node):
         return False
 
     # node private symbol table to entries
-    @property
+    @eve.cached_node_property
     def symbol_tbl(self):
         return {e.name: e for e in self.entries if isinstance(e, SidCompositeEntry)}
 
@@ -190,31 +143,32 @@ class SidComposite(Node):
 class NeighborLoop(Stmt):
     body_location_type: common.LocationType
     body: List[Stmt]
-    connectivity: Str  # symbol ref to Connectivity
-    outer_sid: Str  # symbol ref to SidComposite where the neighbor tables lives (and sparse fields)
+    connectivity: SymbolRef  # to Connectivity
+    outer_sid: SymbolRef  # to SidComposite where the neighbor tables lives (and sparse fields)
     sid: Optional[
-        Str
-    ]  # symbol ref to SidComposite where the fields of the loop body live (None if only sparse fields are accessed)
+        SymbolRef
+    ]  # to SidComposite where the fields of the loop body live (None if only sparse fields are accessed)
 
 
 class Kernel(Node):
+    # scope of the connectivities and sids symbols (see usid_codegen)
     # location_type: common.LocationType
-    name: Str  # symbol decl table
+    name: SymbolName
     connectivities: List[Connectivity]
     sids: List[SidComposite]
 
-    primary_connectivity: Str  # symbol ref to the above
-    primary_sid: Str  # symbol ref to the above
+    primary_connectivity: SymbolRef  # to the above
+    primary_sid: SymbolRef  # to the above
     ast: List[Stmt]
 
     # private symbol table
-    @property
+    @eve.cached_node_property
     def symbol_tbl(self):
         return {**{s.name: s for s in self.sids}, **{c.name: c for c in self.connectivities}}
 
 
 class KernelCall(Node):
-    name: Str  # symbol ref
+    name: SymbolRef  # to Kernel
 
 
 class VerticalDimension(Node):
@@ -19,40 +19,30 @@ from typing import ClassVar, Mapping
 
 from devtools import debug  # noqa: F401
 
-from eve import NodeTranslator, codegen
+from eve import SymbolIndex, codegen
 from eve.codegen import FormatTemplate as as_fmt
 from eve.codegen import MakoTemplate as as_mako
 from gtc import common
 from gtc.unstructured.usid import (
     Computation,
     Connectivity,
+    FieldAccess,
     Kernel,
     KernelCall,
+    Literal,
     SidCompositeNeighborTableEntry,
     Temporary,
 )
 
 
-class SymbolTblHelper(NodeTranslator):
-    # TODO
-    # - temporary helper which resolves symbol refs with the symbol it's pointing to
-    # - the code generator relies on the possibility to look up a symbol ref outside of a visitor
-
-    def visit_SidCompositeNeighborTableEntry(self, node: SidCompositeNeighborTableEntry, **kwargs):
-        connectivity_deref = kwargs["symbol_tbl_conn"][node.connectivity]
-        return SidCompositeNeighborTableEntry(
-            connectivity=node.connectivity, connectivity_deref_=connectivity_deref
-        )
-
-    def visit_Kernel(self, node: Kernel, **kwargs):
-        symbol_tbl_conn = {c.name: c for c in node.connectivities}
-        symbol_tbl_sids = {s.name: s for s in node.sids}
-        return self.generic_visit(
-            node, symbol_tbl_conn=symbol_tbl_conn, symbol_tbl_sids=symbol_tbl_sids, **kwargs
-        )
-
-
-class UsidCodeGenerator(codegen.TemplatedGenerator):
+class UsidCodeGenerator(
+    codegen.TemplatedGenerator,
+    context_free=True,
+    memoized_types=(FieldAccess, Literal),
+    streamed_types=(Kernel,),
+):
+    #: Symbol references of the visited computation (kernels are scopes of their own symbols)
+    symbol_index: SymbolIndex
     DATA_TYPE_TO_STR: ClassVar[Mapping[common.DataType, str]] = MappingProxyType(
         {
             common.DataType.BOOLEAN: "bool",
@@ -82,11 +72,21 @@ class UsidCodeGenerator(codegen.TemplatedGenerator):
 
     @classmethod
     def apply(cls, root, **kwargs) -> str:
-        symbol_tbl_resolved = SymbolTblHelper().visit(root)
-        generated_code = super().apply(symbol_tbl_resolved, **kwargs)
+        generated_code = super().apply(root, **kwargs)
         formatted_code = codegen.format_source("cpp", generated_code, style="LLVM")
         return formatted_code
 
+    def render_memo_key(self, node, **kwargs):
+        # Field accesses are rendered from the sid declared in the enclosing kernel
+        if isinstance(node, FieldAccess):
+            return self.symbol_index.resolve(node, "sid")
+        return None
+
+    def tag_name(self, entry):
+        if isinstance(entry, SidCompositeNeighborTableEntry):
+            return self.symbol_index.resolve(entry, "connectivity").neighbor_tbl_tag
+        return entry.tag_name
+
     def location_type_from_dimensions(self, dimensions):
         location_type = [dim for dim in dimensions if isinstance(dim, common.LocationType)]
         if len(location_type) != 1:
@@ -113,23 +113,25 @@ class UsidCodeGenerator(codegen.TemplatedGenerator):
         """
     )
 
-    SidCompositeNeighborTableEntry = as_fmt(
-        "gridtools::next::connectivity::neighbor_table({_this_node.connectivity_deref_.name})"
+    SidCompositeNeighborTableEntry = as_mako(
+        "gridtools::next::connectivity::neighbor_table(${ _this_generator.symbol_index.resolve(_this_node, 'connectivity').name })"
     )
 
     SidCompositeEntry = as_fmt("{name}")
 
     SidComposite = as_mako(
         """
-        auto ${ _this_node.field_name } = tu::make<gridtools::sid::composite::keys<${ ','.join([t.tag_name for t in _this_node.entries]) }>::values>(
+        auto ${ _this_node.field_name } = tu::make<gridtools::sid::composite::keys<${ ','.join(_this_generator.tag_name(t) for t in _this_node.entries) }>::values>(
         ${ ','.join(entries)});
         """
     )
 
     def visit_KernelCall(self, node: KernelCall, **kwargs):
-        kernel: Kernel = kwargs["symbol_tbl_kernel"][node.name]
+        kernel: Kernel = self.symbol_index.resolve(node, "name")
         connectivities = [self.generic_visit(conn, **kwargs) for conn in kernel.connectivities]
-        primary_connectivity: Connectivity = kernel.symbol_tbl[kernel.primary_connectivity]
+        primary_connectivity: Connectivity = self.symbol_index.resolve(
+            kernel, "primary_connectivity"
+        )
         sids = [self.generic_visit(s, **kwargs) for s in kernel.sids if len(s.entries) > 0]
 
         # TODO I don't like that I render here and that I somehow have the same pattern for the parameters
@@ -150,26 +152,17 @@ class UsidCodeGenerator(codegen.TemplatedGenerator):
         )
 
     def visit_Kernel(self, node: Kernel, **kwargs):
-        symbol_tbl_conn = {c.name: c for c in node.connectivities}
-        symbol_tbl_sids = {s.name: s for s in node.sids}
-
         parameters = [c.name for c in node.connectivities]
         for s in node.sids:
             if len(s.entries) > 0:
                 parameters.append(s.origin_name)
                 parameters.append(s.strides_name)
 
-        return self.generic_visit(
-            node,
-            parameters=parameters,
-            symbol_tbl_conn=symbol_tbl_conn,
-            symbol_tbl_sids=symbol_tbl_sids,
-            **kwargs,
-        )
+        return self.generic_visit(node, parameters=parameters, **kwargs)
 
     FieldAccess = as_mako(
         """<%
-            sid_deref = symbol_tbl_sids[_this_node.sid]
+            sid_deref = _this_generator.symbol_index.resolve(_this_node, "sid")
             sid_entry_deref = sid_deref.symbol_tbl[_this_node.name]
         %>*gridtools::host_device::at_key<${ sid_entry_deref.tag_name }>(${ sid_deref.ptr_name })"""
     )
@@ -180,9 +173,9 @@ class UsidCodeGenerator(codegen.TemplatedGenerator):
 
     NeighborLoop = as_mako(
         """<%
-            outer_sid_deref = symbol_tbl_sids[_this_node.outer_sid]
-            sid_deref = symbol_tbl_sids[_this_node.sid] if _this_node.sid else None
-            conn_deref = symbol_tbl_conn[_this_node.connectivity]
+            outer_sid_deref = _this_generator.symbol_index.resolve(_this_node, "outer_sid")
+            sid_deref = _this_generator.symbol_index.resolve(_this_node, "sid") if _this_node.sid else None
+            conn_deref = _this_generator.symbol_index.resolve(_this_node, "connectivity")
             body_location = _this_generator.LOCATION_TYPE_TO_STR[sid_deref.location.elements[-1]] if sid_deref else None
         %>
         for (int neigh = 0; neigh < gridtools::next::connectivity::max_neighbors(${ conn_deref.name }); ++neigh) {
@@ -219,19 +212,18 @@ class UsidCodeGenerator(codegen.TemplatedGenerator):
     )
 
     def visit_Computation(self, node: Computation, **kwargs):
-        symbol_tbl_kernel = {k.name: k for k in node.kernels}
-        sid_tags = set()
+        self.symbol_index = SymbolIndex(node, scopes=Kernel)
+        sid_tags = {}  # ordered set
         for k in node.kernels:
             for s in k.sids:
                 for e in s.entries:
-                    sid_tags.add("struct " + e.tag_name + ";")
+                    sid_tags["struct " + self.tag_name(e) + ";"] = None
 
         return self.generic_visit(
             node,
             computation_fields=node.parameters + node.temporaries,
             # cache_allocator=cache_allocator_,
             sid_tags=sid_tags,
-            symbol_tbl_kernel=symbol_tbl_kernel,
             **kwargs,
         )
 
@@ -308,8 +300,8 @@ class UsidGpuCodeGenerator(UsidCodeGenerator):
 
     Kernel = as_mako(
         """<%
-            prim_conn = symbol_tbl_conn[_this_node.primary_connectivity]
-            prim_sid = symbol_tbl_sids[_this_node.primary_sid]
+            prim_conn = _this_generator.symbol_index.resolve(_this_node, "primary_connectivity")
+            prim_sid = _this_generator.symbol_index.resolve(_this_node, "primary_sid")
         %>
         template<${ ','.join("class {}_t".format(p) for p in parameters)}>
         __global__ void ${ name }( ${','.join("{0}_t {0}".format(p) for p in parameters) }) {
@@ -346,8 +338,8 @@ class UsidNaiveCodeGenerator(UsidCodeGenerator):
 
     Kernel = as_mako(
         """<%
-            prim_conn = symbol_tbl_conn[_this_node.primary_connectivity]
-            prim_sid = symbol_tbl_sids[_this_node.primary_sid]
+            prim_conn = _this_generator.symbol_index.resolve(_this_node, "primary_connectivity")
+            prim_sid = _this_generator.symbol_index.resolve(_this_node, "primary_sid")
         %>
         template<${ ','.join("class {}_t".format(p) for p in parameters)}>
         void ${ name }( ${','.join("{0}_t {0}".format(p) for p in parameters) }) {
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+
+"""Micro-benchmark of Node construction, structural equality, hashing, cloning and interning."""
+
+
+from __future__ import annotations
+
+import copy
+import tracemalloc
+from typing import Callable, List, Tuple
+
+import pydantic
+
+import eve
+
+from . import common
+
+
+class Chain(eve.FrozenNode):
+    elements: Tuple[int, ...]
+
+
+class InternedChain(eve.FrozenNode, interned=True):
+    elements: Tuple[int, ...]
+
+
+def _allocated_memory(func: Callable[[], List[eve.FrozenNode]]) -> int:
+    tracemalloc.start()
+    try:
+        result = func()  # noqa: F841  # keep the nodes alive while measuring
+        return tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+
+def main(num_nodes: int = 100_000) -> None:
+    def build_full() -> None:
+        common.make_block(num_nodes)
+
+    def build_deferred() -> None:
+        with eve.validation_level(eve.ValidationLevel.DEFERRED):
+            tree = common.make_block(num_nodes)
+        eve.validate_tree(tree)
+
+    def build_trusted() -> None:
+        with eve.validation_level(eve.ValidationLevel.TRUSTED):
+            common.make_block(num_nodes)
+
+    print(f"Tree with {common.count_nodes(common.make_block(num_nodes))} nodes")
+    common.report(
+        "Node construction",
+        [
+            ("full validation", common.measure(build_full, repeat=2)),
+            ("deferred validation (+ validate_tree)", common.measure(build_deferred, repeat=2)),
+            ("trusted", common.measure(build_trusted, repeat=2)),
+        ],
+    )
+
+    # Node ids are only generated when they are read
+    def build_with_ids() -> List[eve.Node]:
+        tree = common.make_block(num_nodes)
+        all(node.id_ for node in tree.iter_tree() if isinstance(node, eve.Node))
+        return [tree]
+
+    for label, build in [
+        ("unused ids", lambda: [common.make_block(num_nodes)]),
+        ("all ids read", build_with_ids),
+    ]:
+        memory = _allocated_memory(build)  # type: ignore  # lists of nodes
+        print(f"  {label:<40} {memory / 2**20:10.2f} MiB retained")
+
+    # Equal trees with different node ids (ids are ignored in structural comparisons)
+    tree, other_tree = common.make_block(num_nodes), common.make_block(num_nodes)
+    shallow_copy = tree.copy()
+    common.report(
+        "Tree equality",
+        [
+            (
+                "pydantic dict() comparison",
+                common.measure(lambda: tree.dict() == other_tree.dict()),
+            ),
+            ("structural_eq", common.measure(lambda: eve.structural_eq(tree, other_tree))),
+            (
+                "structural_eq (shared subtrees)",
+                common.measure(lambda: eve.structural_eq(tree, shallow_copy)),
+            ),
+        ],
+    )
+
+    common.report(
+        "Stable tree hashing",
+        [
+            ("utils.shash (pickle)", common.measure(lambda: eve.utils.shash(tree), repeat=3)),
+            ("fingerprint", common.measure(lambda: eve.fingerprint(tree), repeat=3)),
+        ],
+    )
+    print(
+        "  equal trees with different ids have the same fingerprint:",
+        eve.fingerprint(tree) == eve.fingerprint(other_tree),
+        "(shash: {})".format(eve.utils.shash(tree) == eve.utils.shash(other_tree)),
+    )
+
+    common.report(
+        "Tree cloning",
+        [
+            (
+                "pydantic copy(deep=True)",
+                common.measure(lambda: pydantic.BaseModel.copy(tree, deep=True), repeat=2),
+            ),
+            ("copy.deepcopy", common.measure(lambda: copy.deepcopy(tree), repeat=2)),
+            ("clone_tree", common.measure(lambda: eve.clone_tree(tree), repeat=2)),
+            (
+                "clone_tree (path to the first statement)",
+                common.measure(lambda: eve.clone_tree(tree, path=["statements", 0]), repeat=2),
+            ),
+        ],
+    )
+
+    # Many equal immutable nodes, as created by the lowering passes
+    def make_chains(chain_class: type) -> List[eve.FrozenNode]:
+        return [chain_class(elements=(i % 10, (i + 1) % 10)) for i in range(num_nodes // 10)]
+
+    common.report(
+        "Creation of equal frozen nodes",
+        [
+            ("regular", common.measure(lambda: make_chains(Chain), repeat=2)),
+            ("interned", common.measure(lambda: make_chains(InternedChain), repeat=2)),
+        ],
+    )
+    for label, chain_class in [("regular", Chain), ("interned", InternedChain)]:
+        memory = _allocated_memory(lambda: make_chains(chain_class))
+        print(f"  {label:<40} {memory / 2**20:10.2f} MiB retained")
+    print(
+        "  equality of interned nodes is an identity check:",
+        InternedChain(elements=(1, 2)) is InternedChain(elements=(1, 2)),
+    )
+
+
+if __name__ == "__main__":
+    main()
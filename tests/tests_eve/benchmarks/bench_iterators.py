@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+
+"""Scaling benchmark of the tree traversal iterators."""
+
+
+from __future__ import annotations
+
+from typing import Any, Callable, Generator, List, Optional
+
+import eve
+from eve import iterators, utils
+
+from . import common
+
+
+@utils.as_xiter
+def legacy_iter_tree_pre(node: Any) -> Generator[Any, None, None]:
+    yield node
+    for child in iterators.generic_iter_children(node):
+        yield from legacy_iter_tree_pre(child)
+
+
+@utils.as_xiter
+def legacy_iter_tree_post(node: Any) -> Generator[Any, None, None]:
+    for child in iterators.generic_iter_children(node):
+        yield from legacy_iter_tree_post(child)
+    yield node
+
+
+@utils.as_xiter
+def legacy_iter_tree_levels(
+    node: Any, __queue__: Optional[List] = None
+) -> Generator[Any, None, None]:
+    __queue__ = __queue__ or []
+    yield node
+    __queue__.extend(iterators.generic_iter_children(node))
+    if __queue__:
+        yield from legacy_iter_tree_levels(__queue__.pop(0), __queue__=__queue__)
+
+
+def _consume(iterator_func: Callable[[Any], Any], tree: Any) -> Optional[float]:
+    try:
+        return common.measure(lambda: sum(1 for _ in iterator_func(tree)), repeat=1)
+    except RecursionError:
+        return None
+
+
+def main(sizes: List[int] = [10_000, 100_000, 1_000_000]) -> None:  # noqa: B006
+    print(f"{'nodes':>10} {'order':>7} {'legacy':>14} {'iterative':>14}")
+    for size in sizes:
+        with eve.validation_level(eve.ValidationLevel.TRUSTED):
+            tree = common.make_block(size)
+        for order in ["pre", "post", "levels"]:
+            if order == "levels" and size > 10_000:
+                # The legacy breadth-first traversal is quadratic (and recursive)
+                legacy_str = "skipped"
+            else:
+                legacy = _consume(globals()[f"legacy_iter_tree_{order}"], tree)
+                legacy_str = "RecursionError" if legacy is None else f"{legacy * 1e3:11.2f} ms"
+            current = _consume(getattr(iterators, f"iter_tree_{order}"), tree)
+            print(f"{size:>10} {order:>7} {legacy_str:>14} {current * 1e3:11.2f} ms")
+
+    depth = 50_000
+    chain = common.make_chain(depth)
+    print(f"\nChain of {depth} nested BinaryOp nodes")
+    for order in ["pre", "post", "levels"]:
+        legacy = _consume(globals()[f"legacy_iter_tree_{order}"], chain)
+        current = _consume(getattr(iterators, f"iter_tree_{order}"), chain)
+        legacy_str = "RecursionError" if legacy is None else f"{legacy * 1e3:11.2f} ms"
+        print(f"{'':>10} {order:>7} {legacy_str:>14} {current * 1e3:11.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+
+"""Micro-benchmark of tree serialization (size, dump, full and lazy loading)."""
+
+
+from __future__ import annotations
+
+import os
+import pickle
+import tempfile
+
+from eve import serialization
+
+from . import common
+
+
+def main(num_nodes: int = 100_000) -> None:
+    tree = common.make_block(num_nodes)
+    # Pickling generates all the node ids, which are stored only once generated
+    serialized = serialization.dumps(tree)
+    pickled = pickle.dumps(tree, protocol=pickle.HIGHEST_PROTOCOL)
+
+    print(f"Tree with {common.count_nodes(tree)} nodes")
+    print(f"  {'pickle':<40} {len(pickled) / 2**20:10.2f} MiB")
+    print(f"  {'serialization':<40} {len(serialized) / 2**20:10.2f} MiB")
+    print(f"  {'json':<40} {len(tree.json()) / 2**20:10.2f} MiB")
+
+    common.report(
+        "Dump",
+        [
+            (
+                "pickle",
+                common.measure(
+                    lambda: pickle.dumps(tree, protocol=pickle.HIGHEST_PROTOCOL), repeat=3
+                ),
+            ),
+            ("serialization.dumps", common.measure(lambda: serialization.dumps(tree), repeat=3)),
+        ],
+    )
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, "tree.eve")
+        serialization.dump(tree, file_path)
+
+        def load_statement() -> None:
+            with serialization.TreeArchive(file_path) as archive:
+                archive.load(["statements", 0])
+
+        common.report(
+            "Load",
+            [
+                ("pickle", common.measure(lambda: pickle.loads(pickled), repeat=3)),
+                (
+                    "serialization.loads",
+                    common.measure(lambda: serialization.loads(serialized), repeat=3),
+                ),
+                ("TreeArchive (first statement)", common.measure(load_statement, repeat=3)),
+            ],
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+
+"""Micro-benchmark of the symbol tables of SymbolTableTrait on nested scopes."""
+
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Type
+
+import pydantic
+
+import eve
+
+from . import common
+
+
+class _LegacyCollectSymbols(eve.NodeVisitor):
+    """Previous symbol collection: walk the whole scope on every validation."""
+
+    def __init__(self) -> None:
+        self.collected: Dict[str, Any] = {}
+
+    def visit_Node(self, node: eve.Node) -> None:
+        for name, metadata in node.__node_children__.items():
+            if isinstance(metadata["definition"].type_, type) and issubclass(
+                metadata["definition"].type_, eve.SymbolName
+            ):
+                self.collected[getattr(node, name)] = node
+        if not isinstance(node, LegacySymbolTableTrait):
+            self.generic_visit(node)
+
+
+class LegacySymbolTableTrait(eve.Model):
+    symtable_: Dict[str, Any] = pydantic.Field(default_factory=dict)
+
+    @pydantic.root_validator(skip_on_failure=True)
+    def _collect_symbols_validator(  # type: ignore  # validators are classmethods
+        cls: Type[LegacySymbolTableTrait], values: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        instance = _LegacyCollectSymbols()
+        instance.generic_visit(values)
+        values["symtable_"] = instance.collected
+        return values
+
+
+class Decl(eve.Node):
+    name: eve.SymbolName
+
+
+class Scope(eve.Node, eve.SymbolTableTrait):
+    decls: List[Decl]
+    body: List[common.Assign]
+    inner: Optional["Scope"]
+
+
+class LegacyScope(eve.Node, LegacySymbolTableTrait):
+    decls: List[Decl]
+    body: List[common.Assign]
+    inner: Optional["LegacyScope"]
+
+
+Scope.update_forward_refs()
+LegacyScope.update_forward_refs()
+
+
+def make_scopes(scope_class: Type, depth: int, num_decls: int = 10, expr_depth: int = 3) -> Any:
+    """Create ``depth`` nested scopes with declarations and assignments in each one."""
+    scope = None
+    for level in range(depth):
+        scope = scope_class(
+            decls=[Decl(name=f"s{level}_{i}") for i in range(num_decls)],
+            body=[
+                common.Assign(
+                    target=common.Name(name=f"s{level}_{i}"), value=common.make_expr(expr_depth, i)
+                )
+                for i in range(num_decls)
+            ],
+            inner=scope,
+        )
+    return scope
+
+
+class Copier(eve.NodeTranslator, iterative=True):
+    pass
+
+
+class InnermostRenamer(eve.NodeTranslator, copy_on_write=True, visit_types=(Decl,)):
+    """Rename the first declaration of the innermost scope."""
+
+    def visit_Decl(self, node: Decl, **kwargs: Any) -> Decl:
+        if node.name == "s0_0":
+            return Decl(name="s0_0_renamed")
+        return node
+
+
+def main(depth: int = 200) -> None:
+    trees = {
+        label: make_scopes(scope_class, depth)
+        for label, scope_class in [("legacy", LegacyScope), ("incremental", Scope)]
+    }
+    print(f"{depth} nested scopes with {common.count_nodes(trees['legacy'])} nodes")
+
+    common.report(
+        "Construction",
+        [
+            (label, common.measure(lambda: make_scopes(scope_class, depth), repeat=2))
+            for label, scope_class in [("legacy", LegacyScope), ("incremental", Scope)]
+        ],
+    )
+    common.report(
+        "Full NodeTranslator copy",
+        [
+            (label, common.measure(lambda: Copier().visit(tree), repeat=2))
+            for label, tree in trees.items()
+        ],
+    )
+    common.report(
+        "Copy-on-write rename in the innermost scope",
+        [
+            (label, common.measure(lambda: InnermostRenamer().visit(tree)))
+            for label, tree in trees.items()
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+
+"""Micro-benchmarks of the NodeVisitor and NodeTranslator traversals."""
+
+
+from __future__ import annotations
+
+from typing import Any
+
+import eve
+from eve import concepts
+
+from . import common
+
+
+class _LegacyDispatchMixin:
+    """Previous dispatch implementation: MRO walk with ``hasattr`` on every visit."""
+
+    def visit(self, node: Any, **kwargs: Any) -> Any:
+        visitor = self.generic_visit
+
+        method_name = "visit_" + node.__class__.__name__
+        if hasattr(self, method_name):
+            visitor = getattr(self, method_name)
+        elif isinstance(node, concepts.Node):
+            for node_class in node.__class__.__mro__[1:]:
+                method_name = "visit_" + node_class.__name__
+                if hasattr(self, method_name):
+                    visitor = getattr(self, method_name)
+                    break
+
+                if node_class is concepts.Node:
+                    break
+
+        return visitor(node, **kwargs)
+
+
+class NameCounter(eve.NodeVisitor):
+    def __init__(self) -> None:
+        self.count = 0
+
+    def visit_Name(self, node: common.Name, **kwargs: Any) -> None:
+        self.count += 1
+
+    def visit_Expr(self, node: common.Expr, **kwargs: Any) -> None:
+        self.generic_visit(node, **kwargs)
+
+
+class LegacyNameCounter(_LegacyDispatchMixin, NameCounter):
+    pass
+
+
+class IterativeNameCounter(NameCounter, iterative=True):
+    pass
+
+
+class LeafNameCounter(eve.NodeVisitor):
+    def __init__(self) -> None:
+        self.count = 0
+
+    def visit_Name(self, node: common.Name, **kwargs: Any) -> None:
+        self.count += 1
+
+
+class IterativeLeafNameCounter(LeafNameCounter, iterative=True):
+    pass
+
+
+class Copier(eve.NodeTranslator):
+    pass
+
+
+class IterativeCopier(Copier, iterative=True):
+    pass
+
+
+class LegacyCopier(_LegacyDispatchMixin, Copier):
+    pass
+
+
+class Renamer(eve.NodeTranslator):
+    """Rename the targets of a few assignments."""
+
+    def visit_Name(self, node: common.Name, **kwargs: Any) -> common.Name:
+        if node.name in ("t0", "t100"):
+            return common.Name(name=node.name + "_renamed")
+        return self.generic_visit(node, **kwargs)
+
+
+class CopyOnWriteRenamer(Renamer, copy_on_write=True):
+    pass
+
+
+def main(num_nodes: int = 100_000, chain_depth: int = 20_000) -> None:
+    tree = common.make_block(num_nodes)
+    print(f"Tree with {common.count_nodes(tree)} nodes")
+
+    common.report(
+        "NodeVisitor.visit",
+        [
+            ("legacy dispatch", common.measure(lambda: LegacyNameCounter().visit(tree))),
+            ("dispatch tables", common.measure(lambda: NameCounter().visit(tree))),
+        ],
+    )
+    common.report(
+        "NodeTranslator.visit",
+        [
+            ("legacy dispatch", common.measure(lambda: LegacyCopier().visit(tree), repeat=2)),
+            ("dispatch tables", common.measure(lambda: Copier().visit(tree), repeat=2)),
+        ],
+    )
+
+    common.report(
+        "Iterative traversal engine (NodeVisitor)",
+        [
+            ("recursive", common.measure(lambda: LeafNameCounter().visit(tree))),
+            ("iterative", common.measure(lambda: IterativeLeafNameCounter().visit(tree))),
+        ],
+    )
+    common.report(
+        "Iterative traversal engine (NodeTranslator)",
+        [
+            ("recursive", common.measure(lambda: Copier().visit(tree), repeat=2)),
+            ("iterative", common.measure(lambda: IterativeCopier().visit(tree), repeat=2)),
+        ],
+    )
+
+    common.report(
+        "Copy-on-write translation (2 modified nodes)",
+        [
+            ("full copy", common.measure(lambda: Renamer().visit(tree), repeat=2)),
+            ("copy-on-write", common.measure(lambda: CopyOnWriteRenamer().visit(tree), repeat=2)),
+        ],
+    )
+
+    chain = common.make_chain(chain_depth)
+    print(f"\nChain of {chain_depth} nested BinaryOp nodes")
+    for label, func in [
+        ("NodeVisitor (recursive)", lambda: LeafNameCounter().visit(chain)),
+        ("NodeVisitor (iterative)", lambda: IterativeLeafNameCounter().visit(chain)),
+        ("NodeTranslator (recursive)", lambda: Copier().visit(chain)),
+        ("NodeTranslator (iterative)", lambda: IterativeCopier().visit(chain)),
+    ]:
+        try:
+            print(f"  {label:<40} {common.measure(func, repeat=1) * 1e3:10.2f} ms")
+        except RecursionError:
+            print(f"  {label:<40} RecursionError")
+
+
+if __name__ == "__main__":
+    main()
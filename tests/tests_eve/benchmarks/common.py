@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+
+"""Shared node definitions and helpers for the Eve micro-benchmarks.
+
+Benchmarks are plain scripts (not collected by pytest) meant to be run
+from the repository root as modules, e.g.::
+
+    python -m tests.tests_eve.benchmarks.bench_visitors
+
+"""
+
+
+from __future__ import annotations
+
+import gc
+import time
+from typing import Any, Callable, List, Union
+
+import eve
+
+
+class Expr(eve.Node):
+    pass
+
+
+class Literal(Expr):
+    value: eve.Str
+
+
+class Name(Expr):
+    name: eve.Str
+
+
+class BinaryOp(Expr):
+    op: eve.Str
+    left: Expr
+    right: Expr
+
+
+class Assign(eve.Node):
+    target: Name
+    value: Expr
+
+
+class Block(eve.Node):
+    statements: List[Union[Assign, "Block"]]
+
+
+Block.update_forward_refs()
+
+
+def make_expr(depth: int, index: int = 0) -> Expr:
+    """Create a balanced expression tree with ``2**(depth+1) - 1`` nodes."""
+    if depth == 0:
+        return Name(name=f"v{index}") if index % 2 else Literal(value=str(index))
+    return BinaryOp(
+        op="+", left=make_expr(depth - 1, 2 * index), right=make_expr(depth - 1, 2 * index + 1)
+    )
+
+
+def make_block(num_nodes: int, expr_depth: int = 4) -> Block:
+    """Create a flat block of assignments with approximately ``num_nodes`` nodes."""
+    nodes_per_stmt = 2 ** (expr_depth + 1) + 1
+    return Block(
+        statements=[
+            Assign(target=Name(name=f"t{i}"), value=make_expr(expr_depth, i))
+            for i in range(max(1, num_nodes // nodes_per_stmt))
+        ]
+    )
+
+
+def make_chain(depth: int) -> Expr:
+    """Create a degenerate (left-leaning) chain of binary operations."""
+    expr: Expr = Literal(value="0")
+    for i in range(depth):
+        expr = BinaryOp(op="+", left=expr, right=Name(name=f"v{i}"))
+    return expr
+
+
+def count_nodes(tree: Any) -> int:
+    return sum(1 for node in eve.iter_tree(tree) if isinstance(node, eve.Node))
+
+
+def measure(func: Callable[[], Any], *, repeat: int = 5) -> float:
+    """Return the best wall-clock time (in seconds) of several runs of ``func``."""
+    best = float("inf")
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return best
+
+
+def report(title: str, results: List[Any]) -> None:
+    """Print a table of ``(label, seconds)`` items relative to the first one."""
+    print(f"\n{title}")
+    reference = results[0][1]
+    for label, seconds in results:
+        print(f"  {label:<40} {seconds * 1e3:10.2f} ms  x{reference / seconds:5.2f}")
@@ -20,6 +20,8 @@
 
 import pytest
 
+import eve.codegen
+
 from . import definitions
 
 
@@ -80,3 +82,10 @@ def frozen_sample_node(request):
 @pytest.fixture(params=INVALID_NODE_MAKERS)
 def invalid_sample_node_maker(request):
     return request.param
+
+
+@pytest.fixture(autouse=True)
+def _isolated_disk_caches(monkeypatch):
+    # Never use the disk caches enabled in the environment of the test session
+    monkeypatch.setattr(eve.codegen, "template_cache", eve.codegen.DiskCache(None))
+    monkeypatch.setattr(eve.codegen, "formatting_cache", eve.codegen.DiskCache(None))
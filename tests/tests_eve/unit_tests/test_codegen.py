@@ -14,7 +14,9 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-from typing import Callable, Optional, Set, Type
+import io
+import shutil
+from typing import Callable, List, Optional, Set, Type, Union
 
 import pytest
 
@@ -39,6 +41,80 @@ def test_name(name_with_cases):  # noqa: F811  # pytest fixture not detected
                 assert other_name.as_case(case) == cased_string
 
 
+# -- Formatting tests --
+def test_format_python_source():
+    source = "def f( a,b ):\n  return [a,\n b]\n"
+    expected = "def f(a, b):\n    return [a, b]\n"
+    assert eve.codegen.format_source("python", source) == expected
+    assert eve.codegen.format_sources("python", [source, "x=1"], max_workers=2) == [
+        expected,
+        "x = 1\n",
+    ]
+
+
+def test_format_sources(tmp_path, monkeypatch):
+    calls = []
+
+    def formatter(source, *, suffix=""):
+        if "error" in source:
+            raise ValueError(source)
+        calls.append(source)
+        return source.upper() + suffix
+
+    monkeypatch.setitem(eve.codegen.SOURCE_FORMATTERS, "test", formatter)
+    monkeypatch.setitem(eve.codegen.SOURCE_FORMATTER_VERSIONS, "test", lambda: "1.0")
+    monkeypatch.setattr(eve.codegen, "formatting_cache", eve.codegen.DiskCache(tmp_path))
+    monkeypatch.setattr(eve.codegen, "_formatted_sources", {})
+
+    assert eve.codegen.format_sources("test", ["a", "b", "a"]) == ["A", "B", "A"]
+    assert calls == ["a", "b"]
+    assert eve.codegen.format_source("test", "b") == "B"
+    assert eve.codegen.format_source("test", "b", suffix="!") == "B!"
+    assert calls == ["a", "b", "b"]
+
+    # Cached on disk
+    monkeypatch.setattr(eve.codegen, "_formatted_sources", {})
+    assert eve.codegen.format_sources("test", ["a", "c", "b"]) == ["A", "C", "B"]
+    assert calls == ["a", "b", "b", "c"]
+
+    # Batch formatters only receive the new sources
+    batches = []
+
+    def batch_formatter(sources, **kwargs):
+        batches.append(list(sources))
+        return [formatter(source, **kwargs) for source in sources]
+
+    monkeypatch.setitem(eve.codegen.BATCH_SOURCE_FORMATTERS, "test", batch_formatter)
+    assert eve.codegen.format_sources("test", ["a", "d", "e"]) == ["A", "D", "E"]
+    assert batches == [["d", "e"]]
+
+    # Errors
+    assert eve.codegen.format_sources("test", ["f", "error"]) == ["F", "error"]
+    with pytest.raises(eve.codegen.FormattingError):
+        eve.codegen.format_source("test", "error", skip_errors=False)
+    with pytest.raises(eve.codegen.FormattingError, match="Missing formatter"):
+        eve.codegen.format_source("missing", "a", skip_errors=False)
+    assert eve.codegen.format_source("missing", "a") == "a"
+
+
+@pytest.mark.skipif(
+    "cpp" not in eve.codegen.SOURCE_FORMATTERS or shutil.which("clang-format") is None,
+    reason="clang-format is not available",
+)
+def test_format_cpp_sources_style_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(eve.codegen, "_formatted_sources", {})
+    sources = ["int f() { return 1; }", "int g() { return 2; }"]
+    default_signature = eve.codegen._clang_format_signature()
+
+    (tmp_path / ".clang-format").write_text("BasedOnStyle: LLVM\nIndentWidth: 7\n")
+    assert eve.codegen._clang_format_signature() != default_signature
+    expected = [eve.codegen.format_cpp_source(source) for source in sources]
+    assert all("\n       return" in source for source in expected)
+    assert eve.codegen.format_cpp_sources(sources) == expected
+    assert eve.codegen.format_sources("cpp", sources) == expected
+
+
 # -- Template tests --
 def fmt_tpl_maker(skeleton, keys, valid=True):
     if valid:
@@ -100,6 +176,61 @@ def test_template_rendering(template_maker):
         template.render()
 
 
+@pytest.mark.parametrize("template_class", [eve.codegen.JinjaTemplate, eve.codegen.MakoTemplate])
+def test_template_cache(template_class, tmp_path, monkeypatch):
+    cache = eve.codegen.DiskCache(tmp_path)
+    monkeypatch.setattr(eve.codegen, "template_cache", cache)
+    skeleton = "aaa {s} bbbb {i} cccc"
+    keys = ["s", "i"]
+    tpl_maker = jinja_tpl_maker if template_class is eve.codegen.JinjaTemplate else mako_tpl_maker
+
+    # Compiled (and cached) at definition
+    template = tpl_maker(skeleton, keys)
+    assert template._definition is not None
+    assert len(list(tmp_path.glob("*/*"))) == 1
+
+    # Loaded from the cache when first rendered
+    cached_template = tpl_maker(skeleton, keys)
+    assert cached_template._definition is None
+    assert cached_template.render(s="STRING", i=1) == "aaa STRING bbbb 1 cccc"
+    assert cached_template.render(s="STRING", i=1) == template.render(s="STRING", i=1)
+    with pytest.raises(eve.codegen.TemplateRenderingError):
+        cached_template.render()
+
+    # Unreadable entries are ignored
+    for path in tmp_path.glob("*/*"):
+        path.write_bytes(b"invalid")
+    assert tpl_maker(skeleton, keys).render(s="STRING", i=1) == "aaa STRING bbbb 1 cccc"
+
+    monkeypatch.setattr(eve.codegen, "template_cache", eve.codegen.DiskCache(None))
+    assert tpl_maker(skeleton, keys)._definition is not None
+
+
+def test_default_cache_dir(monkeypatch):
+    monkeypatch.delenv("EVE_TEMPLATE_CACHE_DIR", raising=False)
+    assert eve.codegen._default_cache_dir("EVE_TEMPLATE_CACHE_DIR") is None
+    monkeypatch.setenv("EVE_TEMPLATE_CACHE_DIR", "")
+    assert eve.codegen._default_cache_dir("EVE_TEMPLATE_CACHE_DIR") is None
+    monkeypatch.setenv("EVE_TEMPLATE_CACHE_DIR", "/tmp/eve_templates")
+    assert eve.codegen._default_cache_dir("EVE_TEMPLATE_CACHE_DIR") == "/tmp/eve_templates"
+
+
+def test_template_referenced_names():
+    assert eve.codegen.FormatTemplate("{a} {b.c} {d[0]}").referenced_names() == {"a", "b", "d"}
+    assert eve.codegen.StringTemplate("$a ${b}").referenced_names() == {"a", "b"}
+    assert eve.codegen.JinjaTemplate(
+        "{{ a }}{% for x in b %}{{ x }}{% endfor %}"
+    ).referenced_names() == {"a", "b"}
+    assert {"a", "b"} <= eve.codegen.MakoTemplate(
+        "${a}\n% for x in b:\n${x}\n% endfor\n"
+    ).referenced_names()
+
+    # Templates with dynamic access to the rendering context
+    assert eve.codegen.FormatTemplate("{locals()}").referenced_names() is None
+    assert eve.codegen.MakoTemplate("${context.get('a')}").referenced_names() is None
+    assert eve.codegen.JinjaTemplate("{% include 'a' %}").referenced_names() is None
+
+
 # -- TemplatedGenerator tests --
 class _BaseTestGenerator(eve.codegen.TemplatedGenerator):
     KEYWORDS = ("BASE", "ONE")
@@ -221,3 +352,211 @@ def test_templated_generator(templated_generator, fixed_compound_node):
 def test_templated_generator_exceptions(faulty_templated_generator, fixed_compound_node):
     with pytest.raises(eve.codegen.TemplateRenderingError, match="when rendering node"):
         faulty_templated_generator.apply(fixed_compound_node)
+
+
+class _CountingTestGenerator(_BaseTestGenerator):
+    def __init__(self):
+        self.simple_nodes = 0
+
+    def visit_SimpleNode(self, node, **kwargs):
+        self.simple_nodes += 1
+        return super().visit_SimpleNode(node, **kwargs)
+
+
+class _ContextFreeTestGenerator(_CountingTestGenerator, context_free=True):
+    pass
+
+
+def test_context_free_templated_generator(fixed_compound_node):
+    shared_simple = fixed_compound_node.simple
+    tree = [fixed_compound_node, shared_simple, [shared_simple]]
+
+    generator = _CountingTestGenerator()
+    reference = generator.visit(tree)
+    assert generator.simple_nodes == 3
+
+    generator = _ContextFreeTestGenerator()
+    assert generator.visit(tree) == reference
+    assert generator.simple_nodes == 1
+
+
+def test_templated_generator_used_children(fixed_compound_node):
+    class _Generator(_CountingTestGenerator):
+        CompoundNode = eve.codegen.FormatTemplate("{location} {_this_node.simple.int_value}")
+
+    class _ContextFreeGenerator(_Generator, context_free=True):
+        pass
+
+    class _ChildrenGenerator(_ContextFreeGenerator):
+        CompoundNode = eve.codegen.MakoTemplate("${_children['location']}")
+
+    location = _Generator.apply(fixed_compound_node.location)
+    expected = f"{location} {fixed_compound_node.simple.int_value}"
+
+    # Unused children are only visited if the generator is not context-free
+    generator = _Generator()
+    assert generator.visit(fixed_compound_node).endswith(expected)
+    assert generator.simple_nodes == 1
+
+    generator = _ContextFreeGenerator()
+    assert generator.visit(fixed_compound_node).endswith(expected)
+    assert generator.simple_nodes == 0
+
+    generator = _ChildrenGenerator()
+    assert generator.visit(fixed_compound_node).endswith(location)
+    assert generator.simple_nodes == 1
+
+
+class Leaf(eve.Node):
+    value: int
+
+
+class Block(eve.Node):
+    name: str
+    statements: List[Union[Leaf, "Block"]]
+
+
+Block.update_forward_refs()
+
+
+def _make_block(depth, name="b"):
+    statements = [Leaf(value=i) for i in range(3)]
+    if depth > 0:
+        statements.append(_make_block(depth - 1, name=f"{name}_{depth}"))
+    return Block(name=name, statements=statements)
+
+
+class _StreamingGenerator(
+    eve.codegen.TemplatedGenerator, context_free=True, streamed_types=(Block,)
+):
+    Leaf = eve.codegen.FormatTemplate("leaf {value};")
+    Block = eve.codegen.MakoTemplate("${name} {\n${'\\n'.join(statements)}\n}")
+
+
+class _NonStreamingGenerator(_StreamingGenerator, context_free=False):
+    pass
+
+
+class _MangledStreamingGenerator(_StreamingGenerator):
+    Block = eve.codegen.FormatTemplate("{name}{''.join(s[::-1] for s in statements)[::-1]}")
+
+
+@pytest.mark.parametrize(
+    "generator_class",
+    [_StreamingGenerator, _NonStreamingGenerator, _MangledStreamingGenerator],
+)
+def test_streaming_templated_generator(generator_class):
+    tree = _make_block(10)
+    expected = generator_class.apply(tree)
+    chunks = list(generator_class.iter_apply(tree))
+    assert "".join(chunks) == expected
+    assert "".join(generator_class.iter_apply([tree, tree])) == expected * 2
+
+    sink = io.StringIO()
+    generator_class.apply_to(tree, sink)
+    assert sink.getvalue() == expected
+
+    if generator_class is _StreamingGenerator:
+        # Nested blocks are rendered when emitted
+        assert len(chunks) > 10
+        generator = generator_class()
+        chunk_iterator = generator.iter_visit(tree)
+        next(chunk_iterator)
+        assert len(generator._deferred_nodes_) == 2  # the root and the first nested block
+
+
+class Function(eve.Node):
+    body: Block
+    empty: Block
+
+
+class _InspectingGenerator(eve.codegen.TemplatedGenerator, context_free=True):
+    Leaf = eve.codegen.FormatTemplate("s{value};")
+    Block = eve.codegen.FormatTemplate("{''.join(statements)}")
+    Function = eve.codegen.MakoTemplate(
+        "f() { ${body.upper()} } ${'EMPTY' if not empty else empty} len=${len(body)}"
+    )
+
+
+def test_streaming_inspected_text():
+    tree = Function(
+        body=Block(name="b", statements=[Leaf(value=1), Leaf(value=2)]),
+        empty=Block(name="e", statements=[]),
+    )
+    expected = "f() { S1;S2; } EMPTY len=6"
+    assert _InspectingGenerator.apply(tree) == expected
+    assert "".join(_InspectingGenerator.iter_apply(tree)) == expected
+
+    with pytest.raises(TypeError, match="streamed_types"):
+
+        class _InvalidGenerator(eve.codegen.TemplatedGenerator, streamed_types=[Block]):
+            pass
+
+
+class Wrapper(eve.Node):
+    block: Block
+
+
+class _MemoizedStreamingGenerator(
+    eve.codegen.TemplatedGenerator,
+    context_free=True,
+    memoized_types=(Wrapper,),
+    streamed_types=(Block,),
+):
+    Leaf = eve.codegen.FormatTemplate("{value};")
+    Block = eve.codegen.FormatTemplate("{''.join(statements)}")
+    Wrapper = eve.codegen.FormatTemplate("[{block}]")
+
+
+def test_memoized_streaming_generator():
+    def make_wrappers(*values):
+        return [Wrapper(block=Block(name="b", statements=[Leaf(value=v)])) for v in values]
+
+    generator = _MemoizedStreamingGenerator()
+    assert "".join(generator.iter_visit(make_wrappers(1, 2))) == "[1;][2;]"
+    assert generator.visit(make_wrappers(1, 2)) == ["[1;]", "[2;]"]
+    assert "".join(generator.iter_visit(make_wrappers(2, 1))) == "[2;][1;]"
+
+
+class _MemoizedTestGenerator(eve.codegen.TemplatedGenerator, memoized_types=(Leaf,)):
+    Leaf = eve.codegen.MakoTemplate("${_this_generator.render_scope()}${tag}${value}")
+
+    def __init__(self):
+        self.rendered_leaves = 0
+        self.scope = "s"
+
+    def render_scope(self):
+        self.rendered_leaves += 1
+        return self.scope
+
+    def render_memo_key(self, node, **kwargs):
+        return self.scope
+
+
+def test_memoized_templated_generator():
+    leaves = [Leaf(value=i % 2) for i in range(6)]
+    generator = _MemoizedTestGenerator()
+    assert generator.visit(leaves, tag="a") == ["sa0", "sa1"] * 3
+    assert generator.rendered_leaves == 2
+
+    assert generator.visit(leaves, tag="b") == ["sb0", "sb1"] * 3
+    assert generator.visit(leaves, tag="a") == ["sa0", "sa1"] * 3
+    assert generator.rendered_leaves == 4
+
+    # The results depend on the value of render_memo_key()
+    generator.scope = "t"
+    assert generator.visit(leaves, tag="a") == ["ta0", "ta1"] * 3
+    assert generator.rendered_leaves == 6
+
+    # Unhashable arguments are compared by identity
+    tag = ["c"]
+    generator.visit(leaves, tag=tag)
+    generator.visit(leaves, tag=tag)
+    assert generator.rendered_leaves == 8
+    generator.visit(leaves, tag=["c"])
+    assert generator.rendered_leaves == 10
+
+    with pytest.raises(TypeError, match="memoized_types"):
+
+        class _InvalidGenerator(eve.codegen.TemplatedGenerator, memoized_types=(int,)):
+            pass
@@ -15,9 +15,19 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 
+import collections
+import copy
+import gc
+import hashlib
+import pickle
+from typing import Any, Dict, List, NamedTuple, Tuple, Union
+
 import pydantic
 import pytest
 
+import eve
+from eve import concepts
+
 from .. import definitions
 
 
@@ -51,6 +61,22 @@ class TestNode:
         with pytest.raises(pydantic.ValidationError, match="id_"):
             definitions.LocationNode(id_=32, loc=source_location)
 
+    def test_lazy_id(self, sample_node_maker):
+        node = sample_node_maker()
+        assert node.__dict__["id_"] is None
+        copied = node.copy()
+        assert copied.id_ == node.id_
+        assert node.id_.startswith(f"{node.__class__.__qualname__}_")
+        assert node.__dict__["id_"] == node.id_
+
+        # Paths reading the pydantic values directly generate the id first
+        other = sample_node_maker()
+        assert pickle.loads(pickle.dumps(other)).id_ == other.id_ != node.id_
+        other = sample_node_maker()
+        assert other.dict()["id_"] == other.id_
+        other = sample_node_maker()
+        assert f"id_='{other.id_}'" in repr(other)
+
     def test_impl_fields(self, sample_node):
         impl_names = set(name for name, _ in sample_node.iter_impl_fields())
 
@@ -99,3 +125,461 @@ class TestNode:
             and isinstance(metadata["definition"], pydantic.fields.ModelField)
             for metadata in sample_node.__node_children__.values()
         )
+
+    def test_node_fields_accessors(self, sample_node):
+        assert sample_node.__node_impl_fields_names__ == tuple(sample_node.__node_impl_fields__)
+        assert sample_node.__node_children_names__ == tuple(sample_node.__node_children__)
+        assert list(sample_node.iter_children()) == [
+            (name, getattr(sample_node, name)) for name in sample_node.__node_children_names__
+        ]
+        assert list(sample_node.iter_impl_fields()) == [
+            (name, getattr(sample_node, name)) for name in sample_node.__node_impl_fields_names__
+        ]
+        assert sample_node.__node_children_getter__(sample_node) == tuple(
+            sample_node.iter_children_values()
+        )
+
+        empty_node = definitions.EmptyNode()
+        assert list(empty_node.iter_children()) == []
+        assert list(empty_node.iter_impl_fields()) == [("id_", empty_node.id_)]
+
+
+class _InferredNode(eve.Node):
+    value: int
+    double: int
+
+    @pydantic.root_validator(pre=True)
+    @eve.computes_derived_values
+    def _infer_double(cls, values):
+        values.setdefault("double", 2 * values["value"])
+        return values
+
+
+class _NamedUnionLeaf(eve.Node):
+    name: str = "leaf"
+
+
+class _UnionLeaf(eve.Node):
+    flag: bool
+
+
+class _UnionNode(eve.Node):
+    children: List[Union[_NamedUnionLeaf, _UnionLeaf]]
+
+
+class TestValidationLevels:
+    def test_default_level(self):
+        assert concepts.get_validation_level() == eve.ValidationLevel.FULL
+
+    def test_context_manager(self):
+        with eve.validation_level(eve.ValidationLevel.TRUSTED):
+            assert concepts.get_validation_level() == eve.ValidationLevel.TRUSTED
+            with eve.validation_level(eve.ValidationLevel.DEFERRED):
+                assert concepts.get_validation_level() == eve.ValidationLevel.DEFERRED
+            assert concepts.get_validation_level() == eve.ValidationLevel.TRUSTED
+        assert concepts.get_validation_level() == eve.ValidationLevel.FULL
+
+    def test_set_validation_level(self):
+        try:
+            concepts.set_validation_level(eve.ValidationLevel.TRUSTED)
+            assert concepts.get_validation_level() == eve.ValidationLevel.TRUSTED
+        finally:
+            concepts.set_validation_level(eve.ValidationLevel.FULL)
+
+    def test_trusted(self, source_location):
+        with eve.validation_level(eve.ValidationLevel.TRUSTED):
+            node = definitions.SimpleNodeWithOptionals(int_value="not an int", float_value=1.0)
+            other = definitions.LocationNode(loc=source_location)
+
+        assert node.int_value == "not an int"
+        assert node.str_value is None
+        assert node.__fields_set__ == {"int_value", "float_value"}
+        assert node.id_ and other.id_ and node.id_ != other.id_
+        assert not node._pending_validation
+        assert eve.validate_tree(node) is node
+        assert node.int_value == "not an int"
+
+    def test_trusted_frozen(self, frozen_simple_node):
+        with eve.validation_level(eve.ValidationLevel.TRUSTED):
+            node = definitions.FrozenSimpleNode(**frozen_simple_node.dict(exclude={"id_"}))
+
+        assert node.dict(exclude={"id_"}) == frozen_simple_node.dict(exclude={"id_"})
+        with pytest.raises(TypeError):
+            node.id_ = None
+
+    @pytest.mark.parametrize("level", [eve.ValidationLevel.TRUSTED, eve.ValidationLevel.DEFERRED])
+    def test_derived_values(self, level):
+        reference = definitions.make_node_with_symbol_table()
+        with eve.validation_level(level):
+            node = _InferredNode(value=2)
+            symbol_node = definitions.NodeWithSymbolTable(
+                **{name: getattr(reference, name) for name in reference.__node_children_names__}
+            )
+
+        assert node.double == 4
+        assert symbol_node.symtable_ == reference.symtable_
+
+    def test_deferred(self, source_location):
+        with eve.validation_level(eve.ValidationLevel.DEFERRED):
+            node = definitions.SimpleNodeWithOptionals(int_value=1, float_value=1.0)
+            tree = definitions.SimpleNodeWithLoc(
+                int_value=2, float_value=2.0, str_value="a", loc=source_location
+            )
+
+        assert node._pending_validation and tree._pending_validation
+        eve.validate_tree([node, {"tree": tree}])
+        assert not node._pending_validation and not tree._pending_validation
+        assert node.int_value == 1 and tree.loc == source_location
+        assert node.__fields_set__ == {"int_value", "float_value"}
+
+    def test_deferred_union_fields(self):
+        with eve.validation_level(eve.ValidationLevel.DEFERRED):
+            leaf = _UnionLeaf(flag=True)
+            node = _UnionNode(children=[leaf])
+            # Validated in the same context (e.g. after each pass of a pipeline)
+            eve.validate_tree(node)
+
+        assert node.children[0].__class__ is _UnionLeaf
+        assert node.children[0].flag is True
+
+    def test_deferred_errors(self, fixed_compound_node):
+        with eve.validation_level(eve.ValidationLevel.DEFERRED):
+            invalid = definitions.SimpleNodeWithOptionals(int_value="not an int")
+            parent = fixed_compound_node.copy(update={"simple_opt": invalid})
+
+        with pytest.raises(pydantic.ValidationError, match="int_value"):
+            eve.validate_tree(parent)
+        assert invalid._pending_validation
+
+
+class _AnyChildNode(eve.Node):
+    child: Any
+
+
+class _NestedNode(eve.Node):
+    items: List[Union[definitions.LocationNode, "_NestedNode"]]
+    mapping: Dict[str, Tuple[definitions.SimpleNode, ...]]
+
+
+_NestedNode.update_forward_refs()
+
+
+def test_reachable_node_classes():
+    reachable = concepts.get_reachable_node_classes(definitions.CompoundNode)
+    assert {
+        definitions.LocationNode,
+        definitions.SimpleNode,
+        definitions.SimpleNodeWithLoc,
+        definitions.SimpleNodeWithOptionals,
+    } <= reachable
+    assert not any(issubclass(item, definitions.CompoundNode) for item in reachable)
+    assert concepts.get_reachable_node_classes(definitions.SimpleNode) == frozenset()
+
+    reachable = concepts.get_reachable_node_classes(_NestedNode)
+    assert {_NestedNode, definitions.LocationNode, definitions.SimpleNode} <= reachable
+    assert definitions.CompoundNode not in reachable
+
+    assert concepts.get_reachable_node_classes(_AnyChildNode) is None
+
+    # New subclasses are taken into account
+    class _SubLocationNode(definitions.LocationNode):
+        other: definitions.EmptyNode
+
+    reachable = concepts.get_reachable_node_classes(definitions.CompoundNode)
+    assert {_SubLocationNode, definitions.EmptyNode} <= reachable
+
+
+class TestStructuralHashing:
+    def test_frozen_nodes(self, frozen_simple_node):
+        same = frozen_simple_node.copy(update={"id_": "other_id"})
+        different = frozen_simple_node.copy(update={"int_value": frozen_simple_node.int_value + 1})
+
+        assert same == frozen_simple_node
+        assert hash(same) == hash(frozen_simple_node)
+        assert different != frozen_simple_node
+        assert len({frozen_simple_node, same, different}) == 2
+
+        # Hashes are cached in the frozen nodes but not copied
+        assert frozen_simple_node._structural_hash == hash(frozen_simple_node)
+        assert different._structural_hash == hash(different)
+        assert frozen_simple_node != {"int_value": frozen_simple_node.int_value}
+
+    def test_mutable_nodes(self, fixed_compound_node):
+        same = definitions.CompoundNode(**dict(fixed_compound_node.iter_children()))
+        assert same.id_ != fixed_compound_node.id_
+        assert eve.structural_eq(same, fixed_compound_node)
+        assert eve.structural_hash(same) == eve.structural_hash(fixed_compound_node)
+
+        same.simple = same.simple.copy(update={"int_value": same.simple.int_value + 1})
+        assert not eve.structural_eq(same, fixed_compound_node)
+        assert eve.structural_hash(same) != eve.structural_hash(fixed_compound_node)
+
+    def test_collections(self, fixed_compound_node):
+        assert eve.structural_eq([1, {"a": (2, 3)}], [1, {"a": (2, 3)}])
+        assert not eve.structural_eq([1, 2], (1, 2))
+        assert not eve.structural_eq({"a": 1}, {"b": 1})
+        assert eve.structural_hash({"a": 1, "b": 2}) == eve.structural_hash({"b": 2, "a": 1})
+        assert eve.structural_hash({1, 2, 3}) == eve.structural_hash({3, 2, 1})
+        assert eve.structural_hash([1, 2]) != eve.structural_hash((1, 2))
+
+        deep, other_deep = [], []
+        for _ in range(10000):
+            deep, other_deep = [deep], [other_deep]
+        assert eve.structural_hash(deep) == eve.structural_hash(other_deep)
+        assert eve.structural_eq(deep, other_deep)
+
+
+class _Pair(NamedTuple):
+    first: Any
+    second: Any
+
+
+class TestCloneTree:
+    def test_clone(self, sample_node):
+        expected = sample_node.dict()  # generate the ids
+        cloned = eve.clone_tree(sample_node)
+        assert cloned is not sample_node
+        assert cloned.__class__ is sample_node.__class__
+        assert cloned.id_ == sample_node.id_
+        assert cloned.__fields_set__ == sample_node.__fields_set__
+        assert eve.structural_eq(cloned, sample_node)
+        assert cloned.dict() == expected
+        for value, cloned_value in zip(
+            sample_node.iter_children_values(), cloned.iter_children_values()
+        ):
+            if isinstance(value, (eve.Node, list, dict, set)):
+                assert cloned_value is not value
+        assert sample_node.copy(deep=True).dict() == sample_node.dict()
+
+    def test_sharing(self, frozen_simple_node):
+        node = definitions.make_simple_node()
+        tree = {"a": [node, node, frozen_simple_node], "b": ("text", 1)}
+        cloned = eve.clone_tree(tree)
+        assert cloned["a"][0] is cloned["a"][1] is not node
+        assert cloned["a"][2] is frozen_simple_node
+        assert cloned["b"] is tree["b"]
+
+    def test_lazy_id(self, sample_node_maker):
+        node = sample_node_maker()
+        cloned = eve.clone_tree(node)
+        assert node.__dict__["id_"] is None and cloned.__dict__["id_"] is None
+        assert cloned.id_ != node.id_
+
+    def test_deep_copy_ids(self):
+        node = definitions.make_compound_node()
+        copied = node.copy(deep=True)
+        assert copied is not node and copied.simple is not node.simple
+        assert copied == node
+        assert copied.id_ == node.id_ and copied.simple.id_ == node.simple.id_
+        assert node.copy(deep=True).id_ == node.id_
+
+    def test_tuple_subclasses(self):
+        node = definitions.make_simple_node()
+        tree = [_Pair(node, 1), _Pair(1, 2)]
+        cloned = eve.clone_tree(tree)
+        assert isinstance(cloned[0], _Pair) and cloned[0].first is not node
+        assert eve.structural_eq(cloned[0].first, node) and cloned[0].second == 1
+        assert cloned[1] is tree[1]
+
+        cloned = eve.clone_tree(tree, path=[1])
+        assert cloned[1] == tree[1] and cloned[1] is not tree[1]
+        assert isinstance(cloned[1], _Pair)
+
+    def test_mapping_subclasses(self):
+        node = definitions.make_simple_node()
+        tree = collections.defaultdict(list, {"a": [node], "b": 1})
+        for cloned in (eve.clone_tree(tree), eve.clone_tree(tree, path=["a"])):
+            assert isinstance(cloned, collections.defaultdict) and cloned is not tree
+            assert cloned.default_factory is list and list(cloned.keys()) == ["a", "b"]
+            assert cloned["a"] is not tree["a"] and eve.structural_eq(cloned["a"], tree["a"])
+            assert cloned["b"] == 1
+
+    def test_symbol_table(self):
+        node = definitions.make_node_with_symbol_table()
+        cloned = eve.clone_tree(node)
+        assert cloned.symtable_.keys() == node.symtable_.keys()
+        assert cloned.symtable_[node.node_with_name.name] is cloned.node_with_name
+
+    def test_path(self, fixed_compound_node):
+        tree = [fixed_compound_node, definitions.make_compound_node()]
+        cloned = eve.clone_tree(tree, path=[0, "simple"])
+        assert cloned is not tree and cloned[1] is tree[1]
+        assert cloned[0] is not fixed_compound_node and cloned[0].simple is not tree[0].simple
+        assert cloned[0].location is fixed_compound_node.location
+
+        cloned[0].simple.int_value += 1
+        cloned[0].location = definitions.make_location_node()
+        assert fixed_compound_node.simple.int_value == cloned[0].simple.int_value - 1
+        assert cloned[0].location is not fixed_compound_node.location
+
+        assert eve.clone_tree(tree, path=()) == tree
+        with pytest.raises(ValueError, match="path"):
+            eve.clone_tree(tree, path=[0, "id_"])
+        with pytest.raises(ValueError, match="path"):
+            eve.clone_tree(tree, path=[2])
+
+
+class TestFingerprint:
+    def test_stability(self):
+        # Fingerprints should not depend on the interpreter session
+        assert eve.fingerprint([1, "a", None]) == "e267c831ecae41cd"
+        assert eve.fingerprint({"b", "a"}, hash_algorithm="md5") == eve.fingerprint(
+            {"a", "b"}, hash_algorithm=hashlib.md5()
+        )
+
+    def test_nodes(self, fixed_compound_node):
+        same = definitions.CompoundNode(**dict(fixed_compound_node.iter_children()))
+        assert same.id_ != fixed_compound_node.id_
+        assert eve.fingerprint(same) == eve.fingerprint(fixed_compound_node)
+        assert eve.fingerprint(same, ignore_fields=()) != eve.fingerprint(
+            fixed_compound_node, ignore_fields=()
+        )
+        assert eve.fingerprint(same, ignore_fields=("id_",)) == eve.fingerprint(
+            fixed_compound_node, ignore_fields=("id_",)
+        )
+
+        same.simple = same.simple.copy(update={"int_value": same.simple.int_value + 1})
+        assert eve.fingerprint(same) != eve.fingerprint(fixed_compound_node)
+        assert eve.fingerprint(same, ignore_fields=("simple", "id_")) == eve.fingerprint(
+            fixed_compound_node, ignore_fields=("simple", "id_")
+        )
+
+    def test_collections(self):
+        assert eve.fingerprint({"a": 1, "b": 2}) == eve.fingerprint({"b": 2, "a": 1})
+        assert eve.fingerprint({1, 2, 3}) == eve.fingerprint({3, 2, 1})
+        assert eve.fingerprint([1, 2]) != eve.fingerprint((1, 2))
+        assert eve.fingerprint(["ab", "c"]) != eve.fingerprint(["a", "bc"])
+        assert eve.fingerprint([1, True, 1.0, "1"]) != eve.fingerprint([1, 1, 1, 1])
+
+        deep, other_deep = [], []
+        for _ in range(10000):
+            deep, other_deep = [deep], [other_deep]
+        assert eve.fingerprint(deep) == eve.fingerprint(other_deep)
+
+
+class TestContentUIDGenerator:
+    def test_ids(self, fixed_compound_node):
+        same = definitions.CompoundNode(**dict(fixed_compound_node.iter_children()))
+        generator = eve.ContentUIDGenerator()
+        first = generator.id(fixed_compound_node, prefix="kernel")
+        assert first.startswith("kernel_") and len(first) == len("kernel_") + 8
+        assert first == eve.ContentUIDGenerator().id(same, prefix="kernel")
+        assert generator.id(same, prefix="kernel") == first + "_1"
+        assert generator.id(same, prefix="other") == "other" + first[len("kernel") :]
+        assert generator.id(same) == first[len("kernel_") :]
+        assert len(eve.ContentUIDGenerator(width=4).id(same)) == 4
+
+        with pytest.raises(ValueError, match="Width"):
+            eve.ContentUIDGenerator(width=0)
+
+
+class _InternedNode(eve.FrozenNode, interned=True):
+    value: int
+    kind: definitions.IntKind = definitions.IntKind.PLUS
+
+
+class _InternedPair(eve.FrozenNode, interned=True):
+    first: _InternedNode
+    second: _InternedNode
+
+
+class TestInterning:
+    def test_interning(self):
+        node = _InternedNode(value=1)
+        assert _InternedNode(value=1) is node
+        assert _InternedNode(value=1, id_="other_id") is node
+        assert _InternedNode(value=1, kind=definitions.IntKind.MINUS) is not node
+        assert _InternedNode(value=2) is not node
+
+        pair = _InternedPair(first=node, second=_InternedNode(value=2))
+        assert _InternedPair(first=_InternedNode(value=1), second=_InternedNode(value=2)) is pair
+        assert copy.deepcopy([pair, pair])[1] is pair
+
+    def test_not_interned(self, frozen_simple_node):
+        node = _InternedNode(value=1)
+        assert node.copy() is not node
+        assert node.copy() == node
+        with eve.validation_level(eve.ValidationLevel.DEFERRED):
+            assert _InternedNode(value=1) is not node
+
+        data = frozen_simple_node.dict(exclude={"id_"})
+        assert definitions.FrozenSimpleNode(**data) is not frozen_simple_node
+
+    def test_weak_references(self):
+        node = _InternedNode(value=12345)
+        node_id = node.id_
+        del node
+        gc.collect()
+        assert _InternedNode(value=12345).id_ != node_id
+
+    def test_impl_fields_error(self):
+        with pytest.raises(TypeError, match="implementation fields"):
+
+            class _InvalidInternedNode(eve.FrozenNode, interned=True):
+                value: int
+                cache_: int = 0
+
+
+class _NodeWithCachedProperty(eve.Node):
+    items: List[definitions.SimpleNode]
+    computed__: int = 0
+
+    @eve.cached_node_property
+    def int_values(self):
+        """Integer values of the items."""
+        self.computed__ += 1
+        return [item.int_value for item in self.items]
+
+
+class _ItemsRemover(eve.NodeMutator):
+    def visit_SimpleNode(self, node, **kwargs):
+        return eve.NOTHING
+
+
+class TestCachedNodeProperty:
+    def test_caching(self, fixed_compound_node):
+        simple = fixed_compound_node.simple
+        node = _NodeWithCachedProperty(items=[simple, simple])
+
+        assert node.int_values == [simple.int_value] * 2
+        assert node.int_values is node.int_values
+        assert node.computed__ == 1
+        assert "int_values" not in node.dict()
+        assert _NodeWithCachedProperty.int_values.__doc__ == "Integer values of the items."
+
+    def test_invalidation(self, fixed_compound_node):
+        simple = fixed_compound_node.simple
+        node = _NodeWithCachedProperty(items=[simple])
+        assert node.int_values == [simple.int_value]
+
+        # Field reassignment
+        node.items = [simple, simple]
+        assert node.int_values == [simple.int_value] * 2
+        assert node.computed__ == 2
+
+        # Copies
+        other = node.copy(update={"items": []})
+        assert other.int_values == []
+
+        # Modifications by NodeMutators
+        node.items = [simple]
+        assert node.int_values == [simple.int_value]
+        _ItemsRemover().visit(node)
+        assert node.items == []
+        assert node.int_values == []
+
+        # Explicit invalidation
+        node.items.append(simple)
+        assert node.int_values == []
+        eve.invalidate_node_properties()
+        assert node.int_values == [simple.int_value]
+        node.items.append(simple)
+        eve.iterators.TreeIndex.notify_mutation()
+        assert node.int_values == [simple.int_value] * 2
+
+        # Ancestors are not notified of the modifications of their descendants
+        old_value = simple.int_value
+        simple.int_value = old_value + 1
+        assert node.int_values == [old_value] * 2
+        eve.invalidate_node_properties()
+        assert node.int_values == [old_value + 1] * 2
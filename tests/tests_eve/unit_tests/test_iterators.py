@@ -23,6 +23,8 @@ import pytest
 
 import eve
 
+from .. import definitions
+
 
 class Tree(eve.Node):
     children: List[Union["Tree", int]]
@@ -110,3 +112,75 @@ def test_iter_tree(tree):
         traversals.append([value for value in eve.iter_tree(tree, order)])
 
     assert all(len(traversals[0]) == len(t) for t in traversals)
+
+
+@pytest.mark.parametrize("order", list(eve.iterators.TraversalOrder))
+def test_iter_tree_deep_and_wide_trees(order):
+    depth = 5000
+    deep_tree = Tree(children=[0])
+    for i in range(1, depth + 1):
+        deep_tree = Tree(children=[deep_tree, i])
+    values = [value for value in eve.iter_tree(deep_tree, order) if isinstance(value, int)]
+    assert sorted(values) == list(range(depth + 1))
+
+    wide_tree = _make_tree([[i, [i]] for i in range(depth)])
+    items = list(eve.iter_tree(wide_tree, order, with_keys=True))
+    assert len(items) == len(list(eve.iter_tree(wide_tree, order)))
+    if order == eve.iterators.TraversalOrder.LEVELS_ORDER:
+        assert [key for key, value in items[:3]] == [None, "children", 0]
+
+
+class TestTreeIndex:
+    def test_find(self, dfs_ordered_tree, fixed_compound_node):
+        for tree in [dfs_ordered_tree, [fixed_compound_node, {"a": fixed_compound_node}]]:
+            index = eve.TreeIndex(tree)
+            for node_class in [Tree, eve.Node, definitions.SimpleNode, (Tree, eve.Node)]:
+                classes = node_class if isinstance(node_class, tuple) else (node_class,)
+                expected = eve.iter_tree(tree).if_isinstance(*classes).to_list()
+                assert len(index.find(node_class)) == len(expected)
+                assert all(a is b for a, b in zip(index.find(node_class), expected))
+
+        index = eve.TreeIndex(dfs_ordered_tree)
+        assert len(index) == len(eve.iter_tree(dfs_ordered_tree).if_isinstance(Tree).to_list())
+        assert index.find(definitions.SimpleNode) == []
+
+    def test_find_within(self, dfs_ordered_tree):
+        index = eve.TreeIndex(dfs_ordered_tree)
+        for subtree in index.find(Tree):
+            expected = eve.iter_tree(subtree).if_isinstance(Tree).to_list()
+            found = index.find(Tree, within=subtree)
+            assert len(found) == len(expected)
+            assert all(a is b for a, b in zip(found, expected))
+
+        with pytest.raises(ValueError, match="not part of the indexed tree"):
+            index.find(Tree, within=Tree(children=[]))
+
+    def test_parents(self, dfs_ordered_tree):
+        index = eve.TreeIndex(dfs_ordered_tree)
+        assert index.parent(dfs_ordered_tree) is None
+        for parent, node in index.find_with_parents(Tree):
+            assert index.parent(node) is parent
+            if parent is not None:
+                assert any(child is node for child in parent.children)
+
+    def test_mutations(self, dfs_ordered_tree):
+        class _Pruner(eve.NodeMutator):
+            def visit_Tree(self, node, **kwargs):
+                if all(isinstance(child, int) for child in node.children):
+                    return eve.NOTHING
+                return self.generic_visit(node, **kwargs)
+
+        index = eve.TreeIndex(dfs_ordered_tree)
+        removed = [node for node in index.find(Tree) if index.parent(node) is not None]
+        assert removed[0] in index
+
+        _Pruner().visit(dfs_ordered_tree)
+        expected = eve.iter_tree(dfs_ordered_tree).if_isinstance(Tree).to_list()
+        assert len(index.find(Tree)) == len(expected)
+        assert all(a is b for a, b in zip(index.find(Tree), expected))
+
+        new_node = Tree(children=[1])
+        dfs_ordered_tree.children.append(new_node)
+        assert new_node not in index
+        index.refresh()
+        assert new_node in index and index.parent(new_node) is dfs_ordered_tree
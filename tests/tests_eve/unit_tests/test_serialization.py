@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+
+import pickle
+
+import pytest
+
+import eve
+from eve import serialization
+from eve.typingx import Any, List
+
+from .. import definitions
+
+
+class _InternedNode(eve.FrozenNode, interned=True):
+    value: int
+
+
+class _Container(eve.Node):
+    items: List[Any]
+
+
+def test_round_trip(sample_node):
+    loaded = serialization.loads(serialization.dumps(sample_node))
+
+    assert loaded is not sample_node
+    assert loaded.__class__ is sample_node.__class__
+    assert loaded.__fields_set__ == sample_node.__fields_set__
+    assert eve.structural_eq(loaded, sample_node)
+    assert eve.fingerprint(loaded) == eve.fingerprint(sample_node)
+
+
+def test_values():
+    values = [
+        None,
+        True,
+        False,
+        0,
+        -1,
+        2 ** 70,
+        -(2 ** 70),
+        1.5,
+        "text",
+        b"\x00bytes",
+        definitions.IntKind.MINUS,
+        definitions.StrKind.BLA,
+        (1, ("a", None)),
+        {1, 2},
+        frozenset({"a"}),
+        {"a": [1.0], 2: {"b": ()}},
+        complex(1, 2),  # pickled
+        [],
+    ]
+    assert serialization.loads(serialization.dumps(values)) == values
+
+
+def test_shared_models(frozen_simple_node):
+    simple = definitions.make_simple_node()
+    interned = _InternedNode(value=1)
+    data = serialization.dumps(_Container(items=[simple, simple, frozen_simple_node, interned]))
+    loaded = serialization.loads(data)
+
+    assert loaded.items[0] is loaded.items[1]
+    assert eve.structural_eq(loaded.items[0], simple)
+    assert loaded.items[2] == frozen_simple_node
+    assert loaded.items[3] is interned
+    assert len(data) < len(pickle.dumps(loaded))
+
+    node = definitions.make_node_with_symbol_table()
+    loaded = serialization.loads(serialization.dumps(node))
+    assert loaded.symtable_[node.node_with_name.name] is loaded.node_with_name
+
+
+def test_ids():
+    node = definitions.make_compound_node()
+    node_id = node.id_
+    loaded = serialization.loads(serialization.dumps(node))
+
+    assert loaded.id_ == node_id
+    # Ids which have not been generated are not stored
+    assert loaded.simple.id_ != node.simple.id_
+
+
+def test_files(tmp_path):
+    tree = [definitions.make_compound_node(), definitions.make_compound_node()]
+    file_path = tmp_path / "tree.eve"
+    serialization.dump(tree, file_path)
+
+    loaded = serialization.load(file_path)
+    assert eve.structural_eq(loaded, tree)
+    with open(file_path, "rb") as f:
+        assert eve.structural_eq(serialization.load(f), tree)
+
+
+def test_lazy_loading(tmp_path):
+    tree = [definitions.make_compound_node() for _ in range(10)]
+    file_path = tmp_path / "tree.eve"
+    serialization.dump(tree, file_path)
+
+    with serialization.TreeArchive(file_path) as archive:
+        assert archive.keys() == list(range(10))
+        assert archive.keys([3]) == list(tree[3].__fields__)
+
+        simple = archive.load([3, "simple"])
+        assert eve.structural_eq(simple, tree[3].simple)
+        assert len(archive._objects) == 1
+
+        # Loaded subtrees share the models loaded before
+        third = archive.load([3])
+        assert third.simple is simple
+        assert eve.structural_eq(third, tree[3])
+        assert eve.structural_eq(archive.load(), tree)
+        assert archive.load()[3] is third
+
+        with pytest.raises(eve.exceptions.EveValueError, match="path"):
+            archive.load([3, "missing"])
+        with pytest.raises(eve.exceptions.EveValueError, match="path"):
+            archive.load([10])
+
+
+def test_invalid_data(tmp_path):
+    with pytest.raises(eve.exceptions.EveValueError, match="not a serialized tree"):
+        serialization.loads(b"not a tree")
+
+    file_path = tmp_path / "empty.eve"
+    file_path.touch()
+    with pytest.raises(eve.exceptions.EveValueError, match="not a serialized tree"):
+        serialization.TreeArchive(file_path)
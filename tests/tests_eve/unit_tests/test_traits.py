@@ -56,6 +56,33 @@ class _NodeWithChildSymbolTable(eve.Node, eve.SymbolTableTrait):
     tbl: List[_NodeWithSymbolTableAndSymbol]
 
 
+class _NodeWithSymbols(eve.Node):
+    symbols: List[_NodeWithSymbolName]
+
+
+class _NodeWithChildSymbols(eve.Node, eve.SymbolTableTrait):
+    child: _NodeWithSymbols
+
+
+class _FrozenNodeWithChildSymbols(eve.FrozenNode, eve.SymbolTableTrait):
+    child: _NodeWithSymbols
+
+
+class _NodeWithSymbolRef(eve.Node):
+    ref: eve.SymbolRef
+
+
+class _Block(eve.Node):
+    name: eve.SymbolName
+    primary: eve.SymbolRef
+    symbols: List[_NodeWithSymbolName]
+    refs: List[_NodeWithSymbolRef]
+    blocks: List["_Block"]
+
+
+_Block.update_forward_refs()
+
+
 @pytest.fixture
 def node_with_duplicated_names_maker():
     def _maker():
@@ -101,3 +128,137 @@ class TestSymbolTable:
         }
         collected_inner_symbols = inner_symbol_table_node.symtable_
         assert collected_inner_symbols == expected_inner_symbols
+
+    def test_symbol_table_update_on_assignment(self):
+        node = _NodeWithChildSymbolTable(
+            tbl=[], symbols=[_NodeWithSymbolName(name="a"), _NodeWithSymbolName(name="b")]
+        )
+        new_symbol = _NodeWithSymbolName(name="c")
+        node.symbols = [new_symbol]
+        assert node.symtable_ == {"c": new_symbol}
+
+    def test_symbol_table_update_on_mutation(self):
+        inner_symbol_table_node = _NodeWithSymbolTableAndSymbol(
+            name="inner_tbl", symbols=[_NodeWithSymbolName(name="inner_symbol")]
+        )
+        outer_symbol_table_node = _NodeWithChildSymbolTable(
+            tbl=[inner_symbol_table_node], symbols=[_NodeWithSymbolName(name="outer_symbol")]
+        )
+
+        class _Renamer(eve.NodeMutator):
+            def visit__NodeWithSymbolName(self, node, **kwargs):
+                return _NodeWithSymbolName(name=f"renamed_{node.name}")
+
+        _Renamer().visit(outer_symbol_table_node)
+
+        assert set(outer_symbol_table_node.symtable_) == {"renamed_outer_symbol", "inner_tbl"}
+        assert set(inner_symbol_table_node.symtable_) == {"renamed_inner_symbol"}
+
+    def test_symbol_table_update_on_frozen_scope_mutation(self):
+        node = _FrozenNodeWithChildSymbols(
+            child=_NodeWithSymbols(symbols=[_NodeWithSymbolName(name="a")])
+        )
+
+        class _Renamer(eve.NodeMutator):
+            def visit__NodeWithSymbolName(self, node, **kwargs):
+                return _NodeWithSymbolName(name=f"renamed_{node.name}")
+
+        _Renamer().visit(node)
+        assert node.symtable_ == {"renamed_a": node.child.symbols[0]}
+
+    def test_symbol_table_translation(self):
+        node = _NodeWithChildSymbolTable(
+            tbl=[], symbols=[_NodeWithSymbolName(name="a"), _NodeWithSymbolName(name="b")]
+        )
+
+        class _Remover(eve.NodeTranslator, copy_on_write=True):
+            def visit__NodeWithSymbolName(self, node, **kwargs):
+                return eve.NOTHING if node.name == "a" else node
+
+        new_node = _Remover().visit(node)
+        assert set(node.symtable_) == {"a", "b"}
+        assert new_node.symtable_ == {"b": node.symbols[1]}
+
+    def test_symbol_table_of_modified_children(self):
+        child = _NodeWithSymbols(symbols=[_NodeWithSymbolName(name="a")])
+        node = _NodeWithChildSymbols(child=child)
+        assert set(node.symtable_) == {"a"}
+
+        new_symbol = _NodeWithSymbolName(name="b")
+        child.symbols.append(new_symbol)
+        new_node = _NodeWithChildSymbols(child=child)
+        assert new_node.symtable_ == {"a": child.symbols[0], "b": new_symbol}
+
+    def test_collect_symbols(self):
+        node = _NodeWithSymbolTable(symbols=[_NodeWithSymbolName(name="a")])
+        new_symbol = _NodeWithSymbolName(name="b")
+        node.symbols.append(new_symbol)
+        assert set(node.symtable_) == {"a"}
+
+        node.collect_symbols()
+        assert node.symtable_ == {"a": node.symbols[0], "b": new_symbol}
+
+
+class TestSymbolIndex:
+    @pytest.fixture
+    def tree(self):
+        inner = _Block(
+            name="inner",
+            primary="b",
+            symbols=[_NodeWithSymbolName(name="b")],
+            refs=[_NodeWithSymbolRef(ref="a"), _NodeWithSymbolRef(ref="b")],
+            blocks=[],
+        )
+        outer = _Block(
+            name="outer",
+            primary="inner",
+            symbols=[_NodeWithSymbolName(name="a"), _NodeWithSymbolName(name="b")],
+            refs=[_NodeWithSymbolRef(ref="b"), _NodeWithSymbolRef(ref="inner")],
+            blocks=[inner],
+        )
+        yield outer
+
+    def test_resolve(self, tree):
+        index = eve.SymbolIndex(tree)
+        inner = tree.blocks[0]
+        # Without scopes, the last declaration of a name takes precedence
+        assert index.resolve(tree.refs[0], "ref") is inner.symbols[0]
+        assert index.resolve(tree.refs[1], "ref") is inner
+        assert index.resolve(inner.refs[0], "ref") is tree.symbols[0]
+        assert index.resolve(inner.refs[1], "ref") is inner.symbols[0]
+        assert index.resolve(tree, "primary") is inner
+
+    def test_scopes(self, tree):
+        index = eve.SymbolIndex(tree, scopes=_Block)
+        inner = tree.blocks[0]
+        assert index.resolve(inner.refs[0], "ref") is tree.symbols[0]
+        assert index.resolve(inner.refs[1], "ref") is inner.symbols[0]
+        assert index.resolve(inner, "primary") is inner.symbols[0]
+        assert index.resolve(tree.refs[0], "ref") is tree.symbols[1]
+        assert set(index.symbols()) == {"outer", "a", "b", "inner"}
+        assert set(index.symbols(inner)) == {"b"}
+
+    def test_errors(self, tree):
+        index = eve.SymbolIndex(tree)
+        with pytest.raises(eve.exceptions.EveValueError, match="not a symbol reference"):
+            index.resolve(tree.symbols[0], "name")
+        with pytest.raises(eve.exceptions.EveValueError, match="not a scope"):
+            index.symbols(tree.symbols[0])
+
+        tree.refs.append(_NodeWithSymbolRef(ref="undefined"))
+        index.refresh()
+        with pytest.raises(eve.exceptions.EveValueError, match="not declared"):
+            index.resolve(tree.refs[-1], "ref")
+
+    def test_refresh_after_mutation(self, tree):
+        index = eve.SymbolIndex(tree, scopes=_Block)
+
+        class _Renamer(eve.NodeMutator):
+            def visit__NodeWithSymbolName(self, node, **kwargs):
+                return _NodeWithSymbolName(name=f"renamed_{node.name}")
+
+            def visit__NodeWithSymbolRef(self, node, **kwargs):
+                return _NodeWithSymbolRef(ref=f"renamed_{node.ref}")
+
+        _Renamer().visit(tree)
+        assert index.resolve(tree.refs[0], "ref") is tree.symbols[1]
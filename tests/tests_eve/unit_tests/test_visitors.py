@@ -0,0 +1,567 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+
+from __future__ import annotations
+
+import pytest
+
+import eve
+import eve.codegen
+
+from .. import definitions
+
+
+class _CompoundVisitor(eve.NodeVisitor):
+    def __init__(self):
+        self.visited = []
+
+    def visit_Node(self, node, **kwargs):
+        self.visited.append(("Node", type(node).__name__))
+        self.generic_visit(node, **kwargs)
+
+    def visit_SimpleNode(self, node, **kwargs):
+        self.visited.append(("SimpleNode", type(node).__name__))
+
+    def visit_IntKind(self, node, **kwargs):
+        self.visited.append(("IntKind", node))
+
+
+class _DerivedSimpleNode(definitions.SimpleNode):
+    pass
+
+
+class _InheritedCompoundVisitor(_CompoundVisitor):
+    def visit_LocationNode(self, node, **kwargs):
+        self.visited.append(("LocationNode", type(node).__name__))
+
+
+def test_dispatch_mro(fixed_compound_node):
+    visitor = _CompoundVisitor()
+    visitor.visit(fixed_compound_node)
+    assert visitor.visited[0] == ("Node", "CompoundNode")
+    assert ("Node", "LocationNode") in visitor.visited
+    assert ("SimpleNode", "SimpleNode") in visitor.visited
+
+    # Results are cached per visitor class
+    assert _CompoundVisitor.__dispatch_table__[definitions.CompoundNode] is (
+        _CompoundVisitor.visit_Node
+    )
+    assert _CompoundVisitor.__dispatch_table__[definitions.SimpleNode] is (
+        _CompoundVisitor.visit_SimpleNode
+    )
+
+    visitor = _CompoundVisitor()
+    visitor.visit(_DerivedSimpleNode(**fixed_compound_node.simple.dict(exclude={"id_"})))
+    assert visitor.visited == [("SimpleNode", "_DerivedSimpleNode")]
+
+
+def test_dispatch_subclass_tables(fixed_compound_node):
+    base_visitor = _CompoundVisitor()
+    base_visitor.visit(fixed_compound_node)
+    inherited_visitor = _InheritedCompoundVisitor()
+    inherited_visitor.visit(fixed_compound_node)
+
+    assert ("Node", "LocationNode") in base_visitor.visited
+    assert ("LocationNode", "LocationNode") in inherited_visitor.visited
+    assert _CompoundVisitor.__dispatch_table__ is not _InheritedCompoundVisitor.__dispatch_table__
+
+
+def test_dispatch_added_functions(fixed_compound_node):
+    class _LateVisitor(_CompoundVisitor):
+        pass
+
+    # Functions added to the class before visiting the node class are found
+    def visit_LocationNode(self, node, **kwargs):
+        self.visited.append(("LocationNode", type(node).__name__))
+
+    _LateVisitor.visit_LocationNode = visit_LocationNode
+    visitor = _LateVisitor()
+    visitor.visit(fixed_compound_node)
+    assert ("LocationNode", "LocationNode") in visitor.visited
+
+    # Functions cannot be assigned to instances
+    visitor = _LateVisitor()
+    with pytest.raises(AttributeError, match="visit_SimpleNode"):
+        visitor.visit_SimpleNode = lambda node, **kwargs: None
+
+    # Collected functions are only updated after refreshing them
+    _LateVisitor.visit_SimpleNode = visit_LocationNode
+    visitor = _LateVisitor()
+    visitor.visit(fixed_compound_node)
+    assert ("LocationNode", "SimpleNode") not in visitor.visited
+    _LateVisitor.refresh_visitor_functions()
+    visitor = _LateVisitor()
+    visitor.visit(fixed_compound_node)
+    assert ("LocationNode", "SimpleNode") in visitor.visited
+
+
+def test_pruning_added_functions(fixed_compound_node):
+    class _LatePruningVisitor(eve.NodeVisitor, visit_types="auto"):
+        def __init__(self):
+            self.visited = []
+
+    # Functions added before the first use are also used to prune the subtrees
+    def visit_LocationNode(self, node, **kwargs):
+        self.visited.append(node)
+
+    _LatePruningVisitor.visit_LocationNode = visit_LocationNode
+    visitor = _LatePruningVisitor()
+    visitor.visit(fixed_compound_node)
+    assert any(node is fixed_compound_node.location for node in visitor.visited)
+
+
+def test_dispatch_non_node_values(fixed_simple_node):
+    visitor = _CompoundVisitor()
+    visitor.visit(fixed_simple_node.int_kind)
+    visitor.visit(fixed_simple_node.str_kind)
+    visitor.visit([fixed_simple_node.int_kind])
+
+    assert visitor.visited == [("IntKind", fixed_simple_node.int_kind)] * 2
+
+
+def test_dispatch_static_methods(fixed_location_node):
+    collected = []
+
+    class _StaticVisitor(eve.NodeVisitor):
+        @staticmethod
+        def visit_LocationNode(node, **kwargs):
+            collected.append(node)
+
+    _StaticVisitor().visit(fixed_location_node)
+    assert collected == [fixed_location_node]
+
+
+def test_templated_generator_dispatch(fixed_compound_node):
+    class _Generator(eve.codegen.TemplatedGenerator):
+        LocationNode = eve.codegen.FormatTemplate("loc")
+        Node = eve.codegen.FormatTemplate("node")
+
+    _Generator.apply(fixed_compound_node)
+    assert _Generator.__templates_table__[definitions.LocationNode][1] == "LocationNode"
+    assert _Generator.__templates_table__[definitions.SimpleNode][1] == "Node"
+
+
+# -- Iterative traversals --
+class _Expr(eve.Node):
+    pass
+
+
+class _Leaf(_Expr):
+    value: eve.Int
+
+
+class _Add(_Expr):
+    left: _Expr
+    right: _Expr
+
+
+def _make_chain(depth):
+    expr = _Leaf(value=0)
+    for i in range(1, depth + 1):
+        expr = _Add(left=expr, right=_Leaf(value=i))
+    return expr
+
+
+class _LeafCollector(eve.NodeVisitor):
+    def __init__(self):
+        self.values = []
+
+    def visit__Leaf(self, node, **kwargs):
+        self.values.append(node.value)
+
+
+class _IterativeLeafCollector(_LeafCollector, iterative=True):
+    pass
+
+
+class _LeafIncrementer(eve.NodeTranslator):
+    def visit__Leaf(self, node, *, increment=1, **kwargs):
+        return _Leaf(value=node.value + increment)
+
+
+class _IterativeLeafIncrementer(_LeafIncrementer, iterative=True):
+    pass
+
+
+def test_iterative_visitor(fixed_compound_node):
+    tree = [_make_chain(10), fixed_compound_node, {"a": _make_chain(3)}]
+
+    visitor = _LeafCollector()
+    visitor.visit(tree)
+    iterative_visitor = _IterativeLeafCollector()
+    iterative_visitor.visit(tree)
+    assert iterative_visitor.values == visitor.values
+
+    collector = _CompoundVisitor()
+    collector.visit(fixed_compound_node)
+
+    class _IterativeCompoundVisitor(_CompoundVisitor, iterative=True):
+        pass
+
+    iterative_collector = _IterativeCompoundVisitor()
+    iterative_collector.visit(fixed_compound_node)
+    assert iterative_collector.visited == collector.visited
+
+
+def test_iterative_translator(fixed_compound_node):
+    tree = [_make_chain(10), {"a": _make_chain(3)}, (_Leaf(value=-1),)]
+
+    result = _LeafIncrementer().visit(tree, increment=2)
+    iterative_result = _IterativeLeafIncrementer().visit(tree, increment=2)
+    assert [type(node) for node in eve.iter_tree(iterative_result)] == [
+        type(node) for node in eve.iter_tree(result)
+    ]
+    assert [
+        node.value for node in eve.iter_tree(iterative_result).if_isinstance(_Leaf)
+    ] == [node.value for node in eve.iter_tree(result).if_isinstance(_Leaf)]
+    assert isinstance(iterative_result[2], tuple)
+
+    copied = _IterativeLeafIncrementer().visit(fixed_compound_node)
+    assert copied == fixed_compound_node
+    assert copied is not fixed_compound_node
+
+
+def test_iterative_deep_trees():
+    depth = 5000
+    tree = _make_chain(depth)
+
+    collector = _IterativeLeafCollector()
+    collector.visit(tree)
+    assert collector.values == list(range(depth + 1))
+
+    result = _IterativeLeafIncrementer().visit(tree)
+    assert result.right.value == depth + 1
+
+
+def test_iterative_unsupported():
+    with pytest.raises(TypeError, match="Iterative traversal"):
+
+        class _IterativeMutator(eve.NodeMutator, iterative=True):
+            pass
+
+
+# -- Copy-on-write translations --
+class _CopyOnWriteLeafIncrementer(_LeafIncrementer, copy_on_write=True):
+    def visit__Leaf(self, node, *, target=None, **kwargs):
+        if target is not None and node.value != target:
+            return node
+        return super().visit__Leaf(node, **kwargs)
+
+
+class _IterativeCopyOnWriteLeafIncrementer(_CopyOnWriteLeafIncrementer, iterative=True):
+    pass
+
+
+@pytest.mark.parametrize(
+    "translator_class", [_CopyOnWriteLeafIncrementer, _IterativeCopyOnWriteLeafIncrementer]
+)
+def test_copy_on_write_translator(translator_class):
+    assert translator_class.__copy_on_write__
+    assert not _LeafIncrementer.__copy_on_write__
+
+    chain = _make_chain(4)
+    tree = [chain, {"a": _make_chain(3)}, (_Leaf(value=-1),)]
+
+    unchanged = translator_class().visit(tree, target=100)
+    assert unchanged is tree
+
+    result = translator_class().visit(tree, target=3)
+    assert result is not tree
+    assert result[0] is not chain
+    assert result[0].right is chain.right
+    assert result[0].left.right is not chain.left.right
+    assert result[0].left.right.value == 4
+    assert result[0].left.left is chain.left.left
+    assert result[1] is not tree[1] and result[1]["a"] is not tree[1]["a"]
+    assert result[2] is tree[2]
+
+
+def test_immutable_leaves_are_not_copied(fixed_compound_node):
+    class _Translator(eve.NodeTranslator):
+        pass
+
+    copied = _Translator().visit(fixed_compound_node)
+    assert copied == fixed_compound_node
+    assert copied is not fixed_compound_node
+    assert copied.location is not fixed_compound_node.location
+    assert copied.simple.str_value is fixed_compound_node.simple.str_value
+    assert _Translator().visit(definitions.StrKind.FOO) is definitions.StrKind.FOO
+
+
+# -- Fused visitors --
+class _DepthRecorder(eve.NodeVisitor):
+    def __init__(self):
+        self.depths = []
+
+    def visit_Node(self, node, *, depth=0, **kwargs):
+        self.depths.append((type(node).__name__, depth))
+        self.generic_visit(node, depth=depth + 1, **kwargs)
+
+
+class _SimplePruner(eve.NodeVisitor):
+    # Skip SimpleNode subtrees and only visit the 'loc' field of SimpleNodeWithLoc
+    def __init__(self):
+        self.visited = []
+
+    def visit_SimpleNode(self, node, **kwargs):
+        self.visited.append(node.id_)
+
+    def visit_SimpleNodeWithLoc(self, node, **kwargs):
+        self.visited.append(node.id_)
+        self.generic_visit(node.loc, **kwargs)
+
+    def visit_SourceLocation(self, node, **kwargs):
+        self.visited.append(str(node))
+
+    def visit_str(self, node, **kwargs):
+        self.visited.append(node)
+
+
+def test_fused_visitor(fixed_compound_node):
+    tree = [fixed_compound_node, {"chain": _make_chain(5)}]
+    visitor_factories = [
+        _LeafCollector,
+        _IterativeLeafCollector,
+        _CompoundVisitor,
+        _DepthRecorder,
+        _SimplePruner,
+    ]
+
+    sequential_visitors = [factory() for factory in visitor_factories]
+    for visitor in sequential_visitors:
+        visitor.visit(tree)
+
+    fused_visitors = eve.FusedNodeVisitor.apply(
+        tree, *[factory() for factory in visitor_factories]
+    )
+    for visitor, fused_visitor in zip(sequential_visitors, fused_visitors):
+        assert vars(fused_visitor) == vars(visitor)
+        assert "generic_visit" not in vars(fused_visitor)
+
+
+class _SharedLeaf(eve.FrozenNode, interned=True):
+    value: int
+
+
+class _Wrapper(eve.Node):
+    first: _SharedLeaf
+    middle: _SharedLeaf
+    second: _SharedLeaf
+
+
+class _PartialVisitor(eve.NodeVisitor):
+    def __init__(self):
+        self.visited = []
+
+    def visit__Wrapper(self, node, **kwargs):
+        self.generic_visit(node.middle, tag="middle")
+        self.generic_visit(node.second, tag="second")
+
+    def visit_int(self, node, *, tag, **kwargs):
+        self.visited.append((node, tag))
+
+
+def test_fused_visitor_shared_nodes():
+    # 'first' and 'second' are the same node, but only the second one is visited
+    shared = _SharedLeaf(value=1)
+    tree = [_Wrapper(first=shared, middle=_SharedLeaf(value=2), second=_SharedLeaf(value=1))]
+    assert tree[0].second is shared
+    visitor = _PartialVisitor()
+    visitor.visit(tree)
+    assert visitor.visited == [(2, "middle"), (1, "second")]
+
+    (fused_visitor, _) = eve.FusedNodeVisitor.apply(tree, _PartialVisitor(), _LeafCollector())
+    assert fused_visitor.visited == visitor.visited
+
+
+def test_fused_visitor_read_only():
+    with pytest.raises(TypeError, match="read-only"):
+        eve.FusedNodeVisitor(_LeafCollector(), _LeafIncrementer())
+
+
+# -- Subtree pruning --
+class _LocationCounter(eve.NodeVisitor):
+    def __init__(self):
+        self.count = 0
+
+    def visit_LocationNode(self, node, **kwargs):
+        self.count += 1
+
+
+class _AutoPrunedLocationCounter(_LocationCounter, visit_types="auto"):
+    pass
+
+
+class _ExplicitPrunedLocationCounter(_LocationCounter, visit_types=(definitions.LocationNode,)):
+    pass
+
+
+class _IterativePrunedLocationCounter(_AutoPrunedLocationCounter, iterative=True):
+    pass
+
+
+class _NonNodeLocationCounter(_AutoPrunedLocationCounter):
+    # Visitor functions for non-node types disable "auto" pruning
+    def visit_int(self, node, **kwargs):
+        pass
+
+
+def _make_tree_with_hidden_location(compound_node):
+    # The annotation of 'simple.int_value' does not allow nodes, so pruned
+    # visitors do not look for LocationNodes there
+    hidden_simple = compound_node.simple.copy(
+        update={"int_value": definitions.make_location_node()}
+    )
+    return compound_node.copy(update={"simple": hidden_simple})
+
+
+@pytest.mark.parametrize(
+    ["visitor_class", "pruned"],
+    [
+        (_LocationCounter, False),
+        (_AutoPrunedLocationCounter, True),
+        (_ExplicitPrunedLocationCounter, True),
+        (_IterativePrunedLocationCounter, True),
+        (_NonNodeLocationCounter, False),
+    ],
+)
+def test_visit_types_pruning(fixed_compound_node, visitor_class, pruned):
+    visitor = visitor_class()
+    visitor.visit([fixed_compound_node, fixed_compound_node])
+    assert visitor.count == 2
+
+    visitor = visitor_class()
+    visitor.visit(_make_tree_with_hidden_location(fixed_compound_node))
+    assert visitor.count == (1 if pruned else 2)
+
+    fused_visitor = visitor_class()
+    eve.FusedNodeVisitor.apply(_make_tree_with_hidden_location(fixed_compound_node), fused_visitor)
+    assert fused_visitor.count == visitor.count
+
+
+class _LocationRemover(eve.NodeTranslator, copy_on_write=True, visit_types="auto"):
+    def visit_LocationNode(self, node, **kwargs):
+        return definitions.make_location_node()
+
+
+class _IterativeLocationRemover(_LocationRemover, iterative=True):
+    pass
+
+
+@pytest.mark.parametrize("translator_class", [_LocationRemover, _IterativeLocationRemover])
+def test_visit_types_pruning_translator(fixed_compound_node, translator_class):
+    tree = _make_tree_with_hidden_location(fixed_compound_node)
+    translated = translator_class().visit(tree)
+
+    assert translated.location is not tree.location
+    assert translated.simple is tree.simple
+    assert translated.simple_loc is tree.simple_loc
+
+
+def test_visit_types_errors():
+    with pytest.raises(TypeError, match="copy_on_write"):
+
+        class _Translator(eve.NodeTranslator, visit_types="auto"):
+            pass
+
+    with pytest.raises(TypeError, match="visit_types"):
+
+        class _Visitor(eve.NodeVisitor, visit_types=[definitions.LocationNode]):
+            pass
+
+
+# -- Memoization of context-free visitors --
+class _CountingLeafIncrementer(_LeafIncrementer):
+    def __init__(self):
+        self.calls = 0
+
+    def visit__Leaf(self, node, **kwargs):
+        self.calls += 1
+        return super().visit__Leaf(node, **kwargs)
+
+
+class _ContextFreeLeafIncrementer(_CountingLeafIncrementer, context_free=True):
+    pass
+
+
+class _IterativeContextFreeLeafIncrementer(_ContextFreeLeafIncrementer, iterative=True):
+    pass
+
+
+class _ContextFreeLeafCollector(_LeafCollector, context_free=True):
+    pass
+
+
+class _IterativeContextFreeLeafCollector(_ContextFreeLeafCollector, iterative=True):
+    pass
+
+
+class _ContextFreeValueVisitor(eve.NodeVisitor, context_free=True):
+    def visit__Leaf(self, node, **kwargs):
+        return node.value
+
+    def visit__Add(self, node, **kwargs):
+        # The children have already been visited by generic_visit()
+        self.generic_visit(node, **kwargs)
+        return (self.visit(node.left, **kwargs), self.visit(node.right, **kwargs))
+
+
+class _IterativeContextFreeValueVisitor(_ContextFreeValueVisitor, iterative=True):
+    pass
+
+
+@pytest.mark.parametrize(
+    "translator_class", [_ContextFreeLeafIncrementer, _IterativeContextFreeLeafIncrementer]
+)
+def test_context_free_translator(translator_class):
+    shared = _make_chain(3)
+    tree = [_Add(left=shared, right=shared), shared, {"a": shared}]
+
+    translator = _CountingLeafIncrementer()
+    reference = translator.visit(tree)
+    assert translator.calls == 4 * 4
+
+    translator = translator_class()
+    translated = translator.visit(tree)
+    assert translator.calls == 4
+    assert eve.structural_eq(translated, reference)
+    assert translated[0].left is translated[0].right is translated[1] is translated[2]["a"]
+    assert "_visit_memo_" not in vars(translator)
+
+    # The memo is only used during a single visit and for the same keyword arguments
+    translator.visit(tree)
+    assert translator.calls == 8
+    translated = translator.visit(shared, increment=2)
+    assert translator.calls == 12
+    assert translated.right.value == 5
+
+
+@pytest.mark.parametrize(
+    "visitor_class", [_ContextFreeValueVisitor, _IterativeContextFreeValueVisitor]
+)
+def test_context_free_visitor_results(visitor_class):
+    assert visitor_class().visit(_make_chain(2)) == ((0, 1), 2)
+
+
+@pytest.mark.parametrize(
+    "visitor_class", [_ContextFreeLeafCollector, _IterativeContextFreeLeafCollector]
+)
+def test_context_free_visitor(visitor_class):
+    shared = _make_chain(3)
+    visitor = visitor_class()
+    visitor.visit([shared, _Add(left=shared, right=_Leaf(value=10))])
+    assert visitor.values == [0, 1, 2, 3, 10]
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""Micro-benchmarks of code generation for usid computations."""
+
+
+from __future__ import annotations
+
+import contextlib
+import os
+import tracemalloc
+from typing import Callable, Iterator
+
+from gtc.unstructured import usid
+from gtc.unstructured.usid_codegen import UsidNaiveCodeGenerator
+
+from ...tests_eve.benchmarks.common import measure, report
+from . import common
+
+
+class NonMemoizedCodeGenerator(UsidNaiveCodeGenerator, context_free=False):
+    pass
+
+
+class UnmemoizedRenderingCodeGenerator(UsidNaiveCodeGenerator, memoized_types=()):
+    pass
+
+
+class GenericRenderingCodeGenerator(UsidNaiveCodeGenerator):
+    """Generator using the generic rendering process (no specialized render functions)."""
+
+    def render_template(self, *args, **kwargs):  # type: ignore  # forward everything
+        return super().render_template(*args, **kwargs)
+
+
+def make_shared_computation(num_kernels: int, num_stmts: int = 20) -> usid.Computation:
+    """Create a computation where the statements share a common sub-expression."""
+    comp = common.make_usid_computation(num_kernels, num_stmts)
+    for kernel in comp.kernels:
+        body = kernel.ast[0].body
+        for stmt in body[1:]:
+            stmt.right.right = body[0].right.right
+    return comp
+
+
+@contextlib.contextmanager
+def uncached_symbol_tables() -> Iterator[None]:
+    """Temporarily replace the cached symbol tables with plain properties."""
+    originals = {cls: cls.__dict__["symbol_tbl"] for cls in (usid.Kernel, usid.SidComposite)}
+    try:
+        for cls, cached in originals.items():
+            cls.symbol_tbl = property(cached.func)
+        yield
+    finally:
+        for cls, cached in originals.items():
+            cls.symbol_tbl = cached
+
+
+def _peak_memory(func: Callable[[], object]) -> int:
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main(num_kernels: int = 100) -> None:
+    for label, make in [
+        ("independent kernels", common.make_usid_computation),
+        ("shared sub-expressions", make_shared_computation),
+    ]:
+        comp = make(num_kernels)
+        assert UsidNaiveCodeGenerator().visit(comp) == NonMemoizedCodeGenerator().visit(comp)
+        report(
+            f"Code generation ({label})",
+            [
+                ("regular", measure(lambda: NonMemoizedCodeGenerator().visit(comp), repeat=3)),
+                ("context-free", measure(lambda: UsidNaiveCodeGenerator().visit(comp), repeat=3)),
+            ],
+        )
+
+    comp = common.make_usid_computation(num_kernels)
+    assert GenericRenderingCodeGenerator().visit(comp) == UsidNaiveCodeGenerator().visit(comp)
+    report(
+        "Template rendering",
+        [
+            (
+                "generic rendering",
+                measure(lambda: GenericRenderingCodeGenerator().visit(comp), repeat=3),
+            ),
+            (
+                "specialized render functions",
+                measure(lambda: UsidNaiveCodeGenerator().visit(comp), repeat=3),
+            ),
+        ],
+    )
+
+    comp = common.make_usid_computation(num_kernels)
+    assert UnmemoizedRenderingCodeGenerator().visit(comp) == UsidNaiveCodeGenerator().visit(comp)
+    report(
+        "Rendering of equal field accesses and literals",
+        [
+            (
+                "rendered every time",
+                measure(lambda: UnmemoizedRenderingCodeGenerator().visit(comp), repeat=3),
+            ),
+            ("memoized", measure(lambda: UsidNaiveCodeGenerator().visit(comp), repeat=3)),
+        ],
+    )
+
+    for num_stmts in (50, 200):
+        comp = common.make_usid_computation(4, num_stmts)
+        with uncached_symbol_tables():
+            uncached = measure(lambda: UsidNaiveCodeGenerator().visit(comp), repeat=3)
+        cached = measure(lambda: UsidNaiveCodeGenerator().visit(comp), repeat=3)
+        report(
+            f"Code generation of kernels with {num_stmts} statements",
+            [("symbol tables rebuilt on access", uncached), ("cached symbol tables", cached)],
+        )
+
+    comp = common.make_usid_computation(num_kernels)
+    print(f"\nCode emission ({len(UsidNaiveCodeGenerator.apply(comp)) / 2**20:.2f} MiB of code)")
+    with open(os.devnull, "w") as devnull:
+        for label, emit in [
+            ("single string", lambda: devnull.write(UsidNaiveCodeGenerator().visit(comp))),
+            ("streaming", lambda: UsidNaiveCodeGenerator.apply_to(comp, devnull)),
+        ]:
+            print(f"  {label:<40} {_peak_memory(emit) / 2**20:10.2f} MiB peak")
+
+
+if __name__ == "__main__":
+    main()
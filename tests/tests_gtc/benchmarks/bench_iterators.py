@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+
+"""Micro-benchmark of the tree iterators over a large usid computation."""
+
+from __future__ import annotations
+
+import contextlib
+from typing import Any, Generator, Iterator, Tuple
+
+import eve
+from eve import concepts
+
+from ...tests_eve.benchmarks.common import measure, report
+from . import common
+
+
+def _legacy_iter_impl_fields(self: concepts.BaseNode) -> Generator[Tuple[str, Any], None, None]:
+    for name, _ in self.__fields__.items():
+        if name.endswith("_") and not name.endswith("__"):
+            yield name, getattr(self, name)
+
+
+def _legacy_iter_children(self: concepts.BaseNode) -> Generator[Tuple[str, Any], None, None]:
+    for name, _ in self.__fields__.items():
+        if not (name.endswith("_") or name.endswith("__")):
+            yield name, getattr(self, name)
+
+
+def _legacy_iter_children_values(self: concepts.BaseNode) -> Generator[Any, None, None]:
+    for _, node in self.iter_children():
+        yield node
+
+
+@contextlib.contextmanager
+def legacy_node_iterators() -> Iterator[None]:
+    """Temporarily restore the previous field iteration methods (string checks per field)."""
+    names = ["iter_impl_fields", "iter_children", "iter_children_values"]
+    current = {name: concepts.BaseNode.__dict__[name] for name in names}
+    try:
+        for name in names:
+            setattr(concepts.BaseNode, name, globals()[f"_legacy_{name}"])
+        yield
+    finally:
+        for name, method in current.items():
+            setattr(concepts.BaseNode, name, method)
+
+
+def main(num_kernels: int = 200) -> None:
+    comp = common.make_usid_computation(num_kernels)
+
+    def iterate() -> int:
+        return sum(1 for _ in eve.iter_tree(comp))
+
+    nodes = eve.iter_tree(comp).if_isinstance(eve.Node).to_list()
+
+    def iterate_children() -> None:
+        for node in nodes:
+            for _ in node.iter_children():
+                pass
+            for _ in node.iter_impl_fields():
+                pass
+
+    print(f"usid.Computation with {iterate()} tree items ({len(nodes)} nodes)")
+    with legacy_node_iterators():
+        legacy = measure(iterate)
+        legacy_children = measure(iterate_children)
+    report("iter_tree(usid.Computation)", [("legacy", legacy), ("precomputed", measure(iterate))])
+    report(
+        "Node.iter_children() + Node.iter_impl_fields()",
+        [("legacy", legacy_children), ("precomputed", measure(iterate_children))],
+    )
+
+    def query_iter_tree() -> None:
+        for kernel in comp.kernels:
+            eve.iter_tree(kernel).if_isinstance(common.usid.FieldAccess).to_list()
+            eve.iter_tree(kernel).if_isinstance(common.usid.NeighborLoop).to_list()
+
+    def query_index() -> None:
+        index = eve.TreeIndex(comp)
+        for kernel in comp.kernels:
+            index.find(common.usid.FieldAccess, within=kernel)
+            index.find(common.usid.NeighborLoop, within=kernel)
+
+    report(
+        "Per-kernel node queries (2 classes)",
+        [
+            ("iter_tree().if_isinstance()", measure(query_iter_tree)),
+            ("TreeIndex", measure(query_index)),
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main()
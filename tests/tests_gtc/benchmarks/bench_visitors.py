@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+
+"""Micro-benchmark of fused and pruned read-only analyses over a large usid computation."""
+
+
+from __future__ import annotations
+
+from typing import Any, Dict, Set
+
+import eve
+
+from ...tests_eve.benchmarks.common import measure, report
+from . import common
+
+
+class FieldAccessCounter(eve.NodeVisitor):
+    def __init__(self) -> None:
+        self.counts: Dict[str, int] = {}
+
+    def visit_FieldAccess(self, node: common.usid.FieldAccess, **kwargs: Any) -> None:
+        self.counts[node.name] = self.counts.get(node.name, 0) + 1
+
+
+class SidNamesCollector(eve.NodeVisitor):
+    def __init__(self) -> None:
+        self.names: Set[str] = set()
+
+    def visit_SidComposite(self, node: common.usid.SidComposite, **kwargs: Any) -> None:
+        self.names.add(node.name)
+
+
+class PrunedSidNamesCollector(SidNamesCollector, visit_types="auto"):
+    pass
+
+
+class LiteralCollector(eve.NodeVisitor):
+    def __init__(self) -> None:
+        self.values: Set[str] = set()
+
+    def visit_Literal(self, node: common.usid.Literal, **kwargs: Any) -> None:
+        self.values.add(str(node.value))
+
+
+class MaxDepth(eve.NodeVisitor):
+    def __init__(self) -> None:
+        self.max_depth = 0
+
+    def visit_Node(self, node: eve.Node, *, depth: int = 0, **kwargs: Any) -> None:
+        self.max_depth = max(self.max_depth, depth)
+        self.generic_visit(node, depth=depth + 1, **kwargs)
+
+
+class StmtCounter(eve.NodeVisitor):
+    def __init__(self) -> None:
+        self.count = 0
+
+    def visit_Stmt(self, node: common.usid.Stmt, **kwargs: Any) -> None:
+        self.count += 1
+        self.generic_visit(node, **kwargs)
+
+
+ANALYSES = [FieldAccessCounter, SidNamesCollector, LiteralCollector, MaxDepth, StmtCounter]
+
+
+def main(num_kernels: int = 200) -> None:
+    comp = common.make_usid_computation(num_kernels)
+
+    def sequential() -> None:
+        for analysis in ANALYSES:
+            analysis().visit(comp)
+
+    def fused() -> None:
+        eve.FusedNodeVisitor.apply(comp, *[analysis() for analysis in ANALYSES])
+
+    print(f"usid.Computation with {len(eve.TreeIndex(comp))} nodes, {len(ANALYSES)} analyses")
+    report(
+        "Read-only analyses", [("sequential", measure(sequential)), ("fused", measure(fused))]
+    )
+    report(
+        "SidComposite names",
+        [
+            ("full traversal", measure(lambda: SidNamesCollector().visit(comp))),
+            ("pruned traversal", measure(lambda: PrunedSidNamesCollector().visit(comp))),
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main()
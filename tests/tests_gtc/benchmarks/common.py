@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+#
+# Eve Toolchain - GT4Py Project - GridTools Framework
+#
+# Copyright (c) 2020, CSCS - Swiss National Supercomputing Center, ETH Zurich
+# All rights reserved.
+#
+# This file is part of the GT4Py project and the GridTools framework.
+# GT4Py is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or any later
+# version. See the LICENSE.txt file at the top-level directory of this
+# distribution for a copy of the license or check <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+
+"""Shared IR builders for the GTC micro-benchmarks.
+
+Benchmarks are plain scripts (not collected by pytest) meant to be run
+from the repository root as modules, e.g.::
+
+    python -m tests.tests_gtc.benchmarks.bench_iterators
+
+"""
+
+
+from __future__ import annotations
+
+from gtc import common
+from gtc.unstructured import usid
+from gtc.unstructured.usid import (
+    AssignStmt,
+    BinaryOp,
+    Computation,
+    Connectivity,
+    FieldAccess,
+    Kernel,
+    KernelCall,
+    Literal,
+    NeighborChain,
+    NeighborLoop,
+    SidComposite,
+    SidCompositeEntry,
+    SidCompositeNeighborTableEntry,
+    UField,
+)
+
+
+Edge = common.LocationType.Edge
+Vertex = common.LocationType.Vertex
+
+
+def make_kernel(index: int, num_stmts: int) -> Kernel:
+    """Create a kernel with a neighbor loop over the vertices of each edge."""
+    conn_name = f"e2v_{index}"
+    edge_fields = [f"edge_field_{i}" for i in range(num_stmts)]
+
+    def acc(name: str, sid: str, location_type: common.LocationType) -> FieldAccess:
+        return FieldAccess(name=name, sid=sid, location_type=location_type)
+
+    body = [
+        AssignStmt(
+            left=acc(field, "e", Vertex),
+            right=BinaryOp(
+                left=acc(field, "e", Vertex),
+                right=BinaryOp(
+                    left=acc("vertex_field", "v_on_e", Vertex),
+                    right=Literal(value="0.5", location_type=Vertex, vtype=common.DataType.FLOAT64),
+                    op=common.BinaryOperator.MUL,
+                    location_type=Vertex,
+                ),
+                op=common.BinaryOperator.ADD,
+                location_type=Vertex,
+            ),
+            location_type=Vertex,
+        )
+        for field in edge_fields
+    ]
+
+    return Kernel(
+        name=f"kernel_{index}",
+        connectivities=[
+            Connectivity(name=f"e_{index}", chain=NeighborChain(elements=[Edge])),
+            Connectivity(name=conn_name, chain=NeighborChain(elements=[Edge, Vertex])),
+        ],
+        sids=[
+            SidComposite(
+                name="e",
+                location=NeighborChain(elements=[Edge]),
+                entries=[SidCompositeEntry(name=field) for field in edge_fields]
+                + [SidCompositeNeighborTableEntry(connectivity=conn_name)],
+            ),
+            SidComposite(
+                name="v_on_e",
+                location=NeighborChain(elements=[Edge, Vertex]),
+                entries=[SidCompositeEntry(name="vertex_field")],
+            ),
+        ],
+        primary_connectivity=f"e_{index}",
+        primary_sid="e",
+        ast=[
+            NeighborLoop(
+                body_location_type=Vertex,
+                body=body,
+                connectivity=conn_name,
+                outer_sid="e",
+                sid="v_on_e",
+                location_type=Edge,
+            )
+        ],
+    )
+
+
+def make_usid_computation(num_kernels: int, num_stmts: int = 20) -> Computation:
+    """Create a usid computation with ``num_kernels`` independent kernels."""
+    kernels = [make_kernel(i, num_stmts) for i in range(num_kernels)]
+    return Computation(
+        name="benchmark",
+        parameters=[
+            UField(name=f"edge_field_{i}", vtype=common.DataType.FLOAT64, dimensions=[Edge])
+            for i in range(num_stmts)
+        ]
+        + [UField(name="vertex_field", vtype=common.DataType.FLOAT64, dimensions=[Vertex])],
+        temporaries=[],
+        kernels=kernels,
+        ctrlflow_ast=[KernelCall(name=kernel.name) for kernel in kernels],
+    )
+
+
+__all__ = ["make_kernel", "make_usid_computation", "usid"]
@@ -204,6 +204,11 @@ class TestNIRMergeHorizontalLoops:
         assert len(result.horizontal_loops[0].stmt.declarations) == 2
         # TODO more precise checks
 
+        # the input is not modified and the unchanged subtrees are shared
+        assert stencil.horizontal_loops == [first_loop, second_loop]
+        assert result.horizontal_loops[0].stmt.statements[0] is first_loop.stmt.statements[0]
+        assert find_and_merge_horizontal_loops(result) is result
+
     def test_find_and_merge_with_2_vertical_loops(self):
         var1 = make_local_var("var1")
         assignment1, _ = make_init("field1")
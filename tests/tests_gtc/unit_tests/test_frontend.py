@@ -7,6 +7,8 @@ import pytest
 from gt_frontend import ast_node_matcher as anm
 from gt_frontend.frontend import GTScriptCompilationTask
 
+from eve import ValidationLevel
+
 from . import stencil_definitions
 
 
@@ -124,3 +126,10 @@ def valid_stencil(request):
 
 def test_code_generation_for_valid_stencils(valid_stencil):
     GTScriptCompilationTask(valid_stencil).generate()
+
+
+@pytest.mark.parametrize("validation_level", [ValidationLevel.TRUSTED, ValidationLevel.DEFERRED])
+def test_code_generation_validation_levels(validation_level):
+    expected = GTScriptCompilationTask(stencil_definitions.fvm_nabla).generate()
+    task = GTScriptCompilationTask(stencil_definitions.fvm_nabla)
+    assert task.generate(validation_level=validation_level) == expected